@@ -147,7 +147,7 @@ class AIPlayer(Player):
                 randIdx2 = random.randint(0, len(maxIndices)-1)
 
             # mate the selected parents
-            child1, child2 = self.mate(self.population[randIdx1], self.population[randIdx2])
+            child1, child2 = self.mate(self.population[maxIndices[randIdx1]], self.population[maxIndices[randIdx2]])
             children.append(child1)
             children.append(child2)
 
@@ -155,11 +155,27 @@ class AIPlayer(Player):
         newPopulation = children[:]
         for idx in maxIndices:
             newPopulation.append(self.population[idx])
+        self.population = newPopulation
 
         # reset the fitness array
         for i in range(len(self.fitness)):
             self.fitness[i] = 0
 
+    ##
+    # setGene
+    # Description: makes the player play every game with one gene, as if it were the
+    #     only member of the population. Used by GeneticTrainer, which keeps the real
+    #     population and its fitness itself.
+    #
+    # Parameters: gene - the gene to play with
+    ##
+    def setGene(self, gene):
+        self.population = [gene]
+        self.fitness = [0]
+        self.nextGeneIdx = 0
+        self.gamesPlayed = 0
+        self.firstMove = True
+
     # createNode
     # Description: Creates a new node in the form of a dictionary
     #
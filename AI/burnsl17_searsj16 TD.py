@@ -3,10 +3,18 @@ from Player import *
 from Ant import *
 from Building import *
 from AIPlayerUtils import *
+from UtilityStore import UtilityStore
 import math
 import pickle
 import os.path
 
+# Keys of the win and loss states; every other key is larger (see encodeState)
+WIN_KEY = 1
+LOSS_KEY = 2
+# Bounds on the queens' healths and workers' distances that encodeState can hold
+MAX_OLD_HEALTH = 15
+MAX_OLD_DIST = 31
+
 ##
 #AIPlayer
 #Description: The responsbility of this class is to interact with the game by
@@ -25,8 +33,8 @@ class AIPlayer(Player):
     #   inputPlayerId - The id to give the new player (int)
     ##
     def __init__(self, inputPlayerId):
-        # Dictionary of utility states
-        self.utilList = {}
+        # Utility of each encoded state, opened by loadUtils on the first move
+        self.utilList = None
 
         # Keeps track of the total number of states encountered
         self.newStates = 0
@@ -43,14 +51,17 @@ class AIPlayer(Player):
         # Lambda future value of state
         self.lamb = 0.9
 
-        # file to save our utility state into
-        self.saveFile = "util.searsj16_burns17"
+        # file to save our utility state into. The AI directory is the working
+        # directory while players are loaded, but not during the game.
+        self.saveFile = os.path.abspath("util.searsj16_burns17.dat")
+
+        # pickled file that older versions saved our utility states into
+        self.oldSaveFile = os.path.abspath("util.searsj16_burns17")
 
         # Check if file exists, if so, load util values
-        try:
-            self.loadUtils()
+        if os.path.exists(self.saveFile) or os.path.exists(self.oldSaveFile):
             print "Loaded util values..."
-        except IOError:
+        else:
             print "Could not find util file. Starting fresh..."
         
         super(AIPlayer,self).__init__(inputPlayerId, "Something Unique")
@@ -135,22 +146,31 @@ class AIPlayer(Player):
         return compState
 
     ##
-    # flat
-    # Description: Takes a two dimensional list and turns it into a string.
+    # encodeState
+    # Description: Takes a compressed state and packs it into a single integer key.
+    #   Win and loss states are WIN_KEY and LOSS_KEY. Otherwise the key is built from
+    #   the queens' healths and a number for each of the first two workers: 0 if
+    #   there isn't one, else 1 + 32 if it is carrying + its distance.
     #
     # Parameters:
-    #   stateList - The two dimensional list to flatten
+    #   compState - The two dimensional list from compressState
     #
-    # Returns: Stringified version of the list
+    # Returns: The key of the state
     #
-    def flat(self, stateList):
-        outString = ""
-
-        for list in stateList:
-            for item in list:
-                outString += str(item)
+    def encodeState(self, compState):
+        if compState[0][0] == 'W':
+            return WIN_KEY
+        elif compState[0][0] == 'L':
+            return LOSS_KEY
+
+        workers = [0, 0]
+        for label, dist in compState[2:]:
+            if label[0] == 'c':
+                workers[int(label[1:]) - 1] = 1 + 32 + dist
+            else:
+                workers[int(label) - 1] = 1 + dist
 
-        return outString
+        return 3 + ((compState[0][1] * 16 + compState[1][1]) * 65 + workers[0]) * 65 + workers[1]
 
     ##
     # addStateUtil
@@ -161,11 +181,11 @@ class AIPlayer(Player):
     #   state - The current state to evaluate
     #   nextState - The potential next state to evaluate
     #
-    # Returns: The dictionary of utility values with flattened state lists as keys
+    # Returns: The utility of the current state
     #
     def addStateUtil(self, state, nextState = None):
-        # Get the compressed 2D version of the state and flattens it into a string
-        currentStateList = self.flat(self.compressState(state))
+        # Get the compressed 2D version of the state and encode it as a key
+        currentStateList = self.encodeState(self.compressState(state))
 
         # If we are on the first move of the game, set the utility of the state to 0
         if nextState is None:
@@ -174,8 +194,8 @@ class AIPlayer(Player):
 
                 self.utilList[currentStateList] = 0
         else:
-            # Get the compressed 2D version of the nextState and flattens it into a string
-            nextStateList = self.flat(self.compressState(nextState))
+            # Get the compressed 2D version of the nextState and encode it as a key
+            nextStateList = self.encodeState(self.compressState(nextState))
 
             # If the next state has not been seen, increment the number
             # of states seen and set its utility to 0
@@ -192,17 +212,17 @@ class AIPlayer(Player):
 
     ##
     # reward
-    # Description: Takes the string version of the state and returns a reward based on the contents
+    # Description: Takes the key of the state and returns a reward based on the contents
     #
     # Parameters:
-    #   compState - The string version of the state
+    #   stateKey - The key of the state (see encodeState)
     #
     # Returns: 1.0 for a winning state, -1.0 for a losing state, or -0.01 for anything in between.
     #
-    def reward(self, compState):
-        if "W" in compState:
+    def reward(self, stateKey):
+        if stateKey == WIN_KEY:
             return 1.0
-        elif "L" in compState:
+        elif stateKey == LOSS_KEY:
             return -1.0
         else:
             return -0.01
@@ -355,6 +375,8 @@ class AIPlayer(Player):
     #Return: The Move to be made
     ##
     def getMove(self, currentState):
+        if self.utilList is None:
+            self.loadUtils()
         self.addStateUtil(currentState)
         return self.bestMove(currentState)
     
@@ -392,15 +414,111 @@ class AIPlayer(Player):
 
     ##
     # saveUtils
-    # Description: Saves a pickled copy of our utility list into a text file
+    # Description: Makes sure every utility value has been written to our file. Values
+    #   are written to the file as they change, so there is nothing else to save.
     #
     def saveUtils(self):
-        with open("AI/" +self.saveFile, 'wb') as file:
-            pickle.dump(self.utilList, file, 0)
+        if self.utilList is not None:
+            self.utilList.flush()
 
     ##
     # loadUtils
-    # Description: Loads our utility list out of a previously pickled file
+    # Description: Opens our utility file, creating it if it doesn't exist. Values are
+    #   read from the file as they are needed instead of all at once. A new file starts
+    #   out with the utilities from the old pickled file, if there is one.
     def loadUtils(self):
-        with open(self.saveFile, 'rb') as file:
-            self.utilList = pickle.load(file)
\ No newline at end of file
+        oldUtils = []
+        if not os.path.exists(self.saveFile) and os.path.exists(self.oldSaveFile):
+            oldUtils = self.convertOldUtils()
+        self.utilList = UtilityStore(self.saveFile, initialItems = oldUtils)
+
+    ##
+    # convertOldUtils
+    # Description: Reads the utility dictionary from the old pickled file and re-keys
+    #   it with encodeState. The old keys were flattened compressed states, and a few of
+    #   them could have come from more than one state (e.g. "MQ8OQ811223" is workers 1
+    #   and 2 at distances 12 and 3, or at 1 and 23). The old agent used the same value
+    #   for all of those states, so it goes to each of them.
+    #
+    # Returns: A list of (key, utility) pairs
+    #
+    def convertOldUtils(self):
+        with open(self.oldSaveFile, 'rb') as file:
+            oldUtils = pickle.load(file)
+
+        newUtils = []
+        for oldKey, util in oldUtils.items():
+            for compState in self.parseOldKey(oldKey):
+                newUtils.append((self.encodeState(compState), util))
+        return newUtils
+
+    ##
+    # parseOldKey
+    # Description: Finds every compressed state that flattens to an old key
+    #
+    # Parameters:
+    #   oldKey - The flattened compressed state (string)
+    #
+    # Returns: A list of compressed states (see compressState)
+    #
+    def parseOldKey(self, oldKey):
+        if oldKey.startswith('W'):
+            return [[['W', True]]]
+        elif oldKey.startswith('L'):
+            return [[['L', True]]]
+        elif not oldKey.startswith("MQ") or "OQ" not in oldKey:
+            return []
+
+        myHealth, rest = oldKey[2:].split("OQ", 1)
+        if not self.isOldNumber(myHealth, MAX_OLD_HEALTH):
+            return []
+        compStates = []
+        for end in range(1, len(rest) + 1):
+            if not self.isOldNumber(rest[:end], MAX_OLD_HEALTH):
+                continue
+            for workers in self.parseOldWorkers(rest[end:], 1):
+                compStates.append([["MQ", int(myHealth)], ["OQ", int(rest[:end])]] + workers)
+        return compStates
+
+    ##
+    # parseOldWorkers
+    # Description: Finds every way the end of an old key can list the workers
+    #
+    # Parameters:
+    #   text - The rest of the old key (string)
+    #   number - The number of the next worker (int)
+    #
+    # Returns: A list of lists of [label, distance] entries
+    #
+    def parseOldWorkers(self, text, number):
+        if text == "":
+            return [[]]
+        elif number > 2:
+            return []
+
+        workerLists = []
+        for label in ['c' + str(number), str(number)]:
+            if not text.startswith(label):
+                continue
+            digits = text[len(label):]
+            for end in range(1, len(digits) + 1):
+                if not self.isOldNumber(digits[:end], MAX_OLD_DIST):
+                    continue
+                for rest in self.parseOldWorkers(digits[end:], number + 1):
+                    workerLists.append([[label, int(digits[:end])]] + rest)
+        return workerLists
+
+    ##
+    # isOldNumber
+    # Description: Checks whether part of an old key can be a number written by str
+    #
+    # Parameters:
+    #   text - The part of the key (string)
+    #   bound - The largest number allowed (int)
+    #
+    # Returns: True if text is a number from 0 to bound
+    #
+    def isOldNumber(self, text, bound):
+        if not text.isdigit() or (len(text) > 1 and text[0] == '0'):
+            return False
+        return int(text) <= bound
\ No newline at end of file
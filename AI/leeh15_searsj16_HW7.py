@@ -1,6 +1,12 @@
 __author__ = "Sunny Lee & Jaimiey Sears"
 import random
 import math
+# NumPy lets evaluateStates run the network on a whole batch of states at
+# once; without it, the states are run through the network one at a time.
+try:
+    import numpy
+except ImportError:
+    numpy = None
 from Ant import *
 from Building import *
 from Player import *
@@ -130,11 +136,12 @@ class AIPlayer(Player):
         nodeList = []
         numNodes = 0
 
+        #perform evaluation of the nodes after every move as one batch
+        nextStates = [self.expandNode(parentNode['state'], move) for move in moves]
+        evalScores = self.evaluateStates(nextStates)
+
         #evaluate all nodes in tree
-        for move in moves:
-            #perform evaluation of node after move
-            nextState = self.expandNode(parentNode['state'], move)
-            evalScore = self.evaluateState(nextState)
+        for move, nextState, evalScore in zip(moves, nextStates, evalScores):
 
             #update alpha/beta values for first time through recursion
             if playerID == self.playerId:
@@ -453,26 +460,9 @@ class AIPlayer(Player):
     # Return: Score - a number between 0 and 1 that depicts how good a game state is for our AI
     # #
     def evaluateState(self, gameState):
-        opponentId = self.getOpponentId(gameState)
-        if opponentId == self.playerId:
-            opponentId = (opponentId + 1)%2
-
-        enemyInv = gameState.inventories[opponentId]
-        ourInv = gameState.inventories[self.playerId]
-        if self.checkIfWon(ourInv, enemyInv):
-            return 1.0
-        elif self.checkIfLose(ourInv, enemyInv):
-            return 0.0
-
-        scores = []
-        scores.append(self.evalNumAnts(ourInv, enemyInv))
-        scores.append(self.evalType(ourInv))
-        scores.append(self.evalAntsHealth(ourInv, enemyInv))
-        scores.append(self.evalFood(ourInv, enemyInv))
-        scores.append(self.evalQueenThreat(gameState, ourInv, enemyInv))
-        scores.append(self.evalWorkerCarrying(gameState, ourInv))
-        scores.append(self.evalWorkerNotCarrying(gameState, ourInv))
-        scores.append(self.evalQueenPosition(ourInv))
+        outcome, scores = self.getNetworkInputs(gameState)
+        if outcome is not None:
+            return outcome
 
         # scoreSum = 0.0
         # for score in scores:
@@ -494,6 +484,73 @@ class AIPlayer(Player):
         outputs = self.propagateNeuralNetwork(scores)
         return outputs[self.NUM_NODES -1]
 
+    # #
+    # evaluateStates
+    # Description: Evaluates a list of game states, the same way evaluateState
+    #   does. The network is run on all of the states that aren't won or lost
+    #   in a single batch.
+    #
+    # Parameters:
+    #   gameStates - the states to evaluate
+    #
+    # Return: A list of scores, one for each state
+    # #
+    def evaluateStates(self, gameStates):
+        results = [None] * len(gameStates)
+        batch = []
+        batchIndices = []
+        for i in range(len(gameStates)):
+            outcome, scores = self.getNetworkInputs(gameStates[i])
+            if outcome is not None:
+                results[i] = outcome
+            else:
+                batch.append(scores)
+                batchIndices.append(i)
+
+        if len(batch) > 0:
+            if numpy is None:
+                outputs = [self.propagateNeuralNetwork(scores)[self.NUM_NODES -1] for scores in batch]
+            else:
+                outputs = self.propagateNeuralNetworkBatch(batch)
+            for i, output in zip(batchIndices, outputs):
+                results[i] = output
+
+        return results
+
+    # #
+    # getNetworkInputs
+    # Description: Scores a game state on each of the inputs of the network
+    #
+    # Parameters:
+    #   gameState - the state to score
+    #
+    # Return: A tuple of (outcome, scores). If the game is won or lost, outcome is 1.0
+    #   or 0.0 and scores is None. Otherwise outcome is None and scores holds the inputs.
+    # #
+    def getNetworkInputs(self, gameState):
+        opponentId = self.getOpponentId(gameState)
+        if opponentId == self.playerId:
+            opponentId = (opponentId + 1)%2
+
+        enemyInv = gameState.inventories[opponentId]
+        ourInv = gameState.inventories[self.playerId]
+        if self.checkIfWon(ourInv, enemyInv):
+            return (1.0, None)
+        elif self.checkIfLose(ourInv, enemyInv):
+            return (0.0, None)
+
+        scores = []
+        scores.append(self.evalNumAnts(ourInv, enemyInv))
+        scores.append(self.evalType(ourInv))
+        scores.append(self.evalAntsHealth(ourInv, enemyInv))
+        scores.append(self.evalFood(ourInv, enemyInv))
+        scores.append(self.evalQueenThreat(gameState, ourInv, enemyInv))
+        scores.append(self.evalWorkerCarrying(gameState, ourInv))
+        scores.append(self.evalWorkerNotCarrying(gameState, ourInv))
+        scores.append(self.evalQueenPosition(ourInv))
+
+        return (None, scores)
+
     # #
     # CheckIfWon
     # Description: Checks if the gamestate is a win condition
@@ -834,6 +891,34 @@ class AIPlayer(Player):
 
         return nodeVals
 
+    # #
+    # propagateNeuralNetworkBatch
+    # Description: runs many sets of inputs through the network at once, with the
+    #   same weights and layout as propagateNeuralNetwork. Needs NumPy.
+    #
+    # Parameters:
+    #   batch - a list of input lists, one for each state
+    #
+    # Return: a list of the network's output for each set of inputs
+    # #
+    def propagateNeuralNetworkBatch(self, batch):
+        inputs = numpy.array(batch, dtype=float)
+        numHidden = self.NUM_NODES -1
+        numInputs = inputs.shape[1]
+        weights = numpy.array(self.networkWeights, dtype=float)
+
+        # weights 0-8 are biases, then the inputs->nodes weights (one row per
+        # input), then the nodes->output weights
+        biases = weights[:self.NUM_NODES]
+        counter = self.NUM_NODES
+        inputWeights = weights[counter:counter + numInputs*numHidden].reshape(numInputs, numHidden)
+        counter += numInputs*numHidden
+        outputWeights = weights[counter:counter + numHidden]
+
+        hidden = 1/(1+numpy.exp(-(inputs.dot(inputWeights) + biases[:numHidden])))
+        output = 1/(1+numpy.exp(-(hidden.dot(outputWeights) + biases[numHidden])))
+        return output.tolist()
+
     # #
     # g
     # Description: applies the 'g' function used by our neural network
@@ -1,8 +1,11 @@
 import random
+import heapq
+import collections
 from Constants import *
 from Ant import UNIT_STATS
 from Construction import CONSTR_STATS
 from Move import *
+from SpatialIndex import getSpatialIndex, indexKey
 
 #
 # AIPlayerUtils.py
@@ -114,15 +117,8 @@ def getConstrList(currentState,
 #
 # Return:  the construct at the coordinate or None if there is none
 def getConstrAt(state, coords):
-    #get a list of all constructs
-    allConstrs = getConstrList(state)
-
-    #search for one at the given coord
-    for constr in allConstrs:
-        if (constr.coords == coords):
-            return constr
-
-    return None  #not found
+    #look it up in the state's index of all constructs
+    return getSpatialIndex(state).constrs.get(indexKey(coords))
 
 ##
 # getAntAt
@@ -135,15 +131,8 @@ def getConstrAt(state, coords):
 #
 # Return:  the ant at the coordinate or None if there is none
 def getAntAt(state, coords):
-    #get a list of all constructs
-    allAnts = getAntList(state)
-
-    #search for one at the given coord
-    for ant in allAnts:
-        if (ant.coords == coords):
-            return ant
-
-    return None  #not found
+    #look it up in the state's index of all ants
+    return getSpatialIndex(state).ants.get(indexKey(coords))
     
 
 ##
@@ -195,10 +184,11 @@ def listReachableAdjacent(state, coords, movement):
     oneStep = listAdjacent(coords)
 
     #winnow the list based upon cell contents and cost to reach
+    index = getSpatialIndex(state)
     candMoves = []
     for cell in oneStep:
-        ant = getAntAt(state, cell)
-        constr = getConstrAt(state, cell)
+        ant = index.ants.get(cell)
+        constr = index.constrs.get(cell)
         moveCost = 1  #default cost
         if (constr != None):
             moveCost = CONSTR_STATS[constr.type][MOVE_COST]
@@ -236,10 +226,11 @@ def listAllMovementPaths(currentState, coords, movement):
     validMoves = list(oneStepMoves)
 
     #recurse for each adj cell to see if we can take additional steps
+    constrs = getSpatialIndex(currentState).constrs
     for move in oneStepMoves:
         #figure out what it would cost to get to the current dest
         moveCoords = move[-1]
-        constrAtDest = getConstrAt(currentState, moveCoords)
+        constrAtDest = constrs.get(moveCoords)
         cost = 1   #default
         if constrAtDest != None:
             cost = CONSTR_STATS[constrAtDest.type][MOVE_COST]
@@ -260,11 +251,79 @@ def listAllMovementPaths(currentState, coords, movement):
     return validMoves
 
 
+##
+# listShortestMovementPaths
+#
+# calculates one shortest legal path for a single ant to each cell it can
+# reach from a given position.  Moves along different paths to the same
+# cell have the same outcome in the game, so this lists far fewer moves
+# than listAllMovementPaths while reaching exactly the same cells.  Path
+# costs are the same as in listReachableAdjacent.  Like
+# listAllMovementPaths, the ant doesn't actually have to be there.
+#
+# Parameters:
+#    currentState - current game state
+#    coords       - where the ant is
+#    movement     - movement points ant has
+#    isQueen      - if True, the paths stay in the queen's territory (see
+#                   isPathOkForQueen)
+#
+# Return: a list of lists of coords (tuples), starting with the zero-step
+# move (used to activate attack on adjacent foe) and then one path for
+# each destination, nearest first.  Each sub-list of tuples is an
+# acceptable set of coords for a Move object
+def listShortestMovementPaths(currentState, coords, movement, isQueen = False):
+    index = getSpatialIndex(currentState)
+    coords = indexKey(coords)
+    #like listAllMovementPaths, an ant that can't move has no moves at all
+    if (movement <= 0): return []
+    if isQueen and not isPathOkForQueen([coords]):
+        return []
+
+    #Dijkstra's algorithm from the ant's position, remembering the cell
+    #each cell was first reached from at its lowest cost
+    cost = { coords : 0 }
+    previous = { coords : None }
+    heap = [ (0, coords) ]
+    order = []
+    while (len(heap) > 0):
+        dist, cell = heapq.heappop(heap)
+        if (dist > cost[cell]): continue   #already reached more cheaply
+        order.append(cell)
+        for newCell in listAdjacent(cell):
+            #cells with ants in them can't be entered or passed through
+            if (index.ants.get(newCell) != None): continue
+            if isQueen and not isPathOkForQueen([newCell]): continue
+            constr = index.constrs.get(newCell)
+            newDist = dist + 1   #default cost
+            if (constr != None):
+                newDist = dist + CONSTR_STATS[constr.type][MOVE_COST]
+            if (newDist > movement): continue
+            if (not cost.has_key(newCell)) or (newDist < cost[newCell]):
+                cost[newCell] = newDist
+                previous[newCell] = cell
+                heapq.heappush(heap, (newDist, newCell))
+
+    #walk back from each destination to build its path
+    result = []
+    for cell in order:
+        path = []
+        while (cell != None):
+            path.append(cell)
+            cell = previous[cell]
+        path.reverse()
+        result.append(path)
+
+    return result
+
+
 ##
 # stepsToReach
 #
 # estimates the shortest distance between two cells taking
-# movement costs into account.
+# movement costs into account.  The estimates for every pair of cells are
+# computed once per layout of the board (see getDistanceTable), so each
+# call is a table lookup.
 #
 #Parameters:
 #   currentState   - The state of the game (GameState)
@@ -277,28 +336,81 @@ def stepsToReach(currentState, src, dst):
     if (not legalCoord(src)): return -1
     if (not legalCoord(dst)): return -1
 
+    table = getDistanceTable(currentState)
+    return table[src[0] * BOARD_LENGTH + src[1]][dst[0] * BOARD_LENGTH + dst[1]]
+
+#Tables built by getDistanceTable, keyed by the cells whose movement cost
+#isn't 1.  Cleared when it reaches MAX_DISTANCE_TABLES entries.
+distanceTables = {}
+MAX_DISTANCE_TABLES = 32
+
+##
+# getDistanceTable
+#
+# returns the table of stepsToReach estimates for the constructions in
+# the given state.  Distances only depend on the cells that don't cost 1
+# to enter, i.e. the grass, which doesn't change after setup, so every
+# state of a game shares the same table.  Building or capturing a tunnel
+# doesn't change any distance.
+#
+#Parameters:
+#   currentState   - The state of the game (GameState)
+#
+# Return: a list with a list for each source cell, each holding the
+# estimate to every destination cell.  Cells are numbered
+# x * BOARD_LENGTH + y.
+def getDistanceTable(currentState):
+    index = getSpatialIndex(currentState)
+    if (index.distances == None):
+        costs = {}
+        for coords, constr in index.constrs.iteritems():
+            cost = CONSTR_STATS[constr.type][MOVE_COST]
+            if (cost != 1):
+                costs[coords] = cost
+        key = frozenset(costs.iteritems())
+
+        table = distanceTables.get(key)
+        if (table == None):
+            if (len(distanceTables) >= MAX_DISTANCE_TABLES):
+                distanceTables.clear()
+            table = [listStepsFrom((x, y), costs)
+                     for x in xrange(0, BOARD_LENGTH) for y in xrange(0, BOARD_LENGTH)]
+            distanceTables[key] = table
+        index.distances = table
+
+    return index.distances
+
+##
+# listStepsFrom
+#
+# estimates the distance from a cell to every cell of the board, the way
+# stepsToReach always has: a breadth first search that lowers the cost of
+# a queued cell when it finds a cheaper way there, but doesn't revisit
+# cells that were already processed.  The estimate for a cell is its cost
+# when it is taken off the queue.
+#
+#Parameters:
+#   src   - starting position (an x,y coord)
+#   costs - movement cost of each cell that doesn't cost 1 ({coord: int})
+#
+# Return: a list of the estimate for each cell, numbered x * BOARD_LENGTH + y
+def listStepsFrom(src, costs):
+    result = [ -1 ] * (BOARD_LENGTH * BOARD_LENGTH)
+
     #a dictionary of already visted cells and the corresponding cost to reach
     visited = { src : 0 }
-    #a list of to be processed cells
-    queue = [ src ]
+    #a queue of to be processed cells
+    queue = collections.deque([ src ])
 
     #this loops processes cells in the queue until it is empty
     while(len(queue) > 0):
-        cell = queue.pop(0)
-
-        #if this cell is our destination we are done
-        if (cell == dst):
-            return visited[cell]
+        cell = queue.popleft()
+        result[cell[0] * BOARD_LENGTH + cell[1]] = visited[cell]
 
         #calc distance to all cells adj to this one assuming we reach them
         #from this one
-        nextSteps = listAdjacent(cell)
-        for newCell in nextSteps:
-            constrAtDest = getConstrAt(currentState, newCell)
-            cost = 1  #default
-            if constrAtDest != None:
-                cost = CONSTR_STATS[constrAtDest.type][MOVE_COST]
-            dist = visited[cell] + cost
+        for newCell in listAdjacent(cell):
+            dist = visited[cell] + costs.get(newCell, 1)
 
             #if the new distance is best so far, update the visited dict
             if (visited.has_key(newCell)):
@@ -310,8 +422,7 @@ def stepsToReach(currentState, src, dst):
                 visited[newCell] = dist
                 queue.append(newCell)
 
-    #we should never reach this point
-    return -1
+    return result
 
 ##
 # listAllBuildMoves
@@ -329,8 +440,9 @@ def listAllBuildMoves(currentState):
     #if the anthill is unoccupied list a BUILD move for each ant
     #that there is enough food to build
     myInv = getCurrPlayerInventory(currentState)
+    index = getSpatialIndex(currentState)
     hill = myInv.getAnthill()
-    if (getAntAt(currentState, hill.coords)  == None):
+    if (index.ants.get(indexKey(hill.coords)) == None):
         for type in range(WORKER, R_SOLDIER + 1):
             cost = UNIT_STATS[type][COST]
             if (cost <= myInv.foodCount):
@@ -345,7 +457,7 @@ def listAllBuildMoves(currentState):
     for ant in myInv.ants:
         if (ant.type != WORKER): continue   #only workers can build tunnels
         if (ant.hasMoved): continue         #this worker has already moved
-        if (getConstrAt(currentState, ant.coords) == None):
+        if (index.constrs.get(indexKey(ant.coords)) == None):
             #see if there is adj food
             inTheClear = True   #assume ok to build until proven otherwise
             for coord in listAdjacent(ant.coords):
@@ -353,7 +465,7 @@ def listAllBuildMoves(currentState):
                     continue
 
                 #is there food here?
-                constrHere = getConstrAt(currentState, coord)
+                constrHere = index.constrs.get(coord)
                 if (constrHere != None) and (constrHere.type == FOOD):
                     inTheClear = False
                     break
@@ -402,18 +514,12 @@ def listAllMovementMoves(currentState):
         #skip ants that have already moved
         if (ant.hasMoved): continue
 
-        #create a Move object for each valid movement path
-        allPaths = listAllMovementPaths(currentState,
-                                        ant.coords,
-                                        UNIT_STATS[ant.type][MOVEMENT])
-
-        #remove moves that take the queen out of her territory
-        if (ant.type == QUEEN):
-            tmpList = []
-            for path in allPaths:
-                if (isPathOkForQueen(path)):
-                    tmpList.append(path)
-            allPaths = tmpList
+        #create a Move object for one path to each reachable cell,
+        #keeping the queen in her territory
+        allPaths = listShortestMovementPaths(currentState,
+                                             ant.coords,
+                                             UNIT_STATS[ant.type][MOVEMENT],
+                                             ant.type == QUEEN)
 
         #construct the list of moves using the paths
         for path in allPaths:
@@ -422,17 +528,44 @@ def listAllMovementMoves(currentState):
     return result
 
 
+##
+# getLegalMovesKey
+#
+# returns everything about a state that the legal moves of the player
+# whose turn it is depend on, to tell whether the moves listed for a
+# state still apply to it
+#
+# Parameters:
+#   currentState - the current state
+#
+# Returns: a tuple that compares equal for states with the same moves
+def getLegalMovesKey(currentState):
+    pieces = []
+    for inv in currentState.inventories:
+        pieces.append((inv.player, inv.foodCount))
+        for ant in inv.ants:
+            pieces.append((ant.coords, ant.type, ant.player, ant.hasMoved))
+        for constr in inv.constrs:
+            pieces.append((constr.coords, constr.type, getattr(constr, "player", None)))
+    return (currentState.phase, currentState.whoseTurn, tuple(pieces))
+
 ##
 # listAllLegalMoves
 #
 # determines all the legal moves that can be made by the player
-# whose turn it currently is.
+# whose turn it currently is.  If the game listed them when it handed
+# out the state (see Rules.offerLegalMoves) and the state hasn't changed
+# since, those moves are returned without listing them again.
 #
 # Parameters:
 #   currentState - the current state
 #
 # Returns:  a list of Move objects
 def listAllLegalMoves(currentState):
+    legalMoves = getattr(currentState, "legalMoves", None)
+    if (legalMoves != None and currentState.legalMovesKey == getLegalMovesKey(currentState)):
+        return list(legalMoves)
+
     result = []
     result.extend(listAllMovementMoves(currentState))
     result.extend(listAllBuildMoves(currentState))
@@ -1,4 +1,5 @@
 from Constants import *
+from SpatialIndex import TrackedAttribute, untrackedState
 
 #Unit stats array [ant type][stat]
 #(movement, health, attack, range, cost)
@@ -27,6 +28,10 @@ UNIT_STATS.append((1, 2, 1, 3, 2)) #Ranged soldier
 #   player - The id of the player that owns the Ant
 ##
 class Ant(object):
+    #assignments are tracked to keep spatial indexes up to date (see SpatialIndex)
+    coords = TrackedAttribute("coords")
+    #pickled and copied without the index that owns it
+    __getstate__ = untrackedState
     
     ##
     #__init__
@@ -46,8 +51,9 @@ class Ant(object):
         self.health = UNIT_STATS[self.type][HEALTH]
 
     def clone(self):
-        rtnAnt = Ant(self.coords, self.type, self.player)
-        rtnAnt.hasMoved = self.hasMoved
-        rtnAnt.carrying = self.carrying
-        rtnAnt.health = self.health
+        #fill in the attributes directly rather than through __init__ so
+        #that cloning doesn't count as moving the ant (see SpatialIndex)
+        rtnAnt = Ant.__new__(Ant)
+        rtnAnt.__dict__ = {"coords": self.coords, "type": self.type, "player": self.player,
+                           "hasMoved": self.hasMoved, "carrying": self.carrying, "health": self.health}
         return rtnAnt
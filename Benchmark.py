@@ -0,0 +1,322 @@
+import os, sys, json, time, random, imp, platform
+import Rules
+from Constants import *
+from Player import Player
+from AIPlayerUtils import listAllLegalMoves, stepsToReach, getAntAt
+
+#
+# Benchmark.py
+#
+# Measures the throughput of the engine code the AIs and the referee spend
+# their time in, on a fixed corpus of mid-game positions, and prints the
+# results as JSON so that runs before and after a change can be compared.
+#
+# The corpus is built by playing seeded Random-vs-Random games with
+# Rules.playGame and keeping every CORPUS_STRIDE-th state a player is
+# asked to move in, from its CORPUS_START-th move on.  The same seed
+# always gives the same corpus.  Each benchmark runs over the whole
+# corpus --repeat times and reports its best run, so the caches the
+# engine keeps on a state (see SpatialIndex) are warm, as they are for an
+# AI searching a position.
+#
+#     python Benchmark.py [--positions N] [--seed N] [--repeat N] [--games N]
+#         [--only NAME,NAME...] [--output FILE] [--baseline FILE] [--tolerance F]
+#
+# --games is the number of whole games the "games" benchmark plays.
+# --output also writes the JSON to FILE.  --baseline compares each
+# benchmark with the same one in the JSON of an earlier run and exits with
+# status 1 if any is more than --tolerance (default 0.1, i.e. 10%) slower.
+#
+
+#Moves to skip at the start of each game before keeping positions
+CORPUS_START = 20
+#Keep every CORPUS_STRIDE-th position after that
+CORPUS_STRIDE = 7
+#Longest game played while building the corpus or benchmarking games
+MAX_PLIES = 20000
+
+##
+# loadRandomAI
+#
+# Description: Returns the AIPlayer class of the Random AI in the AI folder
+#
+def loadRandomAI():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AI", "Random.py")
+    return imp.load_source("Random", path).AIPlayer
+
+##
+# CorpusPlayer
+# Description: A Random player that keeps copies of the positions it is
+#   asked to move in
+#
+# Variables:
+#   player - the Random player that chooses the moves (Player)
+#   positions - the kept positions (GameState[])
+#   moves - the number of moves made so far (int)
+#   numPositions - the number of positions to keep at most (int)
+##
+class CorpusPlayer(Player):
+
+    ##
+    # __init__
+    # Description: Wraps a Random player, adding the positions it keeps to
+    #     the given list
+    ##
+    def __init__(self, inputPlayer, inputPositions, inputNumPositions):
+        super(CorpusPlayer, self).__init__(inputPlayer.playerId, inputPlayer.author)
+        self.player = inputPlayer
+        self.positions = inputPositions
+        self.moves = 0
+        self.numPositions = inputNumPositions
+
+    def getPlacement(self, currentState):
+        return self.player.getPlacement(currentState)
+
+    def getMove(self, currentState):
+        if self.moves >= CORPUS_START and (self.moves - CORPUS_START) % CORPUS_STRIDE == 0 \
+           and len(self.positions) < self.numPositions:
+            self.positions.append(currentState.clone())
+        self.moves += 1
+        return self.player.getMove(currentState)
+
+    def getAttack(self, currentState, attackingAnt, enemyLocations):
+        return self.player.getAttack(currentState, attackingAnt, enemyLocations)
+
+##
+# buildCorpus
+#
+# Description: Plays seeded Random-vs-Random games until numPositions
+# positions are collected
+#
+# Parameters:
+#   seed - the seed of the random module for the games (int)
+#   numPositions - the number of positions to collect (int)
+#
+# Return: the positions, each as the player to move sees it (GameState[])
+#
+def buildCorpus(seed, numPositions):
+    randomAI = loadRandomAI()
+    random.seed(seed)
+    positions = []
+    while len(positions) < numPositions:
+        players = [CorpusPlayer(randomAI(playerId), positions, numPositions)
+                   for playerId in (PLAYER_ONE, PLAYER_TWO)]
+        Rules.playGame(players, MAX_PLIES)
+    return positions
+
+##
+# The benchmarks.  Each takes the corpus (and what prepareBenchmark made
+# of it), does its work once over every position and returns the number of
+# operations it timed.
+##
+
+def benchClone(corpus, prepared):
+    for state in corpus:
+        state.clone()
+    return len(corpus)
+
+def benchFastclone(corpus, prepared):
+    for state in corpus:
+        state.fastclone()
+    return len(corpus)
+
+def benchFlipBoard(corpus, prepared):
+    #flipping twice leaves the position as it was
+    for state in corpus:
+        state.flipBoard()
+        state.flipBoard()
+    return 2 * len(corpus)
+
+def benchPlayerView(corpus, prepared):
+    for state in corpus:
+        Rules.getPlayerView(state)
+    return len(corpus)
+
+def benchListAllLegalMoves(corpus, prepared):
+    for state in corpus:
+        listAllLegalMoves(state)
+    return len(corpus)
+
+def benchStepsToReach(corpus, prepared):
+    count = 0
+    for state, pairs in zip(corpus, prepared):
+        for src, dst in pairs:
+            stepsToReach(state, src, dst)
+        count += len(pairs)
+    return count
+
+def benchGetAntAt(corpus, prepared):
+    cells = [(x, y) for x in xrange(0, BOARD_LENGTH) for y in xrange(0, BOARD_LENGTH)]
+    for state in corpus:
+        for coords in cells:
+            getAntAt(state, coords)
+    return len(corpus) * len(cells)
+
+def benchIsValidMove(corpus, prepared):
+    count = 0
+    for state, moves in zip(corpus, prepared):
+        for move in moves:
+            Rules.isValidMove(state, move)
+        count += len(moves)
+    return count
+
+def benchGames(corpus, prepared):
+    randomAI, numGames, seed = prepared
+    random.seed(seed)
+    for i in xrange(0, numGames):
+        Rules.playGame([randomAI(PLAYER_ONE), randomAI(PLAYER_TWO)], MAX_PLIES)
+    return numGames
+
+#The benchmarks, in the order they run
+BENCHMARKS = [("clone", benchClone),
+              ("fastclone", benchFastclone),
+              ("flipBoard", benchFlipBoard),
+              ("playerView", benchPlayerView),
+              ("listAllLegalMoves", benchListAllLegalMoves),
+              ("stepsToReach", benchStepsToReach),
+              ("getAntAt", benchGetAntAt),
+              ("isValidMove", benchIsValidMove),
+              ("games", benchGames)]
+
+##
+# prepareBenchmark
+#
+# Description: Builds the untimed input a benchmark needs besides the corpus
+#
+# Parameters:
+#   name - the name of the benchmark (string)
+#   corpus - the positions (GameState[])
+#   numGames - the number of games for the games benchmark (int)
+#   seed - the seed the corpus was built with (int)
+#
+def prepareBenchmark(name, corpus, numGames, seed):
+    if name == "stepsToReach":
+        #from every ant to every ant and construction
+        prepared = []
+        for state in corpus:
+            coords = [ant.coords for inv in state.inventories for ant in inv.ants] + \
+                     [constr.coords for inv in state.inventories for constr in inv.constrs]
+            prepared.append([(src, dst) for src in coords for dst in coords])
+        return prepared
+    elif name == "isValidMove":
+        return [listAllLegalMoves(state) for state in corpus]
+    elif name == "games":
+        return (loadRandomAI(), numGames, seed)
+    return None
+
+##
+# runBenchmark
+#
+# Description: Times a benchmark repeat times over the corpus
+#
+# Return: a dictionary of the number of operations per run, the best and
+# mean time of a run in seconds and the operations per second of the best
+# run
+#
+def runBenchmark(function, corpus, prepared, repeat):
+    times = []
+    ops = 0
+    for i in xrange(0, repeat):
+        startTime = time.time()
+        ops = function(corpus, prepared)
+        times.append(time.time() - startTime)
+    best = max(min(times), 1e-9)
+    return {"ops": ops,
+            "best": round(best, 6),
+            "mean": round(sum(times) / len(times), 6),
+            "opsPerSec": round(ops / best, 1)}
+
+##
+# compareResults
+#
+# Description: Compares the results of a run with those of an earlier run
+#
+# Parameters:
+#   results - the benchmarks of this run ({name: {}})
+#   baseline - the benchmarks of the earlier run ({name: {}})
+#   tolerance - the fraction by which a benchmark may slow down (float)
+#
+# Return: a tuple of the relative change in operations per second of each
+# benchmark in both runs ({name: float}) and the names of the benchmarks
+# that slowed down by more than tolerance (string[])
+#
+def compareResults(results, baseline, tolerance):
+    changes = {}
+    regressions = []
+    for name in results:
+        if name in baseline and baseline[name]["opsPerSec"] > 0:
+            change = results[name]["opsPerSec"] / baseline[name]["opsPerSec"] - 1
+            changes[name] = round(change, 3)
+            if change < -tolerance:
+                regressions.append(name)
+    return changes, regressions
+
+if __name__ == '__main__':
+    numPositions = 200
+    seed = 0
+    repeat = 5
+    numGames = 20
+    only = None
+    outputFile = None
+    baselineFile = None
+    tolerance = 0.1
+    index = 1
+    while index < len(sys.argv):
+        if sys.argv[index] == "--positions" and index + 1 < len(sys.argv):
+            index += 1
+            numPositions = int(sys.argv[index])
+        elif sys.argv[index] == "--seed" and index + 1 < len(sys.argv):
+            index += 1
+            seed = int(sys.argv[index])
+        elif sys.argv[index] == "--repeat" and index + 1 < len(sys.argv):
+            index += 1
+            repeat = int(sys.argv[index])
+        elif sys.argv[index] == "--games" and index + 1 < len(sys.argv):
+            index += 1
+            numGames = int(sys.argv[index])
+        elif sys.argv[index] == "--only" and index + 1 < len(sys.argv):
+            index += 1
+            only = sys.argv[index].split(",")
+        elif sys.argv[index] == "--output" and index + 1 < len(sys.argv):
+            index += 1
+            outputFile = sys.argv[index]
+        elif sys.argv[index] == "--baseline" and index + 1 < len(sys.argv):
+            index += 1
+            baselineFile = sys.argv[index]
+        elif sys.argv[index] == "--tolerance" and index + 1 < len(sys.argv):
+            index += 1
+            tolerance = float(sys.argv[index])
+        else:
+            print "ERROR:  unknown argument '" + sys.argv[index] + "'"
+            sys.exit(1)
+        index += 1
+
+    names = [name for name, function in BENCHMARKS]
+    if only != None and [name for name in only if name not in names]:
+        print "ERROR:  the benchmarks are " + ", ".join(names)
+        sys.exit(1)
+
+    corpus = buildCorpus(seed, numPositions)
+    results = {}
+    for name, function in BENCHMARKS:
+        if only == None or name in only:
+            prepared = prepareBenchmark(name, corpus, numGames, seed)
+            results[name] = runBenchmark(function, corpus, prepared, repeat)
+
+    report = {"python": platform.python_version(),
+              "seed": seed,
+              "positions": len(corpus),
+              "repeat": repeat,
+              "benchmarks": results}
+    regressions = []
+    if baselineFile != None:
+        with open(baselineFile, "r") as baseline:
+            report["changes"], regressions = compareResults(results, json.load(baseline)["benchmarks"], tolerance)
+        report["regressions"] = regressions
+
+    print json.dumps(report, indent = 2, sort_keys = True)
+    if outputFile != None:
+        with open(outputFile, "w") as output:
+            json.dump(report, output, indent = 2, sort_keys = True)
+    if regressions:
+        sys.exit(1)
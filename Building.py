@@ -28,4 +28,9 @@ class Building(Construction):
         self.captureHealth = CONSTR_STATS[inputType][CAP_HEALTH]
     
     def clone(self):
-        return Building(self.coords, self.type, self.player)
+        #fill in the attributes directly rather than through __init__ so
+        #that cloning doesn't count as moving the building (see SpatialIndex)
+        rtnBuilding = Building.__new__(Building)
+        rtnBuilding.__dict__ = {"coords": self.coords, "type": self.type, "movementCost": self.movementCost,
+                                "player": self.player, "captureHealth": CONSTR_STATS[self.type][CAP_HEALTH]}
+        return rtnBuilding
@@ -65,10 +65,18 @@ ACTIVE = 1
 INVALID_PLACEMENT = 0
 INVALID_MOVE = 1
 INVALID_ATTACK = 2
+MOVE_TIMEOUT = 3
 
 #Max time (seconds) an AI is allowed to make a move
 AI_MOVE_TIMEOUT = 30
 
+#Playback speeds of an AI vs. AI game once Continue is clicked, as (name,
+#seconds each placement, move or attack is shown for, turns played between
+#drawings of the board).  None shows steps for no longer than a frame, or
+#draws the board after every step.  The first is the default, which plays
+#without delay like Continue always did; the timed speeds are opt-in.
+AI_SPEEDS = [("Max", None, None), ("Every 10 turns", None, 10), ("1x", 0.5, None), ("10x", 0.05, None)]
+
 ##
 # moveTypeToStr
 #
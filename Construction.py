@@ -1,4 +1,5 @@
 from Constants import *
+from SpatialIndex import TrackedAttribute, untrackedState
 
 #Contruction stats array
 #(movement cost, capture health, build cost)[type]
@@ -21,6 +22,10 @@ CONSTR_STATS.append((1,None,None)) #Food
 #       down and to the right.
 ##
 class Construction(object):
+    #assignments are tracked to keep spatial indexes up to date (see SpatialIndex)
+    coords = TrackedAttribute("coords")
+    #pickled and copied without the index that owns it
+    __getstate__ = untrackedState
 
     ##
     #__init__
@@ -36,4 +41,8 @@ class Construction(object):
         self.movementCost = CONSTR_STATS[inputType][MOVE_COST]
     
     def clone(self):
-        return Construction(self.coords, self.type)
\ No newline at end of file
+        #fill in the attributes directly rather than through __init__ so
+        #that cloning doesn't count as moving the construction (see SpatialIndex)
+        rtnConstr = Construction.__new__(Construction)
+        rtnConstr.__dict__ = {"coords": self.coords, "type": self.type, "movementCost": self.movementCost}
+        return rtnConstr
\ No newline at end of file
@@ -1,6 +1,9 @@
-import os, re, sys, math, multiprocessing, time, random
+import os, re, sys, math, multiprocessing, time, random, json, Queue
 import HumanPlayer
-from UserInterface import *
+from PlayerProcess import PlayerProcess
+from Profiler import Profiler, runProfiled
+from GameRecord import GameRecord, writeRecord
+import Rules
 from Construction import *
 from Constants import *
 from GameState import *
@@ -21,18 +24,42 @@ class Game(object):
     #__init__
     #Description: Initializes the game's attributes and UI.
     #
+    #Parameters:
+    #   headless - if True the game runs without a display and pygame is
+    #       never imported (boolean)
     ##
-    def __init__(self):
+    def __init__(self, headless = False):
         #Initialize the game variables
         self.players = []
+        #the index in AI_SPEEDS of the playback speed of AI vs. AI games
+        self.aiSpeed = 0
         self.initGame()
         #Initializes the UI variables
-        self.ui = UserInterface((865,695))
+        self.headless = headless
+        if self.headless:
+            from HeadlessInterface import HeadlessInterface
+            self.ui = HeadlessInterface((865,695))
+        else:
+            from UserInterface import UserInterface
+            self.ui = UserInterface((865,695))
         self.initUI()
         #Initializes tournament mode variables
         self.playerScores = [] # [[author,wins,losses], ...]
         self.gamesToPlay = [] #((p1.id, p2.id), numGames)
         self.numGames = None
+        #number of worker processes a headless tournament is spread across
+        self.numProcesses = 1
+        #seconds an AI gets per call before it forfeits (0 runs AIs in this process, untimed)
+        self.moveTimeout = AI_MOVE_TIMEOUT
+        #the process each AI player runs in when moves are timed
+        self.playerProcesses = {}
+        #latency histograms and node counts of each AI's calls, and the
+        #directory their cProfile statistics are written to (or None)
+        self.profiler = Profiler()
+        self.profileDir = None
+        #the record of the game in progress, and the archive finished games are appended to (or None)
+        self.record = None
+        self.recordFile = None
         #debug mode allows initial setup in human vs. AI to be automated
         self.debugMode = False
         self.randomSetup = False
@@ -41,9 +68,26 @@ class Game(object):
     #processCommandLine
     #
     # parses the command line arguments and configures the game
-    # appropriately.  Currently only "debug" arguments are supported. In this
-    # format: 
+    # appropriately.  Currently "debug" and "tournament" arguments are
+    # supported. In these formats:
+    #            python Game.py [--fps N]
     #            python Game.py debug [<myAIName>] [random]
+    #            python Game.py tournament [--headless] [<AIName> ...] [--games N]
+    #                                          [--processes N] [--timeout S]
+    #                                          [--record FILE] [--profile DIR]
+    #                                          [--fps N]
+    #
+    # --fps is the number of frames per second the window is drawn at, at
+    # most (default MAX_FPS in UserInterface).
+    # --processes only applies to headless tournaments; 0 uses every core.
+    # --timeout is the number of seconds an AI gets per call (default
+    # AI_MOVE_TIMEOUT); 0 runs the AIs untimed.  Debug mode is always untimed
+    # so the AI can be stepped through in a debugger.  --record appends the
+    # record of every finished game to an archive file (see GameRecord).
+    # --profile runs every AI call under cProfile and writes each author's
+    # statistics to DIR/<author>.prof when the tournament ends.
+    #
+    # Return: False if a tournament was requested but could not be set up
     def processCommandLine(self):
         #process command line arguments
         if (len(sys.argv) > 1):
@@ -51,6 +95,7 @@ class Game(object):
             #specific AI
             if sys.argv[1] == "debug":
                 self.debugMode = True
+                self.moveTimeout = 0
                 self.humanPathCallback()   #press the "Human vs. AI" button
                 #AI name should be specified as second command line arg
                 index = -1
@@ -74,6 +119,79 @@ class Game(object):
                 #random layout.  
                 if (len(sys.argv) > 3) and (sys.argv[3] == "random"):
                     self.randomSetup = True
+            #player wants to run a tournament straight from the command line
+            elif sys.argv[1] == "tournament":
+                authors = []
+                numGames = 1
+                index = 2
+                while index < len(sys.argv):
+                    if sys.argv[index] == "--games" and index + 1 < len(sys.argv):
+                        index += 1
+                        numGames = int(sys.argv[index])
+                    elif sys.argv[index] == "--processes" and index + 1 < len(sys.argv):
+                        index += 1
+                        self.numProcesses = int(sys.argv[index])
+                        if self.numProcesses <= 0:
+                            self.numProcesses = multiprocessing.cpu_count()
+                    elif sys.argv[index] == "--timeout" and index + 1 < len(sys.argv):
+                        index += 1
+                        self.moveTimeout = float(sys.argv[index])
+                    elif sys.argv[index] == "--record" and index + 1 < len(sys.argv):
+                        index += 1
+                        self.recordFile = sys.argv[index]
+                    elif sys.argv[index] == "--profile" and index + 1 < len(sys.argv):
+                        index += 1
+                        self.profileDir = sys.argv[index]
+                        self.profiler.profile = True
+                    elif sys.argv[index] == "--fps" and index + 1 < len(sys.argv):
+                        index += 1
+                        self.ui.maxFPS = max(1, int(sys.argv[index]))
+                    elif sys.argv[index] != "--headless":
+                        authors.append(sys.argv[index])
+                    index += 1
+                return self.setupTournament(authors, numGames)
+            elif sys.argv[1] == "--fps" and len(sys.argv) > 2:
+                self.ui.maxFPS = max(1, int(sys.argv[2]))
+        return not self.headless
+
+    ##
+    #setupTournament
+    #
+    # Description: presses the same buttons a user would to start a
+    # tournament: selects the Tournament mode, ticks the given AIs, enters
+    # the number of games and clicks "Start".
+    #
+    # Parameters:
+    #   authors  - the author names of the AIs to play.  An empty list
+    #              selects every AI in the AI folder. (string[])
+    #   numGames - the number of games each pairing plays (int)
+    #
+    # Return: True if the tournament was started
+    def setupTournament(self, authors, numGames):
+        self.tourneyPathCallback()   #press the "Tournament" button
+        if self.mode != TOURNAMENT_MODE:
+            print "ERROR:  " + self.ui.lastNotification
+            return False
+        #make sure every requested AI exists
+        for ainame in authors:
+            if ainame not in [player[0].author for player in self.players]:
+                print "ERROR:  AI '" + ainame + "' not found."
+                print "Please specify some of the following:"
+                for player in self.players:
+                    print '    "' + player[0].author + '"'
+                return False
+        #tick the requested AIs and click "Submit"
+        for index in range(0, len(self.players)):
+            if len(authors) == 0 or self.players[index][0].author in authors:
+                self.checkBoxClickedCallback(index)
+        self.submitClickedCallback()
+        if self.ui.choosingAIs:
+            print "ERROR:  " + self.ui.lastNotification
+            return False
+        #enter the number of games and click "Start"
+        self.ui.textBoxContent = str(numGames)
+        self.startGameCallback()
+        return True
         
 
 
@@ -85,12 +203,19 @@ class Game(object):
     #
     ##
     def start(self):
-        self.processCommandLine()
+        ready = self.processCommandLine()
+        if self.headless:
+            if not ready:
+                print "ERROR:  headless mode needs a tournament, e.g."
+                print "    python Game.py tournament --headless <AIName> <AIName> --games N"
+                sys.exit(1)
+            self.runHeadlessTournament()
+            return
 
         while True:
             #Determine current chosen game mode. Enter different execution paths
             #based on the mode, which must be chosen by clicking a button.
-            self.ui.drawBoard(self.state, self.mode)
+            self.ui.drawBoard(self.state, self.mode, self.state.phase == MENU_PHASE)
             
             if not self.errorNotify:
                 if self.mode == None:
@@ -104,7 +229,154 @@ class Game(object):
                 self.ui.notify("")
                  
                 self.runGame()   
-                self.resolveEndGame()
+                #a game reset while an AI was thinking never ended
+                if not self.callAbandoned:
+                    self.resolveEndGame()
+
+    ##
+    # runHeadlessTournament
+    #
+    # Description: plays out the tournament that was set up from the
+    # command line without drawing anything, then prints the score table
+    # and the profile of the AIs' calls, followed by a one-line JSON summary
+    # for scripts to parse.
+    #
+    ##
+    def runHeadlessTournament(self):
+        if self.numProcesses > 1:
+            self.runParallelTournament()
+        while self.state.phase != MENU_PHASE:
+            self.runGame()
+            self.resolveEndGame()
+
+        #final scores live on in the UI after the tournament is reset
+        self.ui.drawTable()
+        self.dumpProfile()
+        scores = [{"author": score[0], "wins": score[1], "losses": score[2]}
+                  for score in self.ui.tournamentScores]
+        summary = {"games": sum([score[1] for score in self.ui.tournamentScores]),
+                   "elapsed": round(self.ui.tournamentElapsed, 3),
+                   "scores": scores,
+                   "profile": self.profiler.summary()}
+        print json.dumps(summary)
+
+    ##
+    # dumpProfile
+    #
+    # Description: prints the latency and node counts of each AI's calls
+    # over all of the games played so far, and writes their cProfile
+    # statistics if --profile was given.
+    #
+    ##
+    def dumpProfile(self):
+        print
+        self.profiler.printTable()
+        if self.profileDir != None:
+            for path in self.profiler.dumpStats(self.profileDir):
+                print "Wrote " + path
+
+    ##
+    # runParallelTournament
+    #
+    # Description: plays every remaining game in self.gamesToPlay on a pool
+    # of worker processes.  Each pairing is cut into chunks of games so a
+    # long pairing is shared between several workers.  Each worker loads the
+    # AIs once and streams back one (winner, loser) result per game, which
+    # is merged into self.playerScores, followed by its profile.  Game
+    # records are sent back too if they are being kept, and only this
+    # process writes the archive.  Leaves the game in MENU_PHASE, just
+    # like the last call to resolveEndGame does.
+    #
+    ##
+    def runParallelTournament(self):
+        startTime = time.time()
+        authors = [player[0].author for player in self.players]
+        tasks = multiprocessing.Queue()
+        results = multiprocessing.Queue()
+
+        #cut every pairing into chunks of at most chunkSize games
+        numTasks = 0
+        numResults = 0
+        for pairing in self.gamesToPlay:
+            chunkSize = int(math.ceil(float(pairing[1]) / self.numProcesses))
+            remaining = pairing[1]
+            while remaining > 0:
+                tasks.put((pairing[0], min(chunkSize, remaining)))
+                remaining -= chunkSize
+                numTasks += 1
+            numResults += pairing[1]
+
+        #start the workers; each one stops when it takes a None task
+        workers = []
+        for i in range(0, min(self.numProcesses, numTasks)):
+            tasks.put(None)
+            worker = multiprocessing.Process(target = tournamentWorker,
+                                             args = (authors, self.moveTimeout, tasks, results,
+                                                     self.recordFile != None, self.profiler.profile))
+            worker.start()
+            workers.append(worker)
+
+        #merge the results as they arrive
+        self.ui.tournamentScores = self.playerScores
+        numProfiles = len(workers)
+        archive = None
+        if self.recordFile != None:
+            archive = open(self.recordFile, "ab")
+        while numResults > 0 or numProfiles > 0:
+            try:
+                kind, result = results.get(True, 1.0)
+            except Queue.Empty:
+                #a worker that died with an error will never report its games
+                if [worker for worker in workers if worker.exitcode not in (None, 0)]:
+                    print "ERROR:  a tournament worker process failed."
+                    for worker in workers:
+                        worker.terminate()
+                    sys.exit(1)
+                continue
+            if kind == "record":
+                writeRecord(archive, result)
+                continue
+            if kind == "profile":
+                self.profiler.merge(result)
+                numProfiles -= 1
+                continue
+            winner, loser = result
+            self.playerScores[winner][1] += 1
+            self.playerScores[loser][2] += 1
+            numResults -= 1
+        for worker in workers:
+            worker.join()
+        if archive != None:
+            archive.close()
+
+        #reset tournament stuff the same way resolveEndGame does
+        self.ui.tournamentElapsed = time.time() - startTime
+        self.ui.tournamentInProgress = False
+        self.gamesToPlay = []
+        self.numGames = 0
+        self.playerScores = []
+        self.initGame()
+        self.mode = TOURNAMENT_MODE
+
+    ##
+    # playGame
+    #
+    # Description: plays a single headless game between two of the loaded
+    # players, outside of the usual tournament bookkeeping.
+    #
+    # Parameters:
+    #   playerOneId - index into self.players of the first player (int)
+    #   playerTwoId - index into self.players of the second player (int)
+    #
+    # Return: the (winner, loser) player ids
+    ##
+    def playGame(self, playerOneId, playerTwoId):
+        self.initGame()
+        self.mode = TOURNAMENT_MODE
+        self.currentPlayers = [self.players[playerOneId][0], self.players[playerTwoId][0]]
+        self.state.phase = SETUP_PHASE_1
+        self.runGame()
+        return (self.winner, self.loser)
 
     ##
     # runGame
@@ -115,75 +387,69 @@ class Game(object):
     #
     ##
     def runGame(self):
-        #build a list of things to place for player 1 in setup phase 1
+        #build a list of the types of things to place for player 1 in setup phase 1
         #1 anthill/queen, 1 tunnel/worker, 9 obstacles
-        constrsToPlace = []
-        constrsToPlace += [Building(None, ANTHILL, PLAYER_ONE)]
-        constrsToPlace += [Building(None, TUNNEL, PLAYER_ONE)]
-        constrsToPlace += [Construction(None, GRASS) for i in xrange(0,9)]
+        constrsToPlace = Rules.setupItems(SETUP_PHASE_1)
+        self.record = GameRecord([player.author for player in self.currentPlayers])
     
         while not self.gameOver:
+            #whether a human player has yet to make its placement or move
+            waitingForHuman = False
             if self.state.phase == MENU_PHASE:
                 #if we are in menu phase at this point, a reset was requested so break
                 break
             else:
-                #create a copy of the state to share with the player
-                theState = self.state.clone()
-                #if the player is player two, flip the board
-                if theState.whoseTurn == PLAYER_TWO:
-                    theState.flipBoard()
+                #create a copy of the state to share with the player, flipped
+                #for player two and without player one's setup while player
+                #two places its own
+                theState = Rules.getPlayerView(self.state)
 
             if self.state.phase == SETUP_PHASE_1 or self.state.phase == SETUP_PHASE_2:
                 currentPlayer = self.currentPlayers[self.state.whoseTurn]
                 if type(currentPlayer) is HumanPlayer.HumanPlayer:
-                    if constrsToPlace[0].type == ANTHILL:
+                    if constrsToPlace[0] == ANTHILL:
                         self.ui.notify("Place anthill on your side.")
-                    elif constrsToPlace[0].type == TUNNEL:
+                    elif constrsToPlace[0] == TUNNEL:
                         self.ui.notify("Place tunnel on your side.")
-                    elif constrsToPlace[0].type == GRASS:
+                    elif constrsToPlace[0] == GRASS:
                         self.ui.notify("Place grass on your side.")
-                    elif constrsToPlace[0].type == FOOD:
+                    elif constrsToPlace[0] == FOOD:
                         self.ui.notify("Place food on enemy's side.")
                 #clear targets list as anything on list been processed on last loop
                 targets = []
                 
                 #do auto-random setup for human player if required
                 if (self.randomSetup) and (type(currentPlayer) is HumanPlayer.HumanPlayer):
-                    if (constrsToPlace[0].type != FOOD):
+                    if (constrsToPlace[0] != FOOD):
                         coord = (random.randint(0,9), random.randint(0,3))
                         if (self.state.board[coord[0]][coord[1]].constr == None):
                             targets.append(coord)
-                    elif (constrsToPlace[0].type == FOOD):
+                    elif (constrsToPlace[0] == FOOD):
                         coord = (random.randint(0,9), random.randint(6,9))
                         if (self.state.board[coord[0]][coord[1]].constr == None):
                             targets.append(coord)
 
-                #hide the 1st player's set anthill and grass placement from the 2nd player
-                if theState.whoseTurn == PLAYER_TWO and self.state.phase == SETUP_PHASE_1:
-                    theState.clearConstrs()
-                    
                 #get the placement from the player
-                targets += currentPlayer.getPlacement(theState)
+                placement = self.callPlayer(currentPlayer, "getPlacement", theState)
+                if self.gameOver or self.callAbandoned:
+                    #the player ran out of time, or the game was reset while it was thinking
+                    break
+                if placement == None:
+                    #the player crashed in its own process
+                    self.error(INVALID_PLACEMENT, targets)
+                    break
+                targets += placement
                 #only want to place as many targets as constructions to place
                 if len(targets) > len(constrsToPlace):
                     targets = targets[:len(constrsToPlace)]
 
                 validPlace = self.isValidPlacement(constrsToPlace, targets)
+                waitingForHuman = validPlace == None and type(currentPlayer) is HumanPlayer.HumanPlayer
                 if validPlace:
-                    for target in targets:
-                        #translate coords to match player
-                        target = self.state.coordLookup(target, self.state.whoseTurn)
-                        #get construction to place
-                        constr = constrsToPlace.pop(0)
-                        #give constr its coords
-                        constr.coords = target
-                        #put constr on board
-                        self.state.board[target[0]][target[1]].constr = constr
-                        if constr.type == ANTHILL or constr.type == TUNNEL:
-                            #update the inventory
-                            self.state.inventories[self.state.whoseTurn].constrs.append(constr)
-                        else:  #grass and food
-                            self.state.inventories[NEUTRAL].constrs.append(constr)
+                    #translate coords to match player
+                    targets = [self.state.coordLookup(target, self.state.whoseTurn) for target in targets]
+                    self.record.addPlacement(targets)
+                    Rules.placeConstructions(self.state, constrsToPlace, targets)
                     
                     #if AI mode, pause to observe move until next or continue is clicked
                     self.pauseForAIMode()
@@ -192,52 +458,11 @@ class Game(object):
                         break
                     
                     if not constrsToPlace:
-                        constrsToPlace = []
-                        if self.state.phase == SETUP_PHASE_1:
-                            if self.state.whoseTurn == PLAYER_ONE:
-                                constrsToPlace += [Building(None, ANTHILL, PLAYER_TWO)]
-                                constrsToPlace += [Building(None, TUNNEL, PLAYER_TWO)]
-                                constrsToPlace += [Construction(None, GRASS) for i in xrange(0,9)]
-                            elif self.state.whoseTurn == PLAYER_TWO:
-                                constrsToPlace += [Construction(None, FOOD) for i in xrange(0,2)]
-                                self.state.phase = SETUP_PHASE_2
-                        elif self.state.phase == SETUP_PHASE_2:
-                            if self.state.whoseTurn == PLAYER_ONE:
-                                constrsToPlace += [Construction(None, FOOD) for i in xrange(0,2)]
-                            elif self.state.whoseTurn == PLAYER_TWO:
-                                #if we're finished placing, add in queens and move to play phase
-                                p1inventory = self.state.inventories[PLAYER_ONE]
-                                p2inventory = self.state.inventories[PLAYER_TWO]
-                                #get anthill coords
-                                p1AnthillCoords = p1inventory.constrs[0].coords
-                                p2AnthillCoords = p2inventory.constrs[0].coords
-                                #get tunnel coords
-                                p1TunnelCoords = p1inventory.constrs[1].coords
-                                p2TunnelCoords = p2inventory.constrs[1].coords
-                                #create queen and worker ants
-                                p1Queen = Ant(p1AnthillCoords, QUEEN, PLAYER_ONE)
-                                p2Queen = Ant(p2AnthillCoords, QUEEN, PLAYER_TWO)
-                                p1Worker = Ant(p1TunnelCoords, WORKER, PLAYER_ONE)
-                                p2Worker = Ant(p2TunnelCoords, WORKER, PLAYER_TWO)
-                                #put ants on board
-                                self.state.board[p1Queen.coords[0]][p1Queen.coords[1]].ant = p1Queen
-                                self.state.board[p2Queen.coords[0]][p2Queen.coords[1]].ant = p2Queen
-                                self.state.board[p1Worker.coords[0]][p1Worker.coords[1]].ant = p1Worker
-                                self.state.board[p2Worker.coords[0]][p2Worker.coords[1]].ant = p2Worker
-                                #add the queens to the inventories
-                                p1inventory.ants.append(p1Queen)
-                                p2inventory.ants.append(p2Queen)
-                                p1inventory.ants.append(p1Worker)
-                                p2inventory.ants.append(p2Worker)
-                                #give the players the initial food
-                                p1inventory.foodCount = 1
-                                p2inventory.foodCount = 1
-                                #change to play phase
-                                self.ui.notify("")
-                                self.state.phase = PLAY_PHASE
-                                
-                        #change player turn in state
-                        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
+                        if self.state.phase == SETUP_PHASE_2 and self.state.whoseTurn == PLAYER_TWO:
+                            #the queens and workers are added and play begins
+                            self.ui.notify("")
+                        #move on to the next player's placement, or to play phase
+                        Rules.endSetupStep(self.state, constrsToPlace)
                             
                 else:
                     if not type(currentPlayer) is HumanPlayer.HumanPlayer:
@@ -268,34 +493,36 @@ class Game(object):
                             self.ui.notify("")
 
                             
+                #list the AI's legal moves once, for both the AI and the check below
+                offeredKeys = None
+                if not type(currentPlayer) is HumanPlayer.HumanPlayer:
+                    offeredKeys = Rules.offerLegalMoves(theState)
+
                 #get the move from the current player in a separate
                 #process so that we can time it out
-                move = currentPlayer.getMove(theState)
+                move = self.callPlayer(currentPlayer, "getMove", theState)
+                if self.gameOver or self.callAbandoned:
+                    #the player ran out of time, or the game was reset while it was thinking
+                    break
+                isOffered = offeredKeys != None and Rules.moveKey(move) in offeredKeys
                 
-                if move != None and move.coordList != None:
-                    for i in xrange(0,len(move.coordList)):
-                        #translate coords of move to match player
-                        move.coordList[i] = self.state.coordLookup(move.coordList[i], self.state.whoseTurn)
+                if type(move) is Move and type(move.coordList) is list:
+                    #translate coords of move to match player, into a new Move
+                    #since the player may still hold on to the one it returned
+                    move = Move(move.moveType, [self.state.coordLookup(coord, self.state.whoseTurn) for coord in move.coordList],
+                                move.buildType)
                 
                 #make sure it's a valid move
-                validMove = self.isValidMove(move)
+                validMove = self.isValidMove(move, isOffered)
+                waitingForHuman = validMove == None and type(currentPlayer) is HumanPlayer.HumanPlayer
                 
                 #complete the move if valid
                 if validMove:
+                    self.record.addMove(move)
                     #check move type
                     if move.moveType == MOVE_ANT:
-                        startCoord = move.coordList[0]
-                        endCoord = move.coordList[-1]
-                        
-                        #take ant from start coord
-                        antToMove = self.state.board[startCoord[0]][startCoord[1]].ant
-                        #change ant's coords and hasMoved status
-                        antToMove.coords = (endCoord[0], endCoord[1])
-                        antToMove.hasMoved = True
-                        #remove ant from location
-                        self.state.board[startCoord[0]][startCoord[1]].ant = None
-                        #put ant at last loc in coordList
-                        self.state.board[endCoord[0]][endCoord[1]].ant = antToMove
+                        #move the ant to the last loc in coordList
+                        antToMove = Rules.moveAnt(self.state, move.coordList)
                         
                         #clear all highlights after move happens
                         self.ui.coordList = []
@@ -311,28 +538,18 @@ class Game(object):
                         if self.state.phase == MENU_PHASE:
                             #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
                             break
+                        if self.gameOver or self.callAbandoned:
+                            #the player gave an invalid attack or ran out of time, or
+                            #the game was reset while it was thinking
+                            break
 
                         #clear all highlights after attack happens
                         self.ui.coordList = []
                         self.ui.attackList = []
                         
                     elif move.moveType == BUILD:
-                        coord = move.coordList[0]
-                        currentPlayerInv = self.state.inventories[self.state.whoseTurn]
-                                                 
-                        #subtract the cost of the item from the player's food count
-                        if move.buildType == TUNNEL:
-                            currentPlayerInv.foodCount -= CONSTR_STATS[move.buildType][BUILD_COST]
-                            
-                            tunnel = Building(coord, TUNNEL, self.state.whoseTurn)
-                            self.state.board[coord[0]][coord[1]].constr = tunnel
-                        else:
-                            currentPlayerInv.foodCount -= UNIT_STATS[move.buildType][COST]
-                            
-                            ant = Ant(coord, move.buildType, self.state.whoseTurn)
-                            ant.hasMoved = True
-                            self.state.board[coord[0]][coord[1]].ant = ant
-                            self.state.inventories[self.state.whoseTurn].ants.append(ant)
+                        #pay for and build the ant or tunnel
+                        Rules.applyMove(self.state, move)
                         
                         #if AI mode, pause to observe move until next or continue is clicked
                         self.pauseForAIMode()
@@ -345,35 +562,16 @@ class Game(object):
                         
                     elif move.moveType == END:
                         #take care of end of turn business for ants and contructions
-                        for ant in self.state.inventories[self.state.whoseTurn].ants:
-                            constrUnderAnt = self.state.board[ant.coords[0]][ant.coords[1]].constr
-                            if constrUnderAnt != None:
-                                #if constr is enemy's and ant hasnt moved, affect capture health of buildings
-                                if type(constrUnderAnt) is Building and not ant.hasMoved and not constrUnderAnt.player == self.state.whoseTurn:
-                                    constrUnderAnt.captureHealth -= 1
-                                    if constrUnderAnt.captureHealth == 0 and constrUnderAnt.type != ANTHILL:
-                                        constrUnderAnt.player = self.state.whoseTurn
-                                        constrUnderAnt.captureHealth = CONSTR_STATS[constrUnderAnt.type][CAP_HEALTH]
-                                #have all worker ants on food sources gather food
-                                elif constrUnderAnt.type == FOOD and ant.type == WORKER:
-                                    ant.carrying = True
-                                #deposit carried food (only workers carry)
-                                elif (constrUnderAnt.type == ANTHILL or constrUnderAnt.type == TUNNEL) and ant.carrying == True:
-                                    self.state.inventories[self.state.whoseTurn].foodCount += 1
-                                    ant.carrying = False
-                            
-                            #reset hasMoved on all ants of player
-                            ant.hasMoved = False   
+                        #and switch whose turn it is
+                        Rules.applyMove(self.state, move)
                             
                         #clear any currently highlighted squares
                         self.ui.coordList = []
-                        
-                        #switch whose turn it is
-                        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
 
                         #notify player which AI is acting
                         nextPlayerName = self.players[self.state.whoseTurn][0].author
                         self.ui.notify(nextPlayerName + "'s turn.")
+                        self.turnsUndrawn += 1
                         
                         #if AI mode, pause to observe move until next or continue is clicked
                         self.pauseForAIMode()
@@ -397,8 +595,13 @@ class Game(object):
             elif self.hasWon(PLAYER_TWO):
                 self.setWinner(PLAYER_TWO)
                 
-            #redraw the board periodically and check for user input
-            self.ui.drawBoard(self.state, self.mode)
+            #redraw the board periodically and check for user input, sleeping
+            #until there is some if the human player has yet to act
+            if self.isFastForwarding():
+                self.ui.handleEvents(self.mode)
+            else:
+                self.ui.drawBoard(self.state, self.mode, waitingForHuman)
+                self.turnsUndrawn = 0
             
         #end game loop
     
@@ -450,6 +653,10 @@ class Game(object):
                         break
                         
                 if len(self.gamesToPlay) == 0:
+                    self.stopPlayerProcesses()
+                    #a headless tournament dumps its profile with its summary
+                    if not self.headless:
+                        self.dumpProfile()
                     #if no more games to play, reset tournament stuff
                     self.numGames = 0                               
                     self.playerScores = []
@@ -481,9 +688,104 @@ class Game(object):
         self.loser = self.currentPlayers[(id + 1) % 2].playerId
          
         #tell the players if they won or lost
-        self.currentPlayers[id].registerWin(True)
-        self.currentPlayers[(id + 1) % 2].registerWin(False)
+        self.callPlayer(self.currentPlayers[id], "registerWin", True)
+        self.callPlayer(self.currentPlayers[(id + 1) % 2], "registerWin", False)
+
+        self.record.winner = id
+        if self.recordFile != None:
+            with open(self.recordFile, "ab") as archive:
+                writeRecord(archive, self.record)
     
+    ##
+    #callPlayer
+    #Description: Calls one of a player's methods and records how long it took.
+    #   While moves are timed, AI players are called in their own process
+    #   and forfeit the game if they don't answer within self.moveTimeout
+    #   seconds.  Human players are always called directly.
+    #
+    #   With a window, the game keeps drawing it and handling input while it
+    #   waits for an AI in a game that isn't over (see waitForPlayer).  If the
+    #   user resets the game meanwhile, the call is abandoned and
+    #   self.callAbandoned is set.
+    #
+    #Parameters:
+    #   player - The Player to call (Player)
+    #   methodName - The name of the method to call (string)
+    #   args - The arguments to pass to the method
+    #
+    #Returns: whatever the method returned, or None if the player timed out
+    ##
+    def callPlayer(self, player, methodName, *args):
+        if type(player) is HumanPlayer.HumanPlayer:
+            return getattr(player, methodName)(*args)
+
+        if not self.moveTimeout:
+            startTime = time.time()
+            player.nodes = None
+            result, stats = runProfiled(getattr(player, methodName), args, self.profiler.profile)
+            finished = True
+            elapsed = time.time() - startTime
+        else:
+            if player not in self.playerProcesses:
+                self.playerProcesses[player] = PlayerProcess(player, self.profiler.profile)
+            if self.headless or self.gameOver:
+                finished, result, elapsed = self.playerProcesses[player].call(methodName, args, self.moveTimeout)
+            else:
+                finished, result, elapsed = self.waitForPlayer(self.playerProcesses[player], methodName, args)
+                if self.callAbandoned:
+                    return None
+            stats = self.playerProcesses[player].stats
+        self.profiler.record(player.author, methodName, elapsed, getattr(player, "nodes", None), stats)
+
+        if not finished and not self.gameOver:
+            self.error(MOVE_TIMEOUT, methodName)
+        return result
+
+    ##
+    #stopPlayerProcesses
+    #Description: Kills the process of every AI that was called in one and
+    #   forgets them.  Whatever a player learned in its process is lost (see
+    #   PlayerProcess).
+    ##
+    def stopPlayerProcesses(self):
+        for process in self.playerProcesses.values():
+            process.stop()
+        self.playerProcesses = {}
+
+    ##
+    #waitForPlayer
+    #Description: Calls one of an AI's methods in its process, drawing the
+    #   board and handling input while the AI thinks.  The call is abandoned
+    #   if the AI runs out of time or if the user resets the game, which
+    #   replaces self.state.
+    #
+    #Parameters:
+    #   process - The process the AI runs in (PlayerProcess)
+    #   methodName - The name of the method to call (string)
+    #   args - The arguments to pass to the method (tuple)
+    #
+    #Returns: A tuple (finished, result, elapsed) as from PlayerProcess.call
+    ##
+    def waitForPlayer(self, process, methodName, args):
+        self.callAbandoned = False
+        state = self.state
+        process.begin(methodName, args)
+        deadline = process.startTime + self.moveTimeout
+        while True:
+            #wake up for the answer, or after a frame to handle input
+            answered = process.poll(max(0, min(1.0 / self.ui.maxFPS, deadline - time.time())))
+            if answered or time.time() >= deadline:
+                break
+            if self.isFastForwarding():
+                self.ui.handleEvents(self.mode)
+            else:
+                self.ui.drawBoard(self.state, self.mode)
+            if self.state is not state:
+                #the game was reset, so the answer isn't wanted anymore
+                self.callAbandoned = True
+                break
+        return process.finish(answered)
+
     ##
     #resolveAttack 
     #Description: Checks a player wants to attack and takes appropriate action.
@@ -494,13 +796,9 @@ class Game(object):
     ##   
     def resolveAttack(self, attackingAnt, currentPlayer):
         #check if player wants to attack
-        validAttackCoords = []
-        opponentId = (self.state.whoseTurn + 1) % 2
-        range = UNIT_STATS[attackingAnt.type][RANGE]
-        for ant in self.state.inventories[opponentId].ants:
-            if self.isValidAttack(attackingAnt, ant.coords):
-                #keep track of valid attack coords (flipped for player two)
-                validAttackCoords.append(self.state.coordLookup(ant.coords, currentPlayer.playerId))
+        #keep track of valid attack coords (flipped for player two)
+        validAttackCoords = [self.state.coordLookup(coord, currentPlayer.playerId)
+                             for coord in Rules.listAttackCoords(self.state, attackingAnt)]
         if validAttackCoords != []:
             #give instruction to human player
             if type(currentPlayer) is HumanPlayer.HumanPlayer:
@@ -519,20 +817,26 @@ class Game(object):
             
             #keep requesting coords until valid attack is given
             while attackCoord == None or not validAttack:               
-                #Draw the board again (to recognize user input inside loop)
-                self.ui.drawBoard(self.state, self.mode)
+                #Draw the board again (to recognize user input inside loop),
+                #or only check for input if no turn is being shown
+                if self.isFastForwarding():
+                    self.ui.handleEvents(self.mode)
+                else:
+                    self.ui.drawBoard(self.state, self.mode, type(currentPlayer) is HumanPlayer.HumanPlayer)
                 
                 if self.state.phase == MENU_PHASE:
                     #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
                     return
                 
-                #Create a clone of the state to give to the player
-                theState = self.state.clone()
-                if theState.whoseTurn == PLAYER_TWO:
-                    theState.flipBoard()
+                #Create a copy of the state to give to the player (flipped for player two)
+                theState = Rules.getPlayerView(self.state)
                         
                 #get the attack from the player (flipped for player two)
-                attackCoord = self.state.coordLookup(currentPlayer.getAttack(theState, attackingAnt.clone(), validAttackCoords), currentPlayer.playerId)
+                attackCoord = self.callPlayer(currentPlayer, "getAttack", theState, attackingAnt.clone(), validAttackCoords)
+                if self.gameOver or self.callAbandoned:
+                    #the player ran out of time, or the game was reset while it was thinking
+                    return
+                attackCoord = self.state.coordLookup(attackCoord, currentPlayer.playerId)
                 
                 #check for the move's validity
                 validAttack = self.isValidAttack(attackingAnt, attackCoord)
@@ -540,27 +844,20 @@ class Game(object):
                     if not type(currentPlayer) is HumanPlayer.HumanPlayer:
                         #if an ai submitted an invalid attack, exit
                         self.error(INVALID_ATTACK, attackCoord)
-                        break
+                        return
                     else:
                         #if a human submitted an invalid attack, reset coordList
                         currentPlayer.coordList = []
 
             #if we reached this point though loop, we must have a valid attack
+            self.record.setAttack(attackCoord)
             #if a human player, let it know an attack is expected (to affect location clicked context)
             if type(currentPlayer) is HumanPlayer.HumanPlayer:
                 self.expectingAttack = False
                 currentPlayer.coordList = []
             
-            #decrement ants health
-            attackedAnt = self.state.board[attackCoord[0]][attackCoord[1]].ant
-            attackedAnt.health -= UNIT_STATS[attackingAnt.type][ATTACK]
-            
-            #check for dead ant
-            if attackedAnt.health <= 0:
-                #remove dead ant from board
-                self.state.board[attackCoord[0]][attackCoord[1]].ant = None
-                #remove dead ant from inventory
-                self.state.inventories[opponentId].ants.remove(attackedAnt)
+            #decrement ants health, removing it if it dies
+            Rules.attack(self.state, attackingAnt, attackCoord)
                 
             #if AI mode, pause to observe attack until next or continue is clicked
             self.pauseForAIMode()
@@ -582,11 +879,15 @@ class Game(object):
         self.gameOver = False
         self.winner = None
         self.loser = None
+        #whether the last call to an AI was abandoned because the game was reset
+        self.callAbandoned = False
         #Human vs AI mode
         self.expectingAttack = False
         #AI vs AI mode: used for stepping through moves
         self.nextClicked = False
         self.continueClicked = False
+        #AI vs AI mode: turns played since the board was last drawn
+        self.turnsUndrawn = 0
         #Don't reset Tournament Mode's variables, might need to run more games
         
     ##
@@ -605,6 +906,8 @@ class Game(object):
         self.ui.humanButtons['End'][-1] = self.endClickedCallback
         self.ui.aiButtons['Next'][-1] = self.nextClickedCallback
         self.ui.aiButtons['Continue'][-1] = self.continueClickedCallback
+        self.ui.aiButtons['Speed'][-1] = self.speedClickedCallback
+        self.ui.aiSpeedName = AI_SPEEDS[self.aiSpeed][0]
         self.ui.antButtons['Worker'][-1] = self.buildWorkerCallback
         self.ui.antButtons['Drone'][-1] = self.buildDroneCallback
         self.ui.antButtons['Soldier'][-1] = self.buildDSoldierCallback
@@ -624,6 +927,8 @@ class Game(object):
     #           offset by 1 to account for the human player as player one.
     ##
     def loadAIs(self, humanMode):
+        #the processes of the old players would run them on as orphans
+        self.stopPlayerProcesses()
         #Reset the player list in case some have been loaded already
         self.players = []
         self.ui.allAIs = self.players
@@ -676,239 +981,48 @@ class Game(object):
     ##
     #isValidMove(Move)
     #Description: Checks to see if the move is valid for the current player.
-    # 
+    #  The reasons an AI's move is invalid are printed, and a human player is
+    #  notified of the reason a build is invalid.
+    #
     #Parameters:
     #   move - The Move to check (Move)
+    #   isOffered - Whether the move is one of the legal moves listed for the
+    #       player (see Rules.offerLegalMoves), which is valid without
+    #       checking it again (boolean)
     #
     #Returns: None if no move is given, true if the given move is valid, or false if the given move is invalid
     ##
-    def isValidMove(self, move):
-        #check for no move
-        if move == None:
-            self.errorReport("ERROR: Invalid Move: " + str(move))
-            return None
-        
-        #check that the move is well-formed typewise (tuples, ints, etc)
-        if type(move) != Move:
-            self.errorReport("ERROR: Invalid Move: " + str(move))
-            self.errorReport("ERROR:  player did not supply an object of type 'Move'")
-            return False
-        if type(move.moveType) != int:
-            self.errorReport("ERROR: Invalid Move: " + str(move))
-            self.errorReport("       Move type must be an integer.")
-            return False
-        #for END type moves, lots we don't need to check
-        if move.moveType == END:
-            return True
-        if move.coordList == None or type(move.coordList) != list or len(move.coordList) == 0:
+    def isValidMove(self, move, isOffered = False):
+        errors = []
+        if isOffered:
+            validMove = True
+        else:
+            validMove = Rules.isValidMove(self.state, move, errors)
+        if move == None or errors:
             self.errorReport("ERROR: Invalid Move: " + str(move))
-            self.errorReport("       The coordinate list is empty!")
-            return False
-        index = 0
-        for coord in move.coordList:
-            if (type(coord) != tuple):
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       Coordinate at index " + str(index) + " is not a tuple.")
-                return False
-            if (len(coord) != 2):
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       Coordinate at index " + str(index) + " has " + str(len(coord)) + "entries instead of 2.")
-                return False
-            if (type(coord[0]) != int) or (type(coord[1]) != int):
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       Coordinate at index " + str(index) + " contains a value that is not an int.")
-                return False
-            index += 1
-        if type(move.buildType) != type(None) and type(move.buildType) != int:
-            return False
-
-        #for MOVE_ANT and BUILD type moves
-        if move.moveType == MOVE_ANT:
-            firstCoord = move.coordList[0]
-            #check valid start location (good coords and ant ownership)
-            if self.checkMoveStart(firstCoord):
-                #get ant to move
-                antToMove = self.state.board[firstCoord[0]][firstCoord[1]].ant
-                movePoints = UNIT_STATS[antToMove.type][MOVEMENT]             
-                previousCoord = None
+            for error in errors:
+                self.errorReport("       " + error)
+        if type(move) is Move and move.moveType == BUILD:
+            if validMove:
+                self.ui.notify("")
+            elif validMove != None and errors:
+                self.ui.notify(errors[-1])
+                self.errorNotify = True
+        return validMove
 
-                index = 0
-                for coord in move.coordList:
-                    #if first runthough, need to set up previous coord
-                    if previousCoord == None:
-                        previousCoord = coord
-                        continue  
-                    #if any to-coords are invalid, return invalid move
-                    if not self.checkMovePath(previousCoord, coord):
-                        self.errorReport("ERROR: Invalid Move: " + str(move))
-                        self.errorReport("       Illegal movement path at index" + str(index))
-                        return False
-                        
-                    #subtract cost of loc from movement points
-                    constrAtLoc = self.state.board[coord[0]][coord[1]].constr
-                    if constrAtLoc == None or antToMove.type == DRONE:
-                        movePoints -= 1
-                    else:
-                        movePoints -= CONSTR_STATS[constrAtLoc.type][MOVE_COST]
-                        
-                    previousCoord = coord
-                    index += 1
-                    
-                #Check for Queen ant trying to leave her territory
-                if (antToMove.type == QUEEN):
-                    for coord in move.coordList:
-                        if (coord[1] == BOARD_LENGTH / 2 - 1) \
-                        or (coord[1] == BOARD_LENGTH / 2):
-                            self.errorReport("ERROR: Invalid Move: " + str(move))
-                            self.errorReport("       Queen ant may not leave her own territory")
-                            return False
-                            
-                #within movement range and hasn't moved yet?
-                if (movePoints < 0):
-                    self.errorReport("ERROR: Invalid Move: " + str(move))
-                    self.errorReport("       Ant has insufficient movement points for this move")
-                    return False
-                if antToMove.hasMoved:
-                    self.errorReport("ERROR: Invalid Move: " + str(move))
-                    self.errorReport("       Ant has already made a move this turn")
-                    return False
-                else:
-                    return True
-                        
-        elif move.moveType == BUILD:
-            #coord list must contain one point for build
-            if len(move.coordList) != 1:
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       for a BUILD move, the coordinate list should contain exactly 1 coordinate")
-                return False
-        
-            buildCoord = move.coordList[0]
-            #check valid start location
-            if self.checkBuildStart(buildCoord):
-                #we're building either an ant or constr for sure
-               
-                if self.state.board[buildCoord[0]][buildCoord[1]].ant == None:
-                #we know we're building an ant
-                    buildCost = None
-                    #check buildType for valid ant
-                    if move.buildType == WORKER:
-                        buildCost = UNIT_STATS[WORKER][COST]
-                    elif move.buildType == DRONE:
-                        buildCost = UNIT_STATS[DRONE][COST]
-                    elif move.buildType == SOLDIER:
-                        buildCost = UNIT_STATS[SOLDIER][COST]
-                    elif move.buildType == R_SOLDIER:
-                        buildCost = UNIT_STATS[R_SOLDIER][COST]
-                    else:
-                        self.errorReport("ERROR: Invalid Move: " + str(move))
-                        self.errorReport("       the buildType must be one of:  WORKER, DRONE, SOLDIER or R_SOLDIER.")
-                        return False
-                    
-                    #check the player has enough food
-                    currFood = self.state.inventories[self.state.whoseTurn].foodCount
-                    if currFood >= buildCost:
-                        self.ui.notify("")
-                        return True
-                    else:
-                        self.errorReport("ERROR: Invalid Move: " + str(move))
-                        self.errorReport("       Player has " + str(currFood) + " food but needs " + str(buildCost) + " to build this ant")
-                        self.ui.notify("Requires " + str(buildCost) + " food.")
-                        self.errorNotify = True
-                        return False
-                else:
-                #we know we're building a construction
-                    adjacentCoords = []
-                    adjacentCoords.append(addCoords(buildCoord, (0, -1)))
-                    adjacentCoords.append(addCoords(buildCoord, (0, 1)))
-                    adjacentCoords.append(addCoords(buildCoord, (-1, 0)))
-                    adjacentCoords.append(addCoords(buildCoord, (1, 0)))
-                
-                    #check that there's no food in adjacent locations
-                    for aCoord in adjacentCoords:
-                        if aCoord[0] >= 0 and aCoord[0] < 10 and aCoord[1] >= 0 and aCoord[1] < 10:
-                            if (self.state.board[aCoord[0]][aCoord[1]].constr != None and
-                                    self.state.board[aCoord[0]][aCoord[1]].constr.type == FOOD):
-                                self.errorReport("ERROR: Invalid Move: " + str(move))
-                                self.errorReport("       Cannot tunnel build next to food.")
-                                self.ui.notify("Cannot tunnel build next to food.")
-                                self.errorNotify = True
-                                return False
-                 
-                    buildCost = CONSTR_STATS[TUNNEL][BUILD_COST]
-                    if self.state.inventories[self.state.whoseTurn].foodCount >= buildCost:
-                        self.ui.notify("")
-                        return True
-                    else:
-                        self.ui.notify("Requires "+ str(buildCost) + " food.")
-                        self.errorNotify = True
-                        self.errorReport("ERROR: Invalid Move: " + str(move))
-                        self.errorReport("       Must have at least " + str(buildCost) + " food to build a tunnel.")
-                        return False
-            else:  #invalid build start
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       Build location invalid.  Possible cause:")
-                loc = self.state.board[buildCoord[0]][buildCoord[1]]
-                if loc.ant == None:  #building ant
-                    self.errorReport("         - Anthill does not belong to current player")
-                else:
-                    if (move.buildType != TUNNEL):
-                        self.errorReport("         - Anthill is already occupied")
-                    elif (loc.ant.hasMoved):
-                        self.errorReport("         - Worker ant has already moved this turn")
-                    else:
-                        self.errorReport("         - Worker ant does not belong to current player")
-        else:
-            #invalid numeric move type
-            return False
-            
     ##
     #isValidPlacement
     #Description: Checks that the given placement of Constructions is valid
     #
     #Paramters:
-    #   items - The items to place (Construction[])
+    #   items - The types of the items to place (int[])
     #   targets - A list of the coordinates to place the items at ((int,int)[])
     #
     #Returns None if no target is given, true if it is a valid placement, or false if it is an invalid placement
     ##
     def isValidPlacement(self, items, targets):
-        #check for well-formed input of targets (from players)
-        if type(targets) == type(None) or type(targets) != list:
-            return False
-         #If no target, return None (human vs ai caught by caller)
-        if len(targets) == 0:
-            return None
-        for coord in targets:
-            if not self.isValidCoord(coord):
-                return False
+        return Rules.isValidPlacement(self.state, items, targets)
 
-        for i in range(0, len(targets)):
-            #Nobody can place in the center two rows of the board or on their opponents side
-                 
-            #check item type
-            if items[i].type == ANTHILL or items[i].type == TUNNEL or items[i].type == GRASS:
-                #check targets[i] is within proper boundaries y-wise
-                #must be on own side
-                if not self.isInHomeTerritory(targets[i]):
-                    return False
-            #check item type
-            elif items[i].type == FOOD:
-                #check targets[i] is within proper boundaries y-wise
-                #must be on opponent's side
-                if not self.isInEnemyTerritory(targets[i]):
-                    return False
-            else:
-                #I don't know what this type is.
-                return False
-            
-            #change target to access appropriate players locations
-            aTarget = self.state.coordLookup(targets[i], self.state.whoseTurn)
-            #make sure nothing is there yet
-            if not self.state.board[aTarget[0]][aTarget[1]].constr == None:
-                return False
-                    
-        return True
-      
     ##
     #isValidAttack
     #Description: Determines whether the attack with the given parameters is valid
@@ -919,35 +1033,13 @@ class Game(object):
     #   attackCoord - The coordinates of the Ant that is being attacked ((int,int))
     #
     #Returns: None if there is no attackCoord, true if valid attack, or false if invalid attack
-    ##  
+    ##
     def isValidAttack(self, attackingAnt, attackCoord):
-        if attackCoord == None:
-            return None
-        
-        #check for well-formed input from players
-        if not self.isValidCoord(attackCoord):
-            return False
-    
-        attackLoc = self.state.board[attackCoord[0]][attackCoord[1]]
-        
-        if attackLoc.ant == None or attackLoc.ant.player == attackingAnt.player:
-            return False
-        
-        #we know we have an enemy ant
-        range = UNIT_STATS[attackingAnt.type][RANGE]
-        diffX = abs(attackingAnt.coords[0] - attackCoord[0])
-        diffY = abs(attackingAnt.coords[1] - attackCoord[1])
-        
-        #pythagoras would be proud
-        if range ** 2 >= diffX ** 2 + diffY ** 2:
-            #return True if within range
-            return True
-        else:
-            return False
-   
+        return Rules.isValidAttack(self.state, attackingAnt, attackCoord)
+
     ##
     #isValidCoord
-    #Description: Retruns whether this coord represents a valid board location. 
+    #Description: Retruns whether this coord represents a valid board location.
     #
     #Parameters:
     #   coord - The coord to be checked trying to be checked ((int, int))
@@ -955,56 +1047,10 @@ class Game(object):
     #Returns: True if the coordinate is between (0,0) and (9,9)
     ##
     def isValidCoord(self, coord):
-        #check for well-formed coord
-        if type(coord) != tuple or len(coord) != 2 or type(coord[0]) != int or type(coord[1]) != int:
-            return False
-        
-        #check boundaries
-        if coord[0] < 0 or coord[1] < 0 or coord[0] >= BOARD_LENGTH or coord[1] >= BOARD_LENGTH:
-            return False
-            
-        return True
-   
-    ##
-    # isInHomeTerritory
-    #
-    # Description: determines whether the position is in the player's
-    # home territory
-    #
-    # Parameters:
-    #   coord - The coord to be checked trying to be checked ((int, int))
-    #
-    # Returns: True if it is and False otherwise
-    #
-    ##
-    def isInHomeTerritory(self, coord):
-        if not self.isValidCoord(coord):
-            return False
-        if not (coord[1] >= 0 and coord[1] < BOARD_LENGTH / 2 - 1):
-            return False
-        return True
-
-    ##
-    # isInEnemyTerritory
-    #
-    # Description: determines whether the position is in the player's
-    # enemy's territory
-    #
-    # Parameters:
-    #   coord - The coord to be checked trying to be checked ((int, int))
-    #
-    # Returns: True if it is and False otherwise
-    #
-    ##
-    def isInEnemyTerritory(self, coord):
-        if not self.isValidCoord(coord):
-            return False
-        if not (coord[1] < BOARD_LENGTH and coord[1] >= BOARD_LENGTH / 2 + 1):
-            return False
-        return True
+        return Rules.isValidCoord(coord)
 
     ##
-    #checkMoveStart 
+    #checkMoveStart
     #Description: Checks if the location is valid to move from.
     #  (bounds and ant ownership)
     #
@@ -1014,21 +1060,12 @@ class Game(object):
     #Returns: True if it is a valid starting point for a move and false if not
     ##
     def checkMoveStart(self, coord):
-        #check location is on board
-        if self.isValidCoord(coord):
-            antToMove = self.state.board[coord[0]][coord[1]].ant
-            #check that an ant exists at the loc
-            if antToMove != None:
-                #check that it's the player's ant and that it hasn't moved
-                if antToMove.player == self.state.whoseTurn and not antToMove.hasMoved:
-                    return True
-                                      
-        return False
+        return Rules.checkMoveStart(self.state, coord)
 
     ##
     #checkMovePath
     #Description: Checks if the location is valid to move to.
-    #  (clear path, adjacent locations) 
+    #  (clear path, adjacent locations)
     #
     #Parameters:
     #   fromCoord - The Ant's current coordinate ((int, int))
@@ -1040,20 +1077,10 @@ class Game(object):
     #  (either in checkMoveStart or previous checkMovePath call)
     ##
     def checkMovePath(self, fromCoord, toCoord):
-        #check location is on board
-        if self.isValidCoord(toCoord):
-            #check that squares are adjacent (difference on only one axis is 1)
-            if ((abs(fromCoord[0] - toCoord[0]) == 1 and abs(fromCoord[1] - toCoord[1]) == 0) or
-                    (abs(fromCoord[0] - toCoord[0]) == 0 and abs(fromCoord[1] - toCoord[1]) == 1)):
-                antAtLoc = self.state.board[toCoord[0]][toCoord[1]].ant
-                #check if an ant exists at the loc
-                if antAtLoc ==  None:
-                    return True
-                    
-        return False
+        return Rules.checkMovePath(self.state, fromCoord, toCoord)
 
     ##
-    #checkBuildStart 
+    #checkBuildStart
     #Description: Checks if the location is valid to build from.
     #  (bounds and building ownership)
     #
@@ -1061,24 +1088,10 @@ class Game(object):
     #   coord - The coordinate trying to be used to build ((int, int))
     #
     #Returns: True if it is a valid build location and false otherwise
-    ##    
+    ##
     def checkBuildStart(self, coord):
-        #check location is on board
-        if self.isValidCoord(coord):
-            loc = self.state.board[coord[0]][coord[1]]
-            #check that an empty anthill exists at the loc
-            if loc.constr != None and loc.constr.type == ANTHILL and loc.ant == None:
-                #check that it's the player's anthill
-                if loc.constr.player == self.state.whoseTurn:
-                    return True
-            #check that an ant exists at an empty location
-            elif loc.ant != None and loc.ant.type == WORKER and loc.constr == None:       
-                #check that it's the player's ant and it hasn't moved
-                if loc.ant.player == self.state.whoseTurn and not loc.ant.hasMoved:
-                    return True
-                    
-        return False
-    
+        return Rules.checkBuildStart(self.state, coord)
+
     ##
     #highlightValidMoves
     #Description: Highlights valid possible moves for the player when an ant is selected
@@ -1130,32 +1143,43 @@ class Game(object):
     #Returns: True if the player with playerId has won the game.
     ##
     def hasWon(self, playerId):
-        opponentId = (playerId + 1) % 2
-        
-        if ((self.state.phase == PLAY_PHASE) and 
-        ((self.state.inventories[opponentId].getQueen() == None) or
-        (self.state.inventories[opponentId].getAnthill().captureHealth <= 0) or
-        (self.state.inventories[playerId].foodCount >= FOOD_GOAL) or
-        (self.state.inventories[opponentId].foodCount == 0 and 
-            len(self.state.inventories[opponentId].ants) == 1))):
-            return True
-        else:
-            return False
+        return Rules.hasWon(self.state, playerId)
      
     ##
     #pauseForAIMode
-    #Description: Will pause the game if set to AI mode until user clicks next or continue
+    #Description: Will pause the game if set to AI mode until user clicks next or continue.
+    #   Once continue is clicked, each step is shown for as long as the
+    #   playback speed (see AI_SPEEDS) says.
     #
     ##    
     def pauseForAIMode(self):
         if self.mode == AI_MODE:
             while not self.nextClicked and not self.continueClicked:
-                self.ui.drawBoard(self.state, self.mode)
+                self.ui.drawBoard(self.state, self.mode, True)
                 if self.state.phase == MENU_PHASE:
                     #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
                     return
             #reset nextClicked to catch next move
             self.nextClicked = False
+            #once continuing, show the step for as long as the playback speed says
+            stepTime = AI_SPEEDS[self.aiSpeed][1]
+            if self.continueClicked and stepTime != None:
+                deadline = time.time() + stepTime
+                while time.time() < deadline and self.state.phase != MENU_PHASE:
+                    self.ui.drawBoard(self.state, self.mode)
+                    time.sleep(max(0, min(1.0 / self.ui.maxFPS, deadline - time.time())))
+
+    ##
+    #isFastForwarding
+    #Description: Whether an AI vs AI game is being played without drawing
+    #   every turn, and the board isn't due to be drawn yet
+    #
+    #Returns: True if the game should only check for user input (boolean)
+    ##
+    def isFastForwarding(self):
+        renderTurns = AI_SPEEDS[self.aiSpeed][2]
+        return self.mode == AI_MODE and self.continueClicked and renderTurns != None and \
+               self.turnsUndrawn < renderTurns
     
     ##
     #error
@@ -1172,10 +1196,13 @@ class Game(object):
         if errorCode == INVALID_PLACEMENT:
             #info is a coord list
             errorMsg += "invalid placement\nCoords given: "
-            lastCoord = info.pop()
-            for coord in info:
-                errorMsg += "(" + str(coord[0]) + ", " + str(coord[1]) + "), "
-            errorMsg += "(" + str(lastCoord[0]) + ", " + str(lastCoord[1]) + ")"
+            if not info:
+                errorMsg += str(info)
+            else:
+                lastCoord = info.pop()
+                for coord in info:
+                    errorMsg += "(" + str(coord[0]) + ", " + str(coord[1]) + "), "
+                errorMsg += "(" + str(lastCoord[0]) + ", " + str(lastCoord[1]) + ")"
 
         elif errorCode == INVALID_MOVE:
             #info is a move
@@ -1193,10 +1220,18 @@ class Game(object):
             elif info.moveType == MOVE_ANT:
                 pass
 
+        elif errorCode == MOVE_TIMEOUT:
+            #info is the name of the method that timed out
+            errorMsg += self.currentPlayers[self.state.whoseTurn].author
+            errorMsg += " took longer than " + str(self.moveTimeout) + " seconds in " + info
+
         else: #INVALID_ATTACK
             #info is a coord          
             errorMsg += "invalid attack\n"
-            errorMsg += "(" + str(info[0]) + ", " + str(info[1]) + ")"
+            if info == None:
+                errorMsg += str(info)
+            else:
+                errorMsg += "(" + str(info[0]) + ", " + str(info[1]) + ")"
     
         print errorMsg
         self.setWinner((self.state.whoseTurn + 1) % 2)
@@ -1248,7 +1283,7 @@ class Game(object):
                 self.gamesToPlay = [] #((p1.id, p2.id), numGames)
                 self.numGames = None
                 #notify UI tournament has started
-                self.ui.tournamentStartTime = time.clock()
+                self.ui.tournamentStartTime = time.time()
                 self.ui.tournamentInProgress = True
     
                 if self.ui.textBoxContent != '':
@@ -1556,6 +1591,16 @@ class Game(object):
         if self.state.phase != MENU_PHASE:
             self.continueClicked = True
     
+    ##
+    #speedClickedCallback
+    #Description: Responds to a user clicking on the speed button in AI vs AI
+    #   mode by switching to the next playback speed in AI_SPEEDS
+    #
+    ##
+    def speedClickedCallback(self):
+        self.aiSpeed = (self.aiSpeed + 1) % len(AI_SPEEDS)
+        self.ui.aiSpeedName = AI_SPEEDS[self.aiSpeed][0]
+    
     ##
     #checkBoxClickedCallback
     #Description: Responds to a user clicking on a checkbox to select AIs
@@ -1603,6 +1648,39 @@ class Game(object):
         self.ui.choosingAIs = False
 
 
+##
+# tournamentWorker
+#
+# Description: body of each worker process of a parallel tournament.  It
+# loads and selects the same AIs as the parent (so player ids match), then
+# plays ((p1.id, p2.id), numGames) tasks until it takes a None task.
+#
+# Parameters:
+#   authors - the authors of the tournament players, in player id order (string[])
+#   moveTimeout - seconds each AI gets per call, 0 for no limit (float)
+#   tasks   - queue of ((p1.id, p2.id), numGames) tasks (multiprocessing.Queue)
+#   results - queue the ("game", (winner, loser)) of every game is put on,
+#             followed by a final ("profile", profiler data)
+#             (multiprocessing.Queue)
+#   record  - if True, the ("record", bytes) of every game is put on results
+#             before its result (boolean)
+#   profile - if True, the AIs' calls are run under cProfile (boolean)
+#
+def tournamentWorker(authors, moveTimeout, tasks, results, record = False, profile = False):
+    game = Game(headless = True)
+    game.moveTimeout = moveTimeout
+    game.profiler.profile = profile
+    game.setupTournament(authors, 0)
+    for task in iter(tasks.get, None):
+        for i in range(0, task[1]):
+            result = game.playGame(task[0][0], task[0][1])
+            if record:
+                results.put(("record", game.record.toBytes()))
+            results.put(("game", result))
+    game.stopPlayerProcesses()
+    results.put(("profile", game.profiler.toData()))
+
+
 #Import all the python files in the AI folder so they can be serialized
 sys.path.insert(0, "AI")
 for module in os.listdir("AI"):
@@ -1613,7 +1691,7 @@ del module
 
 if __name__ == '__main__':
     #Create the game
-    a = Game()
+    a = Game(headless = "--headless" in sys.argv)
     a.start()
 
     
@@ -0,0 +1,355 @@
+import struct, sys
+from Constants import *
+from GameState import NO_ATTACK
+from PackedState import PackedState
+from Move import Move
+from Rules import newGameState, setupItems, placeConstructions, endSetupStep
+
+#
+# GameRecord.py
+#
+# Records of whole games, and replays that rebuild the state after any ply
+# of a record.
+#
+# A record lists every placement, move and attack that changed the game,
+# in board coordinates (as player one sees the board).  A ply is one event:
+# a placement (all the constructions one call to getPlacement placed), or
+# a move with the attack it led to, if any.  Records are written in a
+# compact binary form, a few bytes per ply, and any number of them can be
+# appended to one archive file:
+#
+#   archive: a sequence of records, each a 4-byte length and the record
+#   record:  RECORD_MAGIC, the winner (a byte, NO_WINNER if none), each
+#            author (a length byte and up to 255 bytes), then the plies
+#   ply:     PLACE_EVENT, a count and that many cells
+#            MOVE_ANT, a count, that many cells and the attacked cell
+#            BUILD, the build type and a cell
+#            END
+#
+# where a cell is the byte x * BOARD_LENGTH + y, or NO_CELL.
+#
+# A GameReplay seeks to any ply by unpacking the nearest PackedState
+# snapshot at or before it and replaying only the plies after that.
+#
+
+RECORD_MAGIC = "AGR1"
+#Event type of a placement; moves use their moveType
+PLACE_EVENT = 3
+NO_WINNER = 255
+NO_CELL = 255
+#Default number of plies between the snapshots of a GameReplay
+DEFAULT_SNAPSHOT_INTERVAL = 16
+
+##
+#packCell
+#Description: Returns the byte that stands for the given coords, or NO_CELL for None
+##
+def packCell(coords):
+    if coords == None:
+        return NO_CELL
+    return coords[0] * BOARD_LENGTH + coords[1]
+
+##
+#unpackCell
+#Description: Returns the coords a byte from packCell stands for, or None for NO_CELL
+##
+def unpackCell(cell):
+    if cell == NO_CELL:
+        return None
+    return (cell / BOARD_LENGTH, cell % BOARD_LENGTH)
+
+##
+#GameRecord
+#Description: The record of one game.
+#
+#Variables:
+#   authors - The authors of player one and player two (string[])
+#   winner - The id of the winner, or None if the game didn't finish (int)
+#   events - The plies, in order. Each is a tuple:
+#       (PLACE_EVENT, coords[])
+#       (MOVE_ANT, coordList, attackCoord or None)
+#       (BUILD, coords, buildType)
+#       (END,)
+##
+class GameRecord(object):
+
+    ##
+    #__init__
+    #Description: Creates a new, empty GameRecord
+    #
+    #Parameters:
+    #   inputAuthors - The authors of player one and player two (string[])
+    ##
+    def __init__(self, inputAuthors):
+        self.authors = inputAuthors
+        self.winner = None
+        self.events = []
+
+    ##
+    #addPlacement
+    #Description: Records the constructions placed by one getPlacement
+    #
+    #Parameters:
+    #   targets - The coords they were placed at, in board coordinates ((int, int)[])
+    ##
+    def addPlacement(self, targets):
+        self.events.append((PLACE_EVENT, list(targets)))
+
+    ##
+    #addMove
+    #Description: Records a valid move, in board coordinates
+    #
+    #Parameters:
+    #   move - The move that was made (Move)
+    ##
+    def addMove(self, move):
+        if move.moveType == MOVE_ANT:
+            self.events.append((MOVE_ANT, list(move.coordList), None))
+        elif move.moveType == BUILD:
+            self.events.append((BUILD, move.coordList[0], move.buildType))
+        else:
+            self.events.append((END,))
+
+    ##
+    #setAttack
+    #Description: Records the attack that followed the last move
+    #
+    #Parameters:
+    #   attackCoord - The coords of the attacked ant (int, int)
+    ##
+    def setAttack(self, attackCoord):
+        self.events[-1] = (MOVE_ANT, self.events[-1][1], attackCoord)
+
+    ##
+    #toBytes
+    #Description: Returns the binary form of this record (see above)
+    ##
+    def toBytes(self):
+        data = bytearray(RECORD_MAGIC)
+        data.append(NO_WINNER if self.winner == None else self.winner)
+        for author in self.authors:
+            author = author.encode("utf-8")[:255]
+            data.append(len(author))
+            data.extend(author)
+        for event in self.events:
+            data.append(event[0])
+            if event[0] == PLACE_EVENT or event[0] == MOVE_ANT:
+                data.append(len(event[1]))
+                data.extend([packCell(coords) for coords in event[1]])
+                if event[0] == MOVE_ANT:
+                    data.append(packCell(event[2]))
+            elif event[0] == BUILD:
+                data.append(event[2] & 0xff)
+                data.append(packCell(event[1]))
+        return str(data)
+
+    ##
+    #fromBytes
+    #Description: Reads a record from its binary form
+    #
+    #Parameters:
+    #   data - The bytes written by toBytes (string)
+    #
+    #Return: The GameRecord
+    ##
+    @staticmethod
+    def fromBytes(data):
+        data = bytearray(data)
+        if str(data[:len(RECORD_MAGIC)]) != RECORD_MAGIC:
+            raise ValueError("not a game record")
+        index = len(RECORD_MAGIC)
+        winner = data[index]
+        index += 1
+        authors = []
+        for player in (PLAYER_ONE, PLAYER_TWO):
+            length = data[index]
+            authors.append(str(data[index + 1:index + 1 + length]).decode("utf-8"))
+            index += 1 + length
+
+        record = GameRecord(authors)
+        if winner != NO_WINNER:
+            record.winner = winner
+        while index < len(data):
+            eventType = data[index]
+            if eventType == PLACE_EVENT or eventType == MOVE_ANT:
+                count = data[index + 1]
+                coords = [unpackCell(cell) for cell in data[index + 2:index + 2 + count]]
+                index += 2 + count
+                if eventType == PLACE_EVENT:
+                    record.events.append((PLACE_EVENT, coords))
+                else:
+                    record.events.append((MOVE_ANT, coords, unpackCell(data[index])))
+                    index += 1
+            elif eventType == BUILD:
+                buildType = struct.unpack("b", str(data[index + 1:index + 2]))[0]
+                record.events.append((BUILD, unpackCell(data[index + 2]), buildType))
+                index += 3
+            else:
+                record.events.append((END,))
+                index += 1
+        return record
+
+    ##
+    #__len__
+    #Description: Returns the number of plies in the record
+    ##
+    def __len__(self):
+        return len(self.events)
+
+##
+#writeRecord
+#Description: Appends a record to an open archive file
+#
+#Parameters:
+#   archive - The file, opened for binary appending (file)
+#   record - The record to write (GameRecord), or its binary form (string)
+##
+def writeRecord(archive, record):
+    if isinstance(record, GameRecord):
+        record = record.toBytes()
+    archive.write(struct.pack("<I", len(record)) + record)
+
+##
+#readRecords
+#Description: Reads every record in an archive file, one at a time
+#
+#Parameters:
+#   path - The archive file (string)
+#
+#Return: A generator of GameRecords
+##
+def readRecords(path):
+    with open(path, "rb") as archive:
+        while True:
+            header = archive.read(4)
+            if len(header) < 4:
+                return
+            yield GameRecord.fromBytes(archive.read(struct.unpack("<I", header)[0]))
+
+##
+#GameReplay
+#Description: Rebuilds the state of a recorded game after any of its plies.
+#   Snapshots are taken every snapshotInterval plies the first time the
+#   replay passes them, so seeking anywhere in a game replays at most
+#   snapshotInterval - 1 plies once the game has been replayed to that point.
+#
+#   The states are the same as the game's own state would be after the ply,
+#   except that the ants and constructions are listed in board order (as
+#   GameState.clone lists them).
+#
+#Variables:
+#   record - The GameRecord being replayed (GameRecord)
+#   snapshotInterval - The number of plies between snapshots (int)
+#   snapshots - The snapshot of each ply that is a multiple of
+#       snapshotInterval, as far as the replay has got: tuples of a
+#       PackedState and the constructions still to place (list)
+##
+class GameReplay(object):
+
+    ##
+    #__init__
+    #Description: Creates a new GameReplay
+    #
+    #Parameters:
+    #   inputRecord - The record to replay (GameRecord)
+    #   inputSnapshotInterval - The number of plies between snapshots (int)
+    ##
+    def __init__(self, inputRecord, inputSnapshotInterval = DEFAULT_SNAPSHOT_INTERVAL):
+        self.record = inputRecord
+        self.snapshotInterval = inputSnapshotInterval
+        self.snapshots = [(PackedState.fromGameState(newGameState()), setupItems(SETUP_PHASE_1))]
+
+    ##
+    #__len__
+    #Description: Returns the number of plies in the game
+    ##
+    def __len__(self):
+        return len(self.record)
+
+    ##
+    #seek
+    #Description: Rebuilds the state after the given number of plies
+    #
+    #Parameters:
+    #   ply - The number of plies to play, from 0 (the empty board) to len(self) (int)
+    #
+    #Return: A new GameState, with a board
+    ##
+    def seek(self, ply):
+        if ply < 0 or ply > len(self.record):
+            raise IndexError("ply out of range")
+        snapshotIdx = min(ply / self.snapshotInterval, len(self.snapshots) - 1)
+        packed, toPlace = self.snapshots[snapshotIdx]
+        state = packed.toGameState()
+        toPlace = toPlace[:]
+        for current in xrange(snapshotIdx * self.snapshotInterval, ply):
+            self.replayEvent(state, toPlace, self.record.events[current])
+            if (current + 1) % self.snapshotInterval == 0 and (current + 1) / self.snapshotInterval == len(self.snapshots):
+                self.snapshots.append((PackedState.fromGameState(state), toPlace[:]))
+        return state
+
+    ##
+    #replayEvent
+    #Description: Replays one ply on a state in place
+    #
+    #Parameters:
+    #   state - The state before the ply (GameState)
+    #   toPlace - The types of the constructions still to place in this
+    #       setup step, which is updated (int[])
+    #   event - The ply (see GameRecord.events)
+    ##
+    def replayEvent(self, state, toPlace, event):
+        if event[0] == PLACE_EVENT:
+            self.replayPlacement(state, toPlace, event[1])
+        elif event[0] == MOVE_ANT:
+            attackCoord = event[2]
+            if attackCoord == None:
+                attackCoord = NO_ATTACK
+            state.applyMove(Move(MOVE_ANT, event[1], None), attackCoord)
+        elif event[0] == BUILD:
+            state.applyMove(Move(BUILD, [event[1]], event[2]))
+        else:
+            state.applyMove(Move(END, None, None))
+        state.zobristHash = None
+
+    ##
+    #replayPlacement
+    #Description: Places constructions and moves on to the next setup step
+    #   when they have all been placed, with the same rules Game.runGame uses
+    #
+    #Parameters: see replayEvent.  targets are the coords of the
+    #   constructions ((int, int)[])
+    ##
+    def replayPlacement(self, state, toPlace, targets):
+        placeConstructions(state, toPlace, targets)
+        if not toPlace:
+            endSetupStep(state, toPlace)
+
+##
+# main
+#
+# Description: prints the games in an archive, or the board of one game
+# after a ply:
+#
+#     python GameRecord.py <archive> [<game> [<ply>]]
+#
+# The ply defaults to the end of the game.
+#
+if __name__ == '__main__':
+    from AIPlayerUtils import asciiPrintState
+    if len(sys.argv) < 2:
+        print "usage: python GameRecord.py <archive> [<game> [<ply>]]"
+        sys.exit(1)
+    records = readRecords(sys.argv[1])
+    if len(sys.argv) == 2:
+        for index, record in enumerate(records):
+            winner = "none" if record.winner == None else record.authors[record.winner]
+            print "%d: %s vs. %s, %d plies, winner: %s" % (index, record.authors[0], record.authors[1], len(record), winner)
+    else:
+        for index in xrange(0, int(sys.argv[2]) + 1):
+            record = next(records)
+        replay = GameReplay(record)
+        ply = len(replay)
+        if len(sys.argv) > 3:
+            ply = int(sys.argv[3])
+        asciiPrintState(replay.seek(ply))
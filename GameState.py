@@ -2,7 +2,18 @@ import copy
 from Constants import *
 from Inventory import Inventory
 from Building import Building
+from Construction import Construction, CONSTR_STATS
+from Ant import Ant, UNIT_STATS
 from Location import *
+from SpatialIndex import getSpatialIndex, indexKey
+import Zobrist
+
+#Kinds of change recorded in the undo tokens of GameState.applyMove
+UNDO_SET = 0
+UNDO_APPEND = 1
+UNDO_REMOVE = 2
+#Attack coords that match no ant, to make a MOVE_ANT with applyMove without attacking
+NO_ATTACK = (-1, -1)
 
 def addCoords(tuple1, tuple2):
     if len(tuple1) != len(tuple2):
@@ -26,6 +37,14 @@ def subtractCoords(tuple1, tuple2):
 #   inventories - A tuple containing the Inventory for each player.
 #   phase - The current phase of the game.
 #    whoseTurn - The ID of the Player who's turn it currently is.
+#   spatialIndex - The SpatialIndex of the inventories, or None until one is needed.
+#   zobristHash - The Zobrist hash of the state (see Zobrist), or None until
+#       getHash is called.  applyMove and undoMove keep it up to date, but a
+#       state changed in any other way must set it back to None.
+#   legalMoves - The legal moves the game listed for the player whose turn
+#       it is, or None (see Rules.offerLegalMoves).
+#   legalMovesKey - What the state was like when legalMoves was listed (see
+#       AIPlayerUtils.getLegalMovesKey)
 ##
 class GameState(object):
 
@@ -45,6 +64,33 @@ class GameState(object):
         self.inventories = inputInventories
         self.phase = inputPhase
         self.whoseTurn = inputTurn
+        self.spatialIndex = None
+        self.zobristHash = None
+        self.legalMoves = None
+        self.legalMovesKey = None
+
+    ##
+    #__getstate__
+    #Description: Leaves the spatial index out when a state is pickled (e.g. to
+    #   send it to a PlayerProcess) or deep copied.  It is rebuilt on demand.
+    ##
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["spatialIndex"] = None
+        return state
+
+    ##
+    #getHash
+    #Description: Returns the Zobrist hash of this state, computing it if it
+    #   isn't known yet.  Equal states have equal hashes, so it can be used as
+    #   the key of a TranspositionTable.
+    #
+    #Return: The hash (a 64-bit long)
+    ##
+    def getHash(self):
+        if self.zobristHash == None:
+            self.zobristHash = Zobrist.hashState(self)
+        return self.zobristHash
 
     ##
     #coordLookup
@@ -78,6 +124,7 @@ class GameState(object):
                 ant.coords = self.coordLookup(ant.coords, PLAYER_TWO)
             for constr in inv.constrs:
                 constr.coords = self.coordLookup(constr.coords, PLAYER_TWO)
+        self.zobristHash = None
       
     ##
     #clearConstrs
@@ -175,3 +222,237 @@ class GameState(object):
                            Inventory(NEUTRAL, [], cons3, 0) ]
         
         return GameState(newBoard, newInventories, self.phase, self.whoseTurn)
+
+    ##
+    #applyMove
+    #
+    #Description: Makes the given move on this state in place, following the
+    # same rules as Game.runGame: ants move and then attack, builds cost
+    # food, and ending the turn gathers and deposits food, captures
+    # buildings and passes the turn to the other player.  The move is assumed
+    # to be legal for the player whose turn it is.  Works on states with or
+    # without a board (see fastclone).
+    #
+    # Unlike Game.runGame, a built tunnel and a captured building are also
+    # added to the right inventory so that the inventories match what
+    # clone() would rebuild from the board.
+    #
+    #Parameters:
+    #   move - The Move to make (Move)
+    #   attackCoord - The coords of the enemy ant to attack after a MOVE_ANT,
+    #       None to attack the first ant in range, as listed in the enemy's
+    #       inventory, or NO_ATTACK not to attack ((int, int))
+    #
+    #Return: an undo token to pass to undoMove
+    ##
+    def applyMove(self, move, attackCoord = None):
+        undo = [(UNDO_SET, self, "zobristHash", self.zobristHash)]
+        me = self.whoseTurn
+        myInv = self.inventories[me]
+
+        if move.moveType == MOVE_ANT:
+            startCoord = move.coordList[0]
+            endCoord = move.coordList[-1]
+            antToMove = self.getAntIn(myInv, startCoord)
+            self.setUndoable(undo, antToMove, "coords", (endCoord[0], endCoord[1]))
+            self.setUndoable(undo, antToMove, "hasMoved", True)
+            if self.board != None:
+                self.setUndoable(undo, self.board[startCoord[0]][startCoord[1]], "ant", None)
+                self.setUndoable(undo, self.board[endCoord[0]][endCoord[1]], "ant", antToMove)
+            self.resolveAttack(undo, antToMove, attackCoord)
+
+        elif move.moveType == BUILD:
+            coord = move.coordList[0]
+            if move.buildType == TUNNEL:
+                self.setUndoable(undo, myInv, "foodCount", myInv.foodCount - CONSTR_STATS[TUNNEL][BUILD_COST])
+                tunnel = Building(coord, TUNNEL, me)
+                self.appendUndoable(undo, myInv.constrs, tunnel)
+                if self.board != None:
+                    self.setUndoable(undo, self.board[coord[0]][coord[1]], "constr", tunnel)
+            else:
+                self.setUndoable(undo, myInv, "foodCount", myInv.foodCount - UNIT_STATS[move.buildType][COST])
+                ant = Ant(coord, move.buildType, me)
+                ant.hasMoved = True
+                self.appendUndoable(undo, myInv.ants, ant)
+                if self.board != None:
+                    self.setUndoable(undo, self.board[coord[0]][coord[1]], "ant", ant)
+
+        elif move.moveType == END:
+            for ant in myInv.ants:
+                constrUnderAnt = self.getConstrAt(ant.coords)
+                if constrUnderAnt != None:
+                    #if constr is enemy's and ant hasnt moved, affect capture health of buildings
+                    if type(constrUnderAnt) is Building and not ant.hasMoved and not constrUnderAnt.player == me:
+                        self.setUndoable(undo, constrUnderAnt, "captureHealth", constrUnderAnt.captureHealth - 1)
+                        if constrUnderAnt.captureHealth == 0 and constrUnderAnt.type != ANTHILL:
+                            self.removeUndoable(undo, self.inventories[constrUnderAnt.player].constrs, constrUnderAnt)
+                            self.appendUndoable(undo, myInv.constrs, constrUnderAnt)
+                            self.setUndoable(undo, constrUnderAnt, "player", me)
+                            self.setUndoable(undo, constrUnderAnt, "captureHealth", CONSTR_STATS[constrUnderAnt.type][CAP_HEALTH])
+                    #have all worker ants on food sources gather food
+                    elif constrUnderAnt.type == FOOD and ant.type == WORKER:
+                        self.setUndoable(undo, ant, "carrying", True)
+                    #deposit carried food (only workers carry)
+                    elif (constrUnderAnt.type == ANTHILL or constrUnderAnt.type == TUNNEL) and ant.carrying == True:
+                        self.setUndoable(undo, myInv, "foodCount", myInv.foodCount + 1)
+                        self.setUndoable(undo, ant, "carrying", False)
+
+                #reset hasMoved on all ants of player
+                self.setUndoable(undo, ant, "hasMoved", False)
+
+            #switch whose turn it is
+            self.setUndoable(undo, self, "whoseTurn", (me + 1) % 2)
+
+        return undo
+
+    ##
+    #undoMove
+    #
+    #Description: Takes back a move made with applyMove, restoring this state
+    # exactly, including the order of the inventory lists.  Moves must be
+    # undone in the reverse order they were made.
+    #
+    #Parameters:
+    #   undo - The undo token returned by applyMove
+    ##
+    def undoMove(self, undo):
+        for change in reversed(undo):
+            if change[0] == UNDO_SET:
+                setattr(change[1], change[2], change[3])
+            elif change[0] == UNDO_APPEND:
+                change[1].pop()
+            else: #UNDO_REMOVE
+                change[1].insert(change[2], change[3])
+
+    ##
+    #resolveAttack
+    #
+    #Description: Has the given ant attack an enemy ant in range, if there is
+    # one, the same way Game.resolveAttack does.  Dead ants are removed.
+    #
+    #Parameters:
+    #   undo - The undo token being built (list)
+    #   attackingAnt - The Ant that just moved (Ant)
+    #   attackCoord - The coords of the ant to attack, or None for the first
+    #       one in range ((int, int))
+    ##
+    def resolveAttack(self, undo, attackingAnt, attackCoord):
+        enemyInv = self.inventories[(attackingAnt.player + 1) % 2]
+        range = UNIT_STATS[attackingAnt.type][RANGE]
+        attackedAnt = None
+        for ant in enemyInv.ants:
+            diffX = attackingAnt.coords[0] - ant.coords[0]
+            diffY = attackingAnt.coords[1] - ant.coords[1]
+            if range ** 2 >= diffX ** 2 + diffY ** 2 and (attackCoord == None or ant.coords == attackCoord):
+                attackedAnt = ant
+                break
+        if attackedAnt == None:
+            return
+
+        #decrement ants health
+        self.setUndoable(undo, attackedAnt, "health", attackedAnt.health - UNIT_STATS[attackingAnt.type][ATTACK])
+
+        #remove dead ants from the board and inventory
+        if attackedAnt.health <= 0:
+            if self.board != None:
+                self.setUndoable(undo, self.board[attackedAnt.coords[0]][attackedAnt.coords[1]], "ant", None)
+            self.removeUndoable(undo, enemyInv.ants, attackedAnt)
+
+    ##
+    #getAntIn
+    #
+    #Description: Finds the ant at the given coords in an inventory
+    #
+    #Return: The Ant, or None if the inventory has no ant there
+    ##
+    def getAntIn(self, inventory, coords):
+        for ant in inventory.ants:
+            if ant.coords == coords:
+                return ant
+        return None
+
+    ##
+    #getAntAt
+    #
+    #Description: Finds the ant at the given coords, from the board if this
+    # state has one and from the inventories otherwise
+    #
+    #Return: The Ant, or None if there is none there
+    ##
+    def getAntAt(self, coords):
+        if self.board != None:
+            return self.board[coords[0]][coords[1]].ant
+        return getSpatialIndex(self).ants.get(indexKey(coords))
+
+    ##
+    #getConstrAt
+    #
+    #Description: Finds the construction at the given coords, from the board if
+    # this state has one and from the inventories otherwise
+    #
+    #Return: The Construction, or None if there is none there
+    ##
+    def getConstrAt(self, coords):
+        if self.board != None:
+            return self.board[coords[0]][coords[1]].constr
+        return getSpatialIndex(self).constrs.get(indexKey(coords))
+
+    ##
+    #zobristKey
+    #
+    #Description: Returns the Zobrist key of everything the hash of this state
+    # covers about one of its objects.  Locations aren't hashed.
+    #
+    #Parameters:
+    #   obj - An Ant, Construction or Inventory of this state, or the state itself
+    ##
+    def zobristKey(self, obj):
+        if type(obj) is Ant:
+            return Zobrist.antKey(obj)
+        elif isinstance(obj, Construction):
+            return Zobrist.constrKey(obj)
+        elif type(obj) is Inventory:
+            return Zobrist.foodKey(obj)
+        elif obj is self:
+            return Zobrist.stateKey(obj)
+        return 0
+
+    ##
+    #setUndoable
+    #
+    #Description: Sets an attribute of an object and records its old value in
+    # an undo token.  The object must be part of this state.
+    ##
+    def setUndoable(self, undo, obj, name, value):
+        undo.append((UNDO_SET, obj, name, getattr(obj, name)))
+        if self.zobristHash != None:
+            self.zobristHash ^= self.zobristKey(obj)
+            setattr(obj, name, value)
+            self.zobristHash ^= self.zobristKey(obj)
+        else:
+            setattr(obj, name, value)
+
+    ##
+    #appendUndoable
+    #
+    #Description: Adds an item to an inventory list and records it in an undo
+    # token
+    ##
+    def appendUndoable(self, undo, items, item):
+        undo.append((UNDO_APPEND, items))
+        items.append(item)
+        if self.zobristHash != None:
+            self.zobristHash ^= self.zobristKey(item)
+
+    ##
+    #removeUndoable
+    #
+    #Description: Removes an item from an inventory list and records where it
+    # was in an undo token
+    ##
+    def removeUndoable(self, undo, items, item):
+        index = items.index(item)
+        undo.append((UNDO_REMOVE, items, index, item))
+        del items[index]
+        if self.zobristHash != None:
+            self.zobristHash ^= self.zobristKey(item)
@@ -0,0 +1,357 @@
+import os, sys, json, time, multiprocessing, Queue
+from Game import Game
+from Constants import *
+
+#
+# GeneticTrainer.py
+#
+# Trains a genetic-algorithm AI (one with a population of genes, a fitness
+# per gene, newGeneration and setGene, like "Bottom of the Gene Pool")
+# without the UI.  Each generation, every gene plays a number of games
+# against each of the given opponents.  The games are spread across
+# headless worker processes.  A gene's fitness is its wins minus its
+# losses, the same score the AI's own registerWin keeps.  Then the AI's
+# newGeneration breeds the next population.
+#
+# After every generation the population and its fitness are written to a
+# JSON checkpoint file.  If that file already exists, training resumes
+# from it instead of starting from the AI's random population.
+#
+#     python GeneticTrainer.py <GeneticAIName> <OpponentName> [<OpponentName> ...]
+#         [--generations N] [--games N] [--processes N] [--timeout S]
+#         [--checkpoint FILE]
+#
+# --generations is the number of generations to evaluate in this run
+# (default the AI's GENERATION_CAP).  --games is the number of games each
+# gene plays against each opponent (default the AI's NUM_GAMES); the gene
+# plays first in half of them.  --processes 0 (the default) uses every
+# core.  --timeout works as it does for Game.py tournaments; the default
+# of 0 runs the AIs untimed.  The checkpoint defaults to
+# <GeneticAIName>.genes.json.
+#
+
+#the game each worker process plays its games in
+trainerGame = None
+
+##
+# initTrainer
+#
+# Description: sets up the game of a worker process.  Loads and selects
+# the trainee and its opponents once, like tournamentWorker does.
+#
+# Parameters:
+#   authors     - the authors of the trainee and its opponents (string[])
+#   moveTimeout - seconds each AI gets per call, 0 for no limit (float)
+#
+def initTrainer(authors, moveTimeout):
+    global trainerGame
+    trainerGame = Game(headless = True)
+    trainerGame.moveTimeout = moveTimeout
+    trainerGame.setupTournament(authors, 0)
+
+##
+# findPlayerId
+#
+# Description: returns the index into game.players of the player with the
+# given author, or -1 if none is loaded
+#
+def findPlayerId(game, author):
+    for index in range(0, len(game.players)):
+        if game.players[index][0].author == author:
+            return index
+    return -1
+
+##
+# evaluateGene
+#
+# Description: plays one gene of the trainee against one opponent in this
+# worker's game.  The gene plays first in every other game.  For each game
+# the two AIs' playerIds are set to the seats they play in, since AIs and
+# Game.resolveAttack take playerId to be the seat; the tournament ids are
+# restored afterwards.
+#
+# Parameters:
+#   task - a tuple (geneIdx, gene, traineeAuthor, opponentAuthor, numGames)
+#
+# Return: a tuple (geneIdx, fitness), where fitness is the number of games
+# the gene won minus the number it lost
+#
+def evaluateGene(task):
+    geneIdx, gene, traineeAuthor, opponentAuthor, numGames = task
+    traineeId = findPlayerId(trainerGame, traineeAuthor)
+    opponentId = findPlayerId(trainerGame, opponentAuthor)
+    trainee = trainerGame.players[traineeId][0]
+    opponent = trainerGame.players[opponentId][0]
+
+    fitness = 0
+    try:
+        for i in range(0, numGames):
+            trainee.setGene(gene)
+            #a timed trainee runs in a process forked from it before the new gene
+            if trainee in trainerGame.playerProcesses:
+                trainerGame.playerProcesses[trainee].stop()
+            if i % 2 == 0:
+                trainee.playerId, opponent.playerId = PLAYER_ONE, PLAYER_TWO
+                winner, loser = trainerGame.playGame(traineeId, opponentId)
+            else:
+                trainee.playerId, opponent.playerId = PLAYER_TWO, PLAYER_ONE
+                winner, loser = trainerGame.playGame(opponentId, traineeId)
+            if winner == trainee.playerId:
+                fitness += 1
+            else:
+                fitness -= 1
+    finally:
+        trainee.playerId, opponent.playerId = traineeId, opponentId
+    return (geneIdx, fitness)
+
+##
+# trainerWorker
+#
+# Description: body of each worker process.  Like tournamentWorker, it
+# is a plain (non-daemonic) process, so timed AIs can run in
+# PlayerProcesses of their own.  It evaluates genes until it takes a None
+# task.
+#
+# Parameters:
+#   authors     - the authors of the trainee and its opponents (string[])
+#   moveTimeout - seconds each AI gets per call, 0 for no limit (float)
+#   tasks       - queue of evaluateGene tasks (multiprocessing.Queue)
+#   results     - queue the (geneIdx, fitness) of every task is put on
+#                 (multiprocessing.Queue)
+#
+def trainerWorker(authors, moveTimeout, tasks, results):
+    initTrainer(authors, moveTimeout)
+    for task in iter(tasks.get, None):
+        results.put(evaluateGene(task))
+    trainerGame.stopPlayerProcesses()
+
+##
+# GeneticTrainer
+# Description: Runs the training, keeping the population between
+# generations in an instance of the trainee AI.
+#
+# Variables:
+#   traineeAuthor - the author name of the AI being trained (string)
+#   opponents - the author names of the AIs it plays against (string[])
+#   numGenerations - the number of generations to evaluate (int)
+#   numGames - the number of games per gene and opponent (int)
+#   numProcesses - the number of worker processes (int)
+#   moveTimeout - seconds each AI gets per call, 0 for no limit (float)
+#   checkpointFile - the path of the JSON checkpoint (string)
+#   tasks - queue of evaluateGene tasks for the workers (multiprocessing.Queue)
+#   results - queue the workers put their results on (multiprocessing.Queue)
+#   workers - the running worker processes (multiprocessing.Process[])
+#   trainee - the instance of the trainee holding the population (Player)
+#   generation - the number of generations evaluated so far (int)
+#   history - the best and mean fitness of each generation ({}[])
+##
+class GeneticTrainer(object):
+
+    ##
+    # __init__
+    # Description: Loads the AIs and the checkpoint, if there is one
+    #
+    # Parameters: see the class variables.  numGenerations and numGames
+    #     default to the trainee's GENERATION_CAP and NUM_GAMES if None, and
+    #     checkpointFile to <traineeAuthor>.genes.json.
+    ##
+    def __init__(self, traineeAuthor, opponents, numGenerations = None, numGames = None,
+                 numProcesses = 0, moveTimeout = 0, checkpointFile = None):
+        self.traineeAuthor = traineeAuthor
+        self.opponents = opponents
+        self.numProcesses = numProcesses
+        if self.numProcesses <= 0:
+            self.numProcesses = multiprocessing.cpu_count()
+        self.moveTimeout = moveTimeout
+        self.checkpointFile = checkpointFile
+        if self.checkpointFile == None:
+            self.checkpointFile = traineeAuthor + ".genes.json"
+        self.tasks = None
+        self.results = None
+        self.workers = []
+
+        #load the AIs the same way the workers will
+        game = Game(headless = True)
+        if not game.setupTournament([traineeAuthor] + opponents, 0):
+            raise ValueError("could not load the trainee and its opponents")
+        self.trainee = game.players[findPlayerId(game, traineeAuthor)][0]
+        if not hasattr(self.trainee, "setGene"):
+            raise ValueError("'" + traineeAuthor + "' is not a genetic-algorithm AI")
+
+        self.numGenerations = numGenerations
+        if self.numGenerations == None:
+            self.numGenerations = self.trainee.GENERATION_CAP
+        self.numGames = numGames
+        if self.numGames == None:
+            self.numGames = self.trainee.NUM_GAMES
+
+        self.generation = 0
+        self.history = []
+        if os.path.exists(self.checkpointFile):
+            self.loadCheckpoint()
+            #the checkpoint holds an evaluated generation; carry on from its children
+            self.trainee.newGeneration()
+
+    ##
+    # loadCheckpoint
+    # Description: Restores the population, its fitness and the history from
+    #     the checkpoint file
+    ##
+    def loadCheckpoint(self):
+        with open(self.checkpointFile, "r") as checkpoint:
+            data = json.load(checkpoint)
+        self.generation = data["generation"]
+        self.history = data["history"]
+        self.trainee.population = data["population"]
+        self.trainee.fitness = data["fitness"]
+        self.trainee.POPULATION_SIZE = len(data["population"])
+        print "Resuming '" + self.traineeAuthor + "' after generation " + str(self.generation) + \
+              " from " + self.checkpointFile
+
+    ##
+    # saveCheckpoint
+    # Description: Writes the population, its fitness and the history to the
+    #     checkpoint file.  The file is replaced in one step, so an
+    #     interrupted write leaves the previous checkpoint intact.
+    ##
+    def saveCheckpoint(self):
+        data = {"author": self.traineeAuthor,
+                "generation": self.generation,
+                "population": self.trainee.population,
+                "fitness": self.trainee.fitness,
+                "history": self.history}
+        tempFile = self.checkpointFile + ".tmp"
+        with open(tempFile, "w") as checkpoint:
+            json.dump(data, checkpoint)
+        os.rename(tempFile, self.checkpointFile)
+
+    ##
+    # startWorkers
+    # Description: Starts numProcesses worker processes, each loading the
+    #     trainee and its opponents
+    ##
+    def startWorkers(self):
+        self.tasks = multiprocessing.Queue()
+        self.results = multiprocessing.Queue()
+        authors = [self.traineeAuthor] + self.opponents
+        for i in range(0, self.numProcesses):
+            worker = multiprocessing.Process(target = trainerWorker,
+                                             args = (authors, self.moveTimeout, self.tasks, self.results))
+            worker.start()
+            self.workers.append(worker)
+
+    ##
+    # stopWorkers
+    # Description: Asks each worker to stop and waits for it.  Workers
+    #     still running a task are killed.
+    #
+    # Parameters:
+    #   wait - whether to let idle workers finish on their own (boolean)
+    ##
+    def stopWorkers(self, wait = True):
+        if wait:
+            for worker in self.workers:
+                self.tasks.put(None)
+            for worker in self.workers:
+                worker.join(5.0)
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+        self.workers = []
+
+    ##
+    # evaluateGeneration
+    # Description: Plays every gene of the population against every opponent
+    #     on the workers and sets the trainee's fitness list
+    ##
+    def evaluateGeneration(self):
+        population = self.trainee.population
+        numTasks = 0
+        for geneIdx in range(0, len(population)):
+            for opponent in self.opponents:
+                self.tasks.put((geneIdx, population[geneIdx], self.traineeAuthor, opponent, self.numGames))
+                numTasks += 1
+        fitness = [0] * len(population)
+        while numTasks > 0:
+            try:
+                geneIdx, geneFitness = self.results.get(True, 1.0)
+            except Queue.Empty:
+                #a worker that died with an error will never report its genes
+                if [worker for worker in self.workers if worker.exitcode not in (None, 0)]:
+                    raise RuntimeError("a trainer worker process failed")
+                continue
+            fitness[geneIdx] += geneFitness
+            numTasks -= 1
+        self.trainee.fitness = fitness
+
+    ##
+    # train
+    # Description: Evaluates numGenerations generations, checkpointing and
+    #     breeding the next population after each one.  Prints a one-line
+    #     JSON summary of each generation.
+    ##
+    def train(self):
+        self.startWorkers()
+        finished = False
+        try:
+            for i in range(0, self.numGenerations):
+                startTime = time.time()
+                self.evaluateGeneration()
+                fitness = self.trainee.fitness
+                self.generation += 1
+                summary = {"generation": self.generation,
+                           "best": max(fitness),
+                           "mean": round(float(sum(fitness)) / len(fitness), 3),
+                           "elapsed": round(time.time() - startTime, 3)}
+                self.history.append(summary)
+                self.saveCheckpoint()
+                print json.dumps(summary)
+                self.trainee.newGeneration()
+            finished = True
+        finally:
+            self.stopWorkers(finished)
+
+if __name__ == '__main__':
+    authors = []
+    numGenerations = None
+    numGames = None
+    numProcesses = 0
+    moveTimeout = 0
+    checkpointFile = None
+    index = 1
+    while index < len(sys.argv):
+        if sys.argv[index] == "--generations" and index + 1 < len(sys.argv):
+            index += 1
+            numGenerations = int(sys.argv[index])
+        elif sys.argv[index] == "--games" and index + 1 < len(sys.argv):
+            index += 1
+            numGames = int(sys.argv[index])
+        elif sys.argv[index] == "--processes" and index + 1 < len(sys.argv):
+            index += 1
+            numProcesses = int(sys.argv[index])
+        elif sys.argv[index] == "--timeout" and index + 1 < len(sys.argv):
+            index += 1
+            moveTimeout = float(sys.argv[index])
+        elif sys.argv[index] == "--checkpoint" and index + 1 < len(sys.argv):
+            index += 1
+            checkpointFile = sys.argv[index]
+        else:
+            authors.append(sys.argv[index])
+        index += 1
+
+    if len(authors) < 2 or authors[0] in authors[1:]:
+        print "ERROR:  name the AI to train and one or more other AIs to play against, e.g."
+        print '    python GeneticTrainer.py "Bottom of the Gene Pool" Random --generations 5'
+        sys.exit(1)
+    try:
+        trainer = GeneticTrainer(authors[0], authors[1:], numGenerations, numGames,
+                                 numProcesses, moveTimeout, checkpointFile)
+    except ValueError as e:
+        print "ERROR:  " + str(e)
+        sys.exit(1)
+    try:
+        trainer.train()
+    except RuntimeError as e:
+        print "ERROR:  " + str(e)
+        sys.exit(1)
@@ -0,0 +1,139 @@
+##
+#HeadlessInterface
+#Description: This class stands in for UserInterface when the game is run
+#   without a display (e.g. a headless tournament).  It carries the same
+#   attributes that Game.py reads and writes, but never imports or touches
+#   pygame, so the game loop runs at CPU speed instead of frame speed.
+#
+##
+import time
+from Constants import *
+
+#Extra spaces between the columns of the printed score table
+FIELD_PADDING = 4
+
+##
+#HeadlessInterface
+#Description: null-object replacement for UserInterface.
+#
+#Variables:
+#   inputSize - ignored, kept so the constructor matches UserInterface.
+##
+class HeadlessInterface(object):
+    ##
+    #__init__
+    #Description: Creates a new HeadlessInterface
+    #
+    #Parameters:
+    #   inputSize - the size of the window that would have been created.((int,int))
+    ##
+    def __init__(self, inputSize):
+        self.inputSize = inputSize
+
+    ##
+    #placeholder
+    #Description: Dummy method used as the callback for every button until
+    #   Game.py replaces it.
+    ##
+    def placeholder(self, *args):
+        pass
+
+    ##
+    #notify
+    #Description: records the message that would be displayed in the notification box.
+    #
+    #Parameters:
+    #   message - The message to be relayed to the user.(string)
+    ##
+    def notify(self, message):
+        self.lastNotification = message
+
+    ##
+    #drawBoard
+    #Description: Nothing is drawn, but the elapsed tournament time is kept up
+    #   to date the same way UserInterface.drawTable does it.
+    #
+    #Parameters:
+    #   currentState - The state of the board to draw as a GameState.(GameState)
+    #   mode - The current game mode.(int)
+    #   idle - Whether the game is waiting for the user, which it never is
+    #       without a display.(boolean)
+    ##
+    def drawBoard(self, currentState, mode, idle = False):
+        if self.tournamentInProgress:
+            self.tournamentElapsed = time.time() - self.tournamentStartTime
+
+    ##
+    #drawTable
+    #Description: Prints the tournament score table that UserInterface.drawTable
+    #   would draw, as plain text on stdout.
+    ##
+    def drawTable(self):
+        scores = [('Author', 'Wins', 'Losses')] + [tuple(score) for score in self.tournamentScores]
+        #Find the longest string for each column
+        lengths = [0 for i in range(0, len(scores[0]))]
+        for score in scores:
+            for index in range(0, len(score)):
+                lengths[index] = max(lengths[index], len(str(score[index])))
+
+        #Draw the table itself, with an underline below the headers
+        for index in range(0, len(scores)):
+            row = ""
+            for innerDex in range(0, len(scores[index])):
+                row += str(scores[index][innerDex]).ljust(lengths[innerDex] + FIELD_PADDING)
+            print row.rstrip()
+            if index == 0:
+                print " ".join(["-" * (length + FIELD_PADDING - 1) for length in lengths])
+
+        #Draw the elapsed time
+        elapsedMessage = "Elapsed time: " if self.tournamentInProgress else "Final time: "
+        elapsedMessage += str(int(self.tournamentElapsed) / 60) + "m "
+        elapsedMessage += str(int(self.tournamentElapsed) % 60) + "s"
+        print elapsedMessage
+
+    ##
+    #initAssets
+    #Description: initializes every attribute Game.py expects to find on its UI.
+    ##
+    def initAssets(self):
+        #Button statistics in the same layout as UserInterface: position, state, callback
+        self.buttons = {
+        'Start':[(0, 0), 1, self.placeholder],
+        'Tournament':[(0, 0), 1, self.placeholder],
+        'Human vs AI':[(0, 0), 1, self.placeholder],
+        'AI vs AI':[(0, 0), 1, self.placeholder]
+        }
+        self.humanButtons = {
+        'Build':[(0, 0), 1, self.placeholder],
+        'End':[(0, 0), 1, self.placeholder]
+        }
+        self.aiButtons = {
+        'Next':[(0, 0), 1, self.placeholder],
+        'Continue':[(0, 0), 1, self.placeholder],
+        'Speed':[(0, 0), 1, self.placeholder]
+        }
+        self.aiSpeedName = ''
+        self.antButtons = {
+        'Worker':[(0, 0), 1, self.placeholder],
+        'Drone':[(0, 0), 1, self.placeholder],
+        'Soldier':[(0, 0), 1, self.placeholder],
+        'Ranged Soldier':[(0, 0), 1, self.placeholder],
+        'None':[(0, 0), 1, self.placeholder]
+        }
+        self.submitSelected = {
+        'Submit AIs':[(0, 0), 1, self.placeholder]
+        }
+        self.locationClicked = self.placeholder
+        self.checkBoxClicked = self.placeholder
+        self.textBoxContent = ''
+        self.buildAntMenu = False
+        self.lastNotification = ''
+        self.coordList = []
+        self.validCoordList = []
+        self.attackList = []
+        self.tournamentScores = []
+        self.tournamentStartTime = time.time()
+        self.tournamentElapsed = 0.0
+        self.tournamentInProgress = False
+        self.choosingAIs = False
+        self.allAIs = []
@@ -1,4 +1,5 @@
 from Constants import *
+from SpatialIndex import TrackedAttribute, untrackedState
 
 ##
 #Inventory
@@ -13,6 +14,11 @@ from Constants import *
 #   foodCount - The amount of food that the player has to use
 ##
 class Inventory(object):
+    #assignments are tracked to keep spatial indexes up to date (see SpatialIndex)
+    ants = TrackedAttribute("ants")
+    constrs = TrackedAttribute("constrs")
+    #pickled and copied without the index that owns it
+    __getstate__ = untrackedState
 
     ##
     #__init__
@@ -0,0 +1,298 @@
+from Constants import *
+from Ant import Ant
+from Building import Building
+from Construction import Construction
+from Inventory import Inventory
+from Location import Location
+from GameState import GameState
+
+#Layout of the header at the start of every PackedState
+PHASE_BYTE = 0
+TURN_BYTE = 1
+FOOD_BYTE = 2 #one byte for each player
+HEADER_SIZE = 4
+
+#Layout of the bytes for each cell of the board, which follow the header in
+#column-major order (the same order as GameState.board)
+CELL_ANT = 0
+CELL_HEALTH = 1
+CELL_CONSTR = 2
+CELL_CAP_HEALTH = 3
+CELL_SIZE = 4
+
+PACKED_SIZE = HEADER_SIZE + CELL_SIZE * BOARD_LENGTH * BOARD_LENGTH
+
+#Bit fields of an ant code.  A code of 0 means there is no ant.
+ANT_TYPE_MASK = 0x07 #type + 1
+ANT_PLAYER_BIT = 0x08
+ANT_CARRYING_BIT = 0x10
+ANT_MOVED_BIT = 0x20
+
+#Bit fields of a construction code.  A code of 0 means there is no construction.
+CONSTR_TYPE_MASK = 0x07 #type - ANTHILL + 1
+CONSTR_PLAYER_SHIFT = 3
+
+##
+#cellOffset
+#Description: Returns the index of the first byte of a cell in a PackedState
+#
+#Parameters:
+#   coords - The coordinates of the cell ((int, int))
+##
+def cellOffset(coords):
+    return HEADER_SIZE + CELL_SIZE * (coords[0] * BOARD_LENGTH + coords[1])
+
+##
+#PackedState
+#Description: A compact copy of a GameState stored in a single bytearray of
+#   PACKED_SIZE bytes.  Copying one is a single buffer copy instead of
+#   building new Locations, Ants and Inventories, which makes it a cheap
+#   node type for searches.  Use fromGameState and toGameState to convert
+#   to and from the regular object model.
+#
+#   The order of the ants and constructions in the inventories is not
+#   kept; toGameState lists them in board order, the same way
+#   GameState.clone does.
+#
+#Variables:
+#   data - The packed state (bytearray)
+##
+class PackedState(object):
+
+    ##
+    #__init__
+    #Description: Creates a new PackedState
+    #
+    #Parameters:
+    #   inputData - The packed bytes to use, or None for an empty board in
+    #       the menu phase (bytearray)
+    ##
+    def __init__(self, inputData = None):
+        if inputData == None:
+            inputData = bytearray(PACKED_SIZE)
+        self.data = inputData
+
+    ##
+    #fromGameState
+    #Description: Packs a GameState.  States without a board (see
+    #   GameState.fastclone) are packed from their inventories.
+    #
+    #Parameters:
+    #   state - The GameState to pack (GameState)
+    #
+    #Return: The new PackedState
+    ##
+    @staticmethod
+    def fromGameState(state):
+        packed = PackedState()
+        packed.phase = state.phase
+        packed.whoseTurn = state.whoseTurn
+        packed.setFoodCount(PLAYER_ONE, state.inventories[PLAYER_ONE].foodCount)
+        packed.setFoodCount(PLAYER_TWO, state.inventories[PLAYER_TWO].foodCount)
+        for inv in state.inventories:
+            for ant in inv.ants:
+                packed.setAnt(ant.coords, ant.type, ant.player, ant.health, ant.carrying, ant.hasMoved)
+            for constr in inv.constrs:
+                if type(constr) is Building:
+                    packed.setConstr(constr.coords, constr.type, constr.player, constr.captureHealth)
+                else:
+                    packed.setConstr(constr.coords, constr.type, NEUTRAL, 0)
+        return packed
+
+    ##
+    #toGameState
+    #Description: Unpacks this state into a new GameState with a board
+    #
+    #Return: The GameState
+    ##
+    def toGameState(self):
+        board = [[Location((col, row)) for row in xrange(0, BOARD_LENGTH)] for col in xrange(0, BOARD_LENGTH)]
+        inventories = [Inventory(PLAYER_ONE, [], [], self.getFoodCount(PLAYER_ONE)),
+                       Inventory(PLAYER_TWO, [], [], self.getFoodCount(PLAYER_TWO)),
+                       Inventory(NEUTRAL, [], [], 0)]
+        for col in xrange(0, BOARD_LENGTH):
+            for row in xrange(0, BOARD_LENGTH):
+                loc = board[col][row]
+                antInfo = self.getAnt((col, row))
+                if antInfo != None:
+                    loc.ant = Ant((col, row), antInfo[0], antInfo[1])
+                    loc.ant.health = antInfo[2]
+                    loc.ant.carrying = antInfo[3]
+                    loc.ant.hasMoved = antInfo[4]
+                    inventories[antInfo[1]].ants.append(loc.ant)
+                constrInfo = self.getConstr((col, row))
+                if constrInfo != None:
+                    if constrInfo[1] == NEUTRAL:
+                        loc.constr = Construction((col, row), constrInfo[0])
+                    else:
+                        loc.constr = Building((col, row), constrInfo[0], constrInfo[1])
+                        loc.constr.captureHealth = constrInfo[2]
+                    inventories[constrInfo[1]].constrs.append(loc.constr)
+        return GameState(board, inventories, self.phase, self.whoseTurn)
+
+    ##
+    #copy
+    #Description: Returns a copy of this state
+    ##
+    def copy(self):
+        return PackedState(self.data[:])
+
+    ##
+    #phase, whoseTurn
+    #Description: The phase of the game and the ID of the player whose turn
+    #   it is, as in GameState
+    ##
+    @property
+    def phase(self):
+        return self.data[PHASE_BYTE]
+
+    @phase.setter
+    def phase(self, value):
+        self.data[PHASE_BYTE] = value
+
+    @property
+    def whoseTurn(self):
+        return self.data[TURN_BYTE]
+
+    @whoseTurn.setter
+    def whoseTurn(self, value):
+        self.data[TURN_BYTE] = value
+
+    ##
+    #getFoodCount
+    #Description: Returns the amount of food a player has
+    #
+    #Parameters:
+    #   playerId - The ID of the player (int)
+    ##
+    def getFoodCount(self, playerId):
+        return self.data[FOOD_BYTE + playerId]
+
+    ##
+    #setFoodCount
+    #Description: Sets the amount of food a player has
+    #
+    #Parameters:
+    #   playerId - The ID of the player (int)
+    #   foodCount - The new amount of food (int)
+    ##
+    def setFoodCount(self, playerId, foodCount):
+        self.data[FOOD_BYTE + playerId] = foodCount
+
+    ##
+    #getAnt
+    #Description: Returns the ant in a cell
+    #
+    #Parameters:
+    #   coords - The coordinates of the cell ((int, int))
+    #
+    #Return: A tuple (type, player, health, carrying, hasMoved), or None if
+    #   there is no ant in the cell
+    ##
+    def getAnt(self, coords):
+        offset = cellOffset(coords)
+        code = self.data[offset + CELL_ANT]
+        if code == 0:
+            return None
+        return ((code & ANT_TYPE_MASK) - 1,
+                PLAYER_TWO if code & ANT_PLAYER_BIT else PLAYER_ONE,
+                self.data[offset + CELL_HEALTH],
+                bool(code & ANT_CARRYING_BIT),
+                bool(code & ANT_MOVED_BIT))
+
+    ##
+    #setAnt
+    #Description: Puts an ant in a cell, replacing any ant already there
+    #
+    #Parameters:
+    #   coords - The coordinates of the cell ((int, int))
+    #   antType - The type of the ant (int)
+    #   player - The ID of the player that owns the ant (int)
+    #   health - The health of the ant (int)
+    #   carrying - Whether the ant is carrying food (bool)
+    #   hasMoved - Whether the ant has moved this turn (bool)
+    ##
+    def setAnt(self, coords, antType, player, health, carrying = False, hasMoved = False):
+        offset = cellOffset(coords)
+        code = antType + 1
+        if player == PLAYER_TWO:
+            code |= ANT_PLAYER_BIT
+        if carrying:
+            code |= ANT_CARRYING_BIT
+        if hasMoved:
+            code |= ANT_MOVED_BIT
+        self.data[offset + CELL_ANT] = code
+        self.data[offset + CELL_HEALTH] = health
+
+    ##
+    #removeAnt
+    #Description: Removes the ant from a cell, if there is one
+    #
+    #Parameters:
+    #   coords - The coordinates of the cell ((int, int))
+    ##
+    def removeAnt(self, coords):
+        offset = cellOffset(coords)
+        self.data[offset + CELL_ANT] = 0
+        self.data[offset + CELL_HEALTH] = 0
+
+    ##
+    #getConstr
+    #Description: Returns the construction in a cell
+    #
+    #Parameters:
+    #   coords - The coordinates of the cell ((int, int))
+    #
+    #Return: A tuple (type, player, captureHealth), or None if there is no
+    #   construction in the cell.  Grass and food belong to NEUTRAL.
+    ##
+    def getConstr(self, coords):
+        offset = cellOffset(coords)
+        code = self.data[offset + CELL_CONSTR]
+        if code == 0:
+            return None
+        return ((code & CONSTR_TYPE_MASK) - 1 + ANTHILL,
+                code >> CONSTR_PLAYER_SHIFT,
+                self.data[offset + CELL_CAP_HEALTH])
+
+    ##
+    #setConstr
+    #Description: Puts a construction in a cell, replacing any construction
+    #   already there
+    #
+    #Parameters:
+    #   coords - The coordinates of the cell ((int, int))
+    #   constrType - The type of the construction (int)
+    #   player - The ID of the player that owns it, NEUTRAL for grass and food (int)
+    #   captureHealth - The capture health of a Building, 0 otherwise (int)
+    ##
+    def setConstr(self, coords, constrType, player, captureHealth):
+        offset = cellOffset(coords)
+        self.data[offset + CELL_CONSTR] = (constrType - ANTHILL + 1) | (player << CONSTR_PLAYER_SHIFT)
+        self.data[offset + CELL_CAP_HEALTH] = captureHealth
+
+    ##
+    #removeConstr
+    #Description: Removes the construction from a cell, if there is one
+    #
+    #Parameters:
+    #   coords - The coordinates of the cell ((int, int))
+    ##
+    def removeConstr(self, coords):
+        offset = cellOffset(coords)
+        self.data[offset + CELL_CONSTR] = 0
+        self.data[offset + CELL_CAP_HEALTH] = 0
+
+    ##
+    #__eq__, __ne__, __hash__
+    #Description: Two PackedStates are equal if their bytes are, so they can be
+    #   used as dictionary keys
+    ##
+    def __eq__(self, other):
+        return isinstance(other, PackedState) and self.data == other.data
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(str(self.data))
@@ -6,6 +6,9 @@
 #
 #Variables:
 #   playerId - The id of the player.
+#   nodes - The number of states the player searched in its last call to
+#       getPlacement, getMove or getAttack, or None if it doesn't count them.
+#       The game resets it before each call and reports it when profiling.
 ##
 class Player(object):
 
@@ -19,6 +22,7 @@ class Player(object):
     def __init__(self, inputPlayerId, inputAuthor):
         self.playerId = inputPlayerId
         self.author = inputAuthor
+        self.nodes = None
     
     ##
     #getPlacement
@@ -0,0 +1,174 @@
+import multiprocessing, signal, time, traceback
+from Profiler import runProfiled
+
+##
+#PlayerProcess
+#Description: Runs the methods of an AI Player in a separate, persistent
+#   process so that the game can stop waiting for an answer once a deadline
+#   has passed.  The process is started on the first call and restarted
+#   (from the Player as it was in the game's own process) after a call was
+#   abandoned.
+#
+#   Only the process's copy of the player is called, so whatever the
+#   player learns in its methods (fitness, weights, utilities) lives in
+#   that copy.  It is lost when the process is stopped or restarted, and
+#   the player in the game's process never sees it.  An AI that has to
+#   keep what it learns must save it itself, e.g. to a file.
+#
+#Variables:
+#   player - The Player whose methods are run in the process (Player)
+#   process - The worker process, or None if it isn't running (multiprocessing.Process)
+#   conn - The game's end of the pipe to the worker process (Connection)
+#   profile - Whether calls are run under cProfile (boolean)
+#   stats - The raw cProfile statistics of the last finished call, or None (dict)
+#   startTime - When the call in progress was sent to the process (float)
+##
+class PlayerProcess(object):
+
+    ##
+    #__init__
+    #Description: Creates a new PlayerProcess. No process is started yet.
+    #
+    #Parameters:
+    #   inputPlayer - The Player to run in the process (Player)
+    #   inputProfile - Whether to run calls under cProfile (boolean)
+    ##
+    def __init__(self, inputPlayer, inputProfile = False):
+        self.player = inputPlayer
+        self.process = None
+        self.conn = None
+        self.profile = inputProfile
+        self.stats = None
+        self.startTime = None
+
+    ##
+    #start
+    #Description: Starts the worker process
+    ##
+    def start(self):
+        self.conn, childConn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target = servePlayer, args = (self.player, childConn))
+        #never outlive the game
+        self.process.daemon = True
+        self.process.start()
+        childConn.close()
+
+    ##
+    #stop
+    #Description: Kills the worker process, abandoning any call in progress
+    ##
+    def stop(self):
+        if self.process != None:
+            self.process.terminate()
+            self.process.join()
+            self.conn.close()
+        self.process = None
+        self.conn = None
+
+    ##
+    #call
+    #Description: Calls one of the Player's methods in the worker process and
+    #   waits at most timeout seconds for the answer.  The player's current
+    #   playerId is sent along since the game may change it between games,
+    #   and the nodes the worker's copy of the player reports searching are
+    #   copied back to the player.
+    #
+    #Parameters:
+    #   methodName - The name of the Player method to call (string)
+    #   args - The arguments to pass to the method (tuple)
+    #   timeout - The maximum number of seconds to wait, or None to wait forever (float)
+    #
+    #Return: A tuple (finished, result, elapsed).  finished is False if the
+    #   deadline passed or the process died, in which case result is None.
+    #   elapsed is the wall-clock time the call took in seconds.
+    ##
+    def call(self, methodName, args, timeout):
+        self.begin(methodName, args)
+        return self.finish(self.poll(timeout))
+
+    ##
+    #begin
+    #Description: Starts a call like call does, without waiting for the
+    #   answer.  The caller waits with poll and then collects the answer, or
+    #   gives up on it, with finish.
+    #
+    #Parameters:
+    #   methodName - The name of the Player method to call (string)
+    #   args - The arguments to pass to the method (tuple)
+    ##
+    def begin(self, methodName, args):
+        if self.process == None or not self.process.is_alive():
+            self.start()
+
+        self.startTime = time.time()
+        self.conn.send((methodName, self.player.playerId, args, self.profile))
+
+    ##
+    #poll
+    #Description: Waits at most timeout seconds for the call in progress to
+    #   be answered
+    #
+    #Parameters:
+    #   timeout - The maximum number of seconds to wait, or None to wait forever (float)
+    #
+    #Return: True if the answer is ready or the process died (boolean)
+    ##
+    def poll(self, timeout):
+        return self.conn.poll(timeout)
+
+    ##
+    #finish
+    #Description: Ends the call in progress, collecting its answer if it was
+    #   answered.  A call that wasn't is abandoned by killing the process.
+    #
+    #Parameters:
+    #   answered - Whether poll said the answer is ready (boolean)
+    #
+    #Return: A tuple (finished, result, elapsed) as returned by call
+    ##
+    def finish(self, answered):
+        finished = answered
+        result = None
+        self.player.nodes = None
+        self.stats = None
+        if finished:
+            try:
+                result, self.player.nodes, self.stats = self.conn.recv()
+            except EOFError:
+                #the process died in the middle of the call
+                finished = False
+        elapsed = time.time() - self.startTime
+
+        if not finished:
+            self.stop()
+        return (finished, result, elapsed)
+
+##
+#servePlayer
+#Description: The body of a PlayerProcess worker. Answers method calls from the
+#   game until the game closes its end of the pipe.  An exception raised by
+#   the Player is printed and answered with None, which the game treats as an
+#   invalid placement, move or attack.  Each answer is sent with the nodes the
+#   player reports searching and the cProfile statistics of the call.
+#
+#Parameters:
+#   player - The Player whose methods are called (Player)
+#   conn - The worker's end of the pipe to the game (Connection)
+##
+def servePlayer(player, conn):
+    #the worker is forked from the game, whose pygame turns SIGTERM into a
+    #QUIT event nobody here reads, so stop() couldn't kill it
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    while True:
+        try:
+            methodName, playerId, args, profile = conn.recv()
+        except EOFError:
+            return
+        player.playerId = playerId
+        player.nodes = None
+        try:
+            result, stats = runProfiled(getattr(player, methodName), args, profile)
+        except Exception:
+            traceback.print_exc()
+            result, stats = None, None
+        conn.send((result, getattr(player, "nodes", None), stats))
@@ -0,0 +1,100 @@
+from Constants import *
+from Inventory import Inventory
+from Location import Location
+from GameState import GameState
+
+##
+#PlayerView
+#Description: The copy of a GameState a player is given when it is asked for
+#   a placement, move or attack: the same state clone() makes, flipped with
+#   flipBoard for player two, without player one's setup for player two in
+#   setup phase one (see clearConstrs).
+#
+#   Instead of cloning the board and then reversing it and rewriting every
+#   coordinate, a view copies only the ants and constructions, translating
+#   their coordinates with coordLookup as it copies them, and builds its
+#   board the first time it is read.  Players that only use the inventories
+#   (or the AIPlayerUtils helpers, which do) never pay for a board.  Since
+#   the pieces are copies, a player may change the view or keep it without
+#   affecting the game.
+#
+#   A view is a GameState in every other way.  It is pickled without a
+#   board, so a PlayerProcess builds the board on its side, if at all.
+#
+#Variables:
+#   viewer - The id of the player the view is for (int)
+#   hideConstrs - Whether the board leaves out the constructions (boolean)
+#   viewBoard - The board, or None until it is read (Location[][])
+##
+class PlayerView(GameState):
+
+    ##
+    #__init__
+    #Description: Creates the view of a state for the player whose turn it is
+    #
+    #Parameters:
+    #   inputState - The game's state (GameState)
+    #   inputHideConstrs - Whether to leave the constructions off the board (boolean)
+    ##
+    def __init__(self, inputState, inputHideConstrs = False):
+        self.viewer = inputState.whoseTurn
+        self.hideConstrs = inputHideConstrs
+        #players' pieces are listed in board order, as clone() lists them
+        sources = inputState.inventories
+        inventories = [Inventory(PLAYER_ONE, self.copyPieces(sources[PLAYER_ONE].ants, True),
+                                 self.copyPieces(sources[PLAYER_ONE].constrs, True), sources[PLAYER_ONE].foodCount),
+                       Inventory(PLAYER_TWO, self.copyPieces(sources[PLAYER_TWO].ants, True),
+                                 self.copyPieces(sources[PLAYER_TWO].constrs, True), sources[PLAYER_TWO].foodCount),
+                       Inventory(NEUTRAL, [], self.copyPieces(sources[NEUTRAL].constrs, False), 0)]
+        #the board starts out unbuilt
+        GameState.__init__(self, None, inventories, inputState.phase, inputState.whoseTurn)
+
+    ##
+    #copyPieces
+    #Description: Returns copies of ants or constructions with their
+    #   coordinates translated for the viewer
+    #
+    #Parameters:
+    #   pieces - The ants or constructions of one inventory (Ant[] or Construction[])
+    #   boardOrder - Whether to list them by their coordinates in the game's
+    #       state instead of in inventory order (boolean)
+    ##
+    def copyPieces(self, pieces, boardOrder):
+        if boardOrder:
+            pieces = sorted(pieces, key = lambda piece: piece.coords)
+        copies = [piece.clone() for piece in pieces]
+        if self.viewer == PLAYER_TWO:
+            for piece in copies:
+                #written directly, like clone() does, since no SpatialIndex
+                #can hold these new pieces yet
+                piece.__dict__["coords"] = self.coordLookup(piece.coords, PLAYER_TWO)
+        return copies
+
+    @property
+    def board(self):
+        if self.viewBoard == None:
+            self.viewBoard = self.buildBoard()
+        return self.viewBoard
+
+    @board.setter
+    def board(self, value):
+        self.viewBoard = value
+
+    ##
+    #buildBoard
+    #Description: Builds the board of the view from its inventories.  As on a
+    #   flipped clone, each Location keeps the coords of the cell it was in
+    #   the game's state, which for player two are the flipped coords.
+    #
+    #Return: The board (Location[][])
+    ##
+    def buildBoard(self):
+        board = [[Location(self.coordLookup((col, row), self.viewer)) for row in xrange(0, BOARD_LENGTH)]
+                 for col in xrange(0, BOARD_LENGTH)]
+        for inv in self.inventories:
+            for ant in inv.ants:
+                board[ant.coords[0]][ant.coords[1]].ant = ant
+            if not self.hideConstrs:
+                for constr in inv.constrs:
+                    board[constr.coords[0]][constr.coords[1]].constr = constr
+        return board
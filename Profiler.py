@@ -0,0 +1,331 @@
+import os, cProfile, pstats
+
+#
+# Profiler.py
+#
+# Keeps per-author statistics of the calls the game makes to the AIs'
+# getPlacement, getMove and getAttack: a latency histogram, the number of
+# search nodes (for players that report them, see Player.nodes) and,
+# optionally, cProfile statistics of the calls themselves.
+#
+# Statistics kept in different processes (the workers of a parallel
+# tournament) are combined with toData and merge.  cProfile statistics are
+# passed around as the raw dictionaries of pstats.Stats.stats, so they can
+# be sent through a pipe or a queue.
+#
+
+#Upper bounds, in seconds, of the buckets of the latency histograms.  A
+#final bucket holds the calls longer than the last bound.
+LATENCY_BUCKETS = [0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0]
+#The methods profiled, in the order they are printed
+PROFILED_METHODS = ["getPlacement", "getMove", "getAttack"]
+#Extra spaces between the columns of the printed table
+FIELD_PADDING = 4
+
+##
+# runProfiled
+#
+# Description: Calls a function, under cProfile if asked to
+#
+# Parameters:
+#   function - the function to call
+#   args - its arguments (tuple)
+#   profile - whether to profile the call (boolean)
+#
+# Return: a tuple of the function's result and the raw cProfile statistics
+# of the call, or None if it wasn't profiled
+#
+def runProfiled(function, args, profile):
+    if not profile:
+        return (function(*args), None)
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *args)
+    profiler.create_stats()
+    return (result, profiler.stats)
+
+##
+# RawStats
+# Description: Holds raw cProfile statistics the way a cProfile.Profile
+#   does, which is the only form besides a file pstats.Stats loads them from
+##
+class RawStats(object):
+
+    def __init__(self, inputStats):
+        self.stats = inputStats
+
+    def create_stats(self):
+        pass
+
+##
+# statsFromData
+#
+# Description: Returns a pstats.Stats holding raw cProfile statistics
+#
+def statsFromData(data):
+    return pstats.Stats(RawStats(data))
+
+##
+# bucketLabel
+#
+# Description: Returns the label of a bucket of LATENCY_BUCKETS, e.g. "5ms"
+# or ">10s" for the last one
+#
+def bucketLabel(index):
+    if index == len(LATENCY_BUCKETS):
+        return ">" + bucketLabel(index - 1)
+    bound = LATENCY_BUCKETS[index]
+    if bound < 1:
+        return str(int(round(bound * 1000))) + "ms"
+    return str(int(bound)) + "s"
+
+##
+# CallStats
+# Description: The statistics of the calls to one method of one author's AI
+#
+# Variables:
+#   calls - the number of calls (int)
+#   total - the seconds they took in total (float)
+#   longest - the seconds the longest one took (float)
+#   histogram - the number of calls in each bucket of LATENCY_BUCKETS, and
+#       one more for the longer calls (int[])
+#   nodeCalls - the number of calls that reported a node count (int)
+#   nodes - the total of those node counts (int)
+##
+class CallStats(object):
+
+    ##
+    # __init__
+    # Description: Creates a new CallStats, with no calls or from the list
+    #     toData made of another
+    ##
+    def __init__(self, data = None):
+        if data == None:
+            data = [0, 0.0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1), 0, 0]
+        self.calls, self.total, self.longest, self.histogram, self.nodeCalls, self.nodes = data
+        self.histogram = list(self.histogram)
+
+    ##
+    # add
+    # Description: Counts one call
+    #
+    # Parameters:
+    #   elapsed - the seconds it took (float)
+    #   nodes - the nodes it searched, or None if it didn't say (int)
+    ##
+    def add(self, elapsed, nodes):
+        self.calls += 1
+        self.total += elapsed
+        self.longest = max(self.longest, elapsed)
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and elapsed > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        self.histogram[bucket] += 1
+        if nodes != None:
+            self.nodeCalls += 1
+            self.nodes += nodes
+
+    ##
+    # merge
+    # Description: Adds the calls counted by another CallStats
+    ##
+    def merge(self, other):
+        self.calls += other.calls
+        self.total += other.total
+        self.longest = max(self.longest, other.longest)
+        self.histogram = [mine + theirs for mine, theirs in zip(self.histogram, other.histogram)]
+        self.nodeCalls += other.nodeCalls
+        self.nodes += other.nodes
+
+    ##
+    # percentile
+    # Description: Returns the upper bound of the bucket holding the given
+    #     fraction of the calls, or the longest call if that is in the last
+    #     bucket (float)
+    ##
+    def percentile(self, fraction):
+        target = fraction * self.calls
+        count = 0
+        for bucket in range(0, len(LATENCY_BUCKETS)):
+            count += self.histogram[bucket]
+            if count >= target:
+                return min(LATENCY_BUCKETS[bucket], self.longest)
+        return self.longest
+
+    ##
+    # toData
+    # Description: Returns the statistics as a list of plain values
+    ##
+    def toData(self):
+        return [self.calls, self.total, self.longest, self.histogram, self.nodeCalls, self.nodes]
+
+    ##
+    # summary
+    # Description: Returns the statistics as a dictionary for JSON output
+    ##
+    def summary(self):
+        summary = {"calls": self.calls,
+                   "total": round(self.total, 3),
+                   "mean": round(self.total / max(self.calls, 1), 4),
+                   "p50": round(self.percentile(0.5), 4),
+                   "p95": round(self.percentile(0.95), 4),
+                   "max": round(self.longest, 4),
+                   "histogram": dict([(bucketLabel(index), count)
+                                      for index, count in enumerate(self.histogram) if count > 0])}
+        if self.nodeCalls > 0:
+            summary["nodes"] = self.nodes
+            summary["nodesPerCall"] = round(float(self.nodes) / self.nodeCalls, 1)
+            summary["nodesPerSec"] = round(self.nodes / max(self.total, 1e-9), 1)
+        return summary
+
+##
+# Profiler
+# Description: The CallStats of every author and method, and each author's
+#   cProfile statistics
+#
+# Variables:
+#   profile - whether calls are run under cProfile (boolean)
+#   calls - the CallStats of each method of each author ({author: {methodName: CallStats}})
+#   stats - the combined cProfile statistics of each author ({author: pstats.Stats})
+##
+class Profiler(object):
+
+    ##
+    # __init__
+    # Description: Creates a new Profiler with no calls counted
+    #
+    # Parameters:
+    #   inputProfile - whether calls are to be run under cProfile (boolean)
+    ##
+    def __init__(self, inputProfile = False):
+        self.profile = inputProfile
+        self.calls = {}
+        self.stats = {}
+
+    ##
+    # record
+    # Description: Counts one call to an AI
+    #
+    # Parameters:
+    #   author - the author of the AI (string)
+    #   methodName - the method called (string)
+    #   elapsed - the seconds the call took (float)
+    #   nodes - the nodes the AI searched, or None if it didn't say (int)
+    #   stats - the raw cProfile statistics of the call, or None (dict)
+    ##
+    def record(self, author, methodName, elapsed, nodes = None, stats = None):
+        methods = self.calls.setdefault(author, {})
+        if methodName not in methods:
+            methods[methodName] = CallStats()
+        methods[methodName].add(elapsed, nodes)
+        if stats != None:
+            self.addStats(author, statsFromData(stats))
+
+    ##
+    # addStats
+    # Description: Adds cProfile statistics to those of an author
+    #
+    # Parameters:
+    #   author - the author of the AI (string)
+    #   stats - the statistics (pstats.Stats)
+    ##
+    def addStats(self, author, stats):
+        if author in self.stats:
+            self.stats[author].add(stats)
+        else:
+            self.stats[author] = stats
+
+    ##
+    # authorTotal
+    # Description: Returns the CallStats of all the calls to one author's AI,
+    #     whatever the method
+    ##
+    def authorTotal(self, author):
+        total = CallStats()
+        for callStats in self.calls.get(author, {}).values():
+            total.merge(callStats)
+        return total
+
+    ##
+    # toData
+    # Description: Returns everything counted as plain values, to send to
+    #     another process's Profiler.merge
+    ##
+    def toData(self):
+        calls = {}
+        for author, methods in self.calls.items():
+            calls[author] = dict([(methodName, callStats.toData()) for methodName, callStats in methods.items()])
+        stats = dict([(author, authorStats.stats) for author, authorStats in self.stats.items()])
+        return {"calls": calls, "stats": stats}
+
+    ##
+    # merge
+    # Description: Adds what another Profiler counted
+    #
+    # Parameters:
+    #   data - the other Profiler's toData()
+    ##
+    def merge(self, data):
+        for author, methods in data["calls"].items():
+            for methodName, callData in methods.items():
+                mine = self.calls.setdefault(author, {})
+                if methodName in mine:
+                    mine[methodName].merge(CallStats(callData))
+                else:
+                    mine[methodName] = CallStats(callData)
+        for author, stats in data["stats"].items():
+            self.addStats(author, statsFromData(stats))
+
+    ##
+    # summary
+    # Description: Returns the statistics of every author as a dictionary for
+    #     JSON output.  Besides its methods, each author has an "all" entry
+    #     totalling every call to its AI.
+    ##
+    def summary(self):
+        summary = {}
+        for author, methods in self.calls.items():
+            summary[author] = dict([(methodName, callStats.summary()) for methodName, callStats in methods.items()])
+            summary[author]["all"] = self.authorTotal(author).summary()
+        return summary
+
+    ##
+    # printTable
+    # Description: Prints a table of the call statistics of each author and
+    #     method, like the tournament score table
+    ##
+    def printTable(self):
+        rows = [("Author", "Method", "Calls", "Mean", "p95", "Max", "Nodes/call")]
+        for author in sorted(self.calls.keys()):
+            for methodName in PROFILED_METHODS:
+                if methodName not in self.calls[author]:
+                    continue
+                summary = self.calls[author][methodName].summary()
+                rows.append((author, methodName, summary["calls"], "%.4f" % summary["mean"],
+                             "%.4f" % summary["p95"], "%.4f" % summary["max"],
+                             summary.get("nodesPerCall", "-")))
+        lengths = [max([len(str(row[index])) for row in rows]) for index in range(0, len(rows[0]))]
+        for index in range(0, len(rows)):
+            print "".join([str(rows[index][column]).ljust(lengths[column] + FIELD_PADDING)
+                           for column in range(0, len(rows[index]))]).rstrip()
+            if index == 0:
+                print " ".join(["-" * (length + FIELD_PADDING - 1) for length in lengths])
+
+    ##
+    # dumpStats
+    # Description: Writes the cProfile statistics of each author to
+    #     <directory>/<author>.prof, which "python -m pstats" can read
+    #
+    # Parameters:
+    #   directory - where to write the files, which is created if needed (string)
+    #
+    # Return: the paths of the files written (string[])
+    ##
+    def dumpStats(self, directory):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        paths = []
+        for author, stats in sorted(self.stats.items()):
+            path = os.path.join(directory, "".join([c if c.isalnum() or c in "-_." else "_" for c in author]) + ".prof")
+            stats.dump_stats(path)
+            paths.append(path)
+        return paths
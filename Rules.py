@@ -0,0 +1,672 @@
+import traceback
+from Constants import *
+from Ant import Ant, UNIT_STATS
+from Building import Building
+from Construction import Construction, CONSTR_STATS
+from Inventory import Inventory
+from Location import Location
+from GameState import GameState, NO_ATTACK, addCoords
+from PlayerView import PlayerView
+from Move import Move
+from AIPlayerUtils import listAllLegalMoves, getLegalMovesKey
+
+#
+# Rules.py
+#
+# The rules of the game, as functions of a GameState with no display, no
+# players' processes and no side effects beyond the state they are given.
+# Game uses them to referee games, and simulations can use them (and
+# playGame, which plays a whole game between two Players) directly.
+#
+# Every function works in board coordinates, as player one sees the board,
+# except where it says the coordinates are those of the player whose turn
+# it is.  The checks work on states with or without a board (see
+# GameState.fastclone).
+#
+
+##
+# isValidCoord
+#
+# Description: Returns whether this coord represents a valid board location.
+#
+# Parameters:
+#   coord - The coord to be checked ((int, int))
+#
+# Returns: True if the coordinate is between (0,0) and (9,9)
+#
+def isValidCoord(coord):
+    #check for well-formed coord
+    if type(coord) != tuple or len(coord) != 2 or type(coord[0]) != int or type(coord[1]) != int:
+        return False
+
+    #check boundaries
+    if coord[0] < 0 or coord[1] < 0 or coord[0] >= BOARD_LENGTH or coord[1] >= BOARD_LENGTH:
+        return False
+
+    return True
+
+##
+# isInHomeTerritory
+#
+# Description: determines whether the position is in the home territory of
+# the player whose coordinates it is in
+#
+# Returns: True if it is and False otherwise
+#
+def isInHomeTerritory(coord):
+    return isValidCoord(coord) and coord[1] >= 0 and coord[1] < BOARD_LENGTH / 2 - 1
+
+##
+# isInEnemyTerritory
+#
+# Description: determines whether the position is in the enemy's territory
+# of the player whose coordinates it is in
+#
+# Returns: True if it is and False otherwise
+#
+def isInEnemyTerritory(coord):
+    return isValidCoord(coord) and coord[1] < BOARD_LENGTH and coord[1] >= BOARD_LENGTH / 2 + 1
+
+##
+# checkMoveStart
+#
+# Description: Checks if the location is valid to move from (bounds and
+# ant ownership)
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   coord - The starting point for the move ((int, int))
+#
+# Returns: True if it is a valid starting point for a move and false if not
+#
+def checkMoveStart(state, coord):
+    if not isValidCoord(coord):
+        return False
+    antToMove = state.getAntAt(coord)
+    #check that it's the player's ant and that it hasn't moved
+    return antToMove != None and antToMove.player == state.whoseTurn and not antToMove.hasMoved
+
+##
+# checkMovePath
+#
+# Description: Checks if the location is valid to move to (clear path,
+# adjacent locations).  fromCoord must already have been checked.
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   fromCoord - The Ant's current coordinate ((int, int))
+#   toCoord - The coordinate to move the Ant to ((int, int))
+#
+# Returns: True if it is a valid step and false otherwise
+#
+def checkMovePath(state, fromCoord, toCoord):
+    if not isValidCoord(toCoord):
+        return False
+    #check that squares are adjacent (difference on only one axis is 1)
+    if abs(fromCoord[0] - toCoord[0]) + abs(fromCoord[1] - toCoord[1]) != 1:
+        return False
+    return state.getAntAt(toCoord) == None
+
+##
+# checkBuildStart
+#
+# Description: Checks if the location is valid to build from: an empty
+# anthill or an unmoved worker not on a construction, belonging to the
+# player whose turn it is
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   coord - The coordinate trying to be used to build ((int, int))
+#
+# Returns: True if it is a valid build location and false otherwise
+#
+def checkBuildStart(state, coord):
+    if not isValidCoord(coord):
+        return False
+    ant = state.getAntAt(coord)
+    constr = state.getConstrAt(coord)
+    if constr != None and constr.type == ANTHILL and ant == None:
+        return constr.player == state.whoseTurn
+    elif ant != None and ant.type == WORKER and constr == None:
+        return ant.player == state.whoseTurn and not ant.hasMoved
+    return False
+
+##
+# isValidMove
+#
+# Description: Checks to see if the move is valid for the player whose turn
+# it is.
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   move - The Move to check, in board coordinates (Move)
+#   errors - A list the reasons an invalid move is invalid are added to, or
+#            None (string[])
+#
+# Returns: None if no move is given or the move starts somewhere the player
+# can't move or build from, True if the move is valid, or False if it is
+# invalid
+#
+def isValidMove(state, move, errors = None):
+    if errors == None:
+        errors = []
+
+    #check for no move
+    if move == None:
+        return None
+
+    #check that the move is well-formed typewise (tuples, ints, etc)
+    if type(move) != Move:
+        errors.append("player did not supply an object of type 'Move'")
+        return False
+    if type(move.moveType) != int:
+        errors.append("Move type must be an integer.")
+        return False
+    #for END type moves, lots we don't need to check
+    if move.moveType == END:
+        return True
+    if move.coordList == None or type(move.coordList) != list or len(move.coordList) == 0:
+        errors.append("The coordinate list is empty!")
+        return False
+    for index in xrange(0, len(move.coordList)):
+        coord = move.coordList[index]
+        if type(coord) != tuple:
+            errors.append("Coordinate at index " + str(index) + " is not a tuple.")
+            return False
+        if len(coord) != 2:
+            errors.append("Coordinate at index " + str(index) + " has " + str(len(coord)) + " entries instead of 2.")
+            return False
+        if type(coord[0]) != int or type(coord[1]) != int:
+            errors.append("Coordinate at index " + str(index) + " contains a value that is not an int.")
+            return False
+    if type(move.buildType) != type(None) and type(move.buildType) != int:
+        return False
+
+    if move.moveType == MOVE_ANT:
+        return isValidAntMove(state, move, errors)
+    elif move.moveType == BUILD:
+        return isValidBuild(state, move, errors)
+    #invalid numeric move type
+    return False
+
+##
+# isValidAntMove
+#
+# Description: The part of isValidMove for well-formed MOVE_ANT moves
+#
+def isValidAntMove(state, move, errors):
+    #check valid start location (good coords and ant ownership)
+    firstCoord = move.coordList[0]
+    if not checkMoveStart(state, firstCoord):
+        return None
+    antToMove = state.getAntAt(firstCoord)
+    movePoints = UNIT_STATS[antToMove.type][MOVEMENT]
+
+    for index in xrange(1, len(move.coordList)):
+        coord = move.coordList[index]
+        #if any to-coords are invalid, return invalid move
+        if not checkMovePath(state, move.coordList[index - 1], coord):
+            errors.append("Illegal movement path at index" + str(index - 1))
+            return False
+
+        #subtract cost of loc from movement points
+        constrAtLoc = state.getConstrAt(coord)
+        if constrAtLoc == None or antToMove.type == DRONE:
+            movePoints -= 1
+        else:
+            movePoints -= CONSTR_STATS[constrAtLoc.type][MOVE_COST]
+
+    #Check for Queen ant trying to leave her territory
+    if antToMove.type == QUEEN:
+        for coord in move.coordList:
+            if coord[1] == BOARD_LENGTH / 2 - 1 or coord[1] == BOARD_LENGTH / 2:
+                errors.append("Queen ant may not leave her own territory")
+                return False
+
+    #within movement range and hasn't moved yet?
+    if movePoints < 0:
+        errors.append("Ant has insufficient movement points for this move")
+        return False
+    return True
+
+##
+# isValidBuild
+#
+# Description: The part of isValidMove for well-formed BUILD moves
+#
+def isValidBuild(state, move, errors):
+    #coord list must contain one point for build
+    if len(move.coordList) != 1:
+        errors.append("for a BUILD move, the coordinate list should contain exactly 1 coordinate")
+        return False
+
+    buildCoord = move.coordList[0]
+    currFood = state.inventories[state.whoseTurn].foodCount
+    if not checkBuildStart(state, buildCoord):
+        errors.append("Build location invalid.  Possible cause:")
+        if not isValidCoord(buildCoord):
+            errors.append("  - Location is off the board")
+        elif state.getAntAt(buildCoord) == None:  #building ant
+            errors.append("  - Anthill does not belong to current player")
+        elif move.buildType != TUNNEL:
+            errors.append("  - Anthill is already occupied")
+        elif state.getAntAt(buildCoord).hasMoved:
+            errors.append("  - Worker ant has already moved this turn")
+        else:
+            errors.append("  - Worker ant does not belong to current player")
+        return None
+
+    if state.getAntAt(buildCoord) == None:
+        #we know we're building an ant
+        if move.buildType not in (WORKER, DRONE, SOLDIER, R_SOLDIER):
+            errors.append("the buildType must be one of:  WORKER, DRONE, SOLDIER or R_SOLDIER.")
+            return False
+        buildCost = UNIT_STATS[move.buildType][COST]
+        if currFood < buildCost:
+            errors.append("Requires " + str(buildCost) + " food to build this ant (player has " + str(currFood) + ").")
+            return False
+        return True
+
+    #we know we're building a construction; no food may be adjacent
+    for offset in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
+        aCoord = addCoords(buildCoord, offset)
+        if isValidCoord(aCoord):
+            constr = state.getConstrAt(aCoord)
+            if constr != None and constr.type == FOOD:
+                errors.append("Cannot tunnel build next to food.")
+                return False
+
+    buildCost = CONSTR_STATS[TUNNEL][BUILD_COST]
+    if currFood < buildCost:
+        errors.append("Requires " + str(buildCost) + " food to build a tunnel (player has " + str(currFood) + ").")
+        return False
+    return True
+
+##
+# isValidPlacement
+#
+# Description: Checks that the given placement of constructions is valid
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   constrTypes - The types of the constructions to place, in order (int[])
+#   targets - The coordinates to place them at, in the coordinates of the
+#             player whose turn it is ((int,int)[])
+#
+# Returns: None if no target is given, true if it is a valid placement, or
+# false if it is an invalid placement
+#
+def isValidPlacement(state, constrTypes, targets):
+    #check for well-formed input of targets (from players)
+    if type(targets) != list:
+        return False
+    if len(targets) == 0:
+        return None
+    for coord in targets:
+        if not isValidCoord(coord):
+            return False
+
+    for i in xrange(0, len(targets)):
+        #nobody can place in the center two rows of the board, nor food on their own side
+        if constrTypes[i] == ANTHILL or constrTypes[i] == TUNNEL or constrTypes[i] == GRASS:
+            if not isInHomeTerritory(targets[i]):
+                return False
+        elif constrTypes[i] == FOOD:
+            if not isInEnemyTerritory(targets[i]):
+                return False
+        else:
+            return False
+
+        #make sure nothing is there yet
+        if state.getConstrAt(state.coordLookup(targets[i], state.whoseTurn)) != None:
+            return False
+
+    return True
+
+##
+# listAttackCoords
+#
+# Description: Lists the enemy ants an ant can attack from where it is
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   attackingAnt - The ant that has just moved (Ant)
+#
+# Returns: The coords of the ants, in the order of the enemy's inventory ((int, int)[])
+#
+def listAttackCoords(state, attackingAnt):
+    enemyInv = state.inventories[(attackingAnt.player + 1) % 2]
+    return [ant.coords for ant in enemyInv.ants if isValidAttack(state, attackingAnt, ant.coords)]
+
+##
+# isValidAttack
+#
+# Description: Determines whether an ant can attack the given location
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   attackingAnt - The Ant that is attacking (Ant)
+#   attackCoord - The coordinates of the Ant that is being attacked ((int,int))
+#
+# Returns: None if there is no attackCoord, true if valid attack, or false if invalid attack
+#
+def isValidAttack(state, attackingAnt, attackCoord):
+    if attackCoord == None:
+        return None
+    if not isValidCoord(attackCoord):
+        return False
+
+    attackedAnt = state.getAntAt(attackCoord)
+    if attackedAnt == None or attackedAnt.player == attackingAnt.player:
+        return False
+
+    #pythagoras would be proud
+    range = UNIT_STATS[attackingAnt.type][RANGE]
+    diffX = attackingAnt.coords[0] - attackCoord[0]
+    diffY = attackingAnt.coords[1] - attackCoord[1]
+    return range ** 2 >= diffX ** 2 + diffY ** 2
+
+##
+# listLegalMoves
+#
+# Description: Lists every legal move of the player whose turn it is
+#
+# Returns: The moves (Move[])
+#
+def listLegalMoves(state):
+    return listAllLegalMoves(state)
+
+##
+# moveKey
+#
+# Description: Returns a hashable key of a well-formed move, equal for
+# moves that make the same change to the same state
+#
+# Parameters:
+#   move - The move (Move)
+#
+# Returns: The key, or None if the move isn't a well-formed Move
+#
+def moveKey(move):
+    if type(move) != Move or type(move.moveType) != int:
+        return None
+    if move.buildType != None and type(move.buildType) != int:
+        return None
+    if move.coordList == None:
+        return (move.moveType, None, move.buildType)
+    if type(move.coordList) != list:
+        return None
+    for coord in move.coordList:
+        if type(coord) != tuple or len(coord) != 2 or type(coord[0]) != int or type(coord[1]) != int:
+            return None
+    return (move.moveType, tuple(move.coordList), move.buildType)
+
+##
+# offerLegalMoves
+#
+# Description: Lists the legal moves of the player whose turn it is and
+# keeps them on the state, which is about to be handed to that player.
+# As long as the player doesn't change the state,
+# AIPlayerUtils.listAllLegalMoves returns these moves instead of listing
+# them again.
+#
+# Parameters:
+#   state - The state the player is given (GameState)
+#
+# Returns: The keys of the moves (see moveKey), in the state's coordinates.
+# A move with one of these keys is valid without any further checks.
+#
+def offerLegalMoves(state):
+    state.legalMoves = None
+    moves = listAllLegalMoves(state)
+    state.legalMoves = moves
+    state.legalMovesKey = getLegalMovesKey(state)
+    return set([moveKey(move) for move in moves])
+
+##
+# moveAnt
+#
+# Description: Moves an ant along a valid path without attacking
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   coordList - The path, starting at the ant ((int, int)[])
+#
+# Returns: The ant that moved (Ant)
+#
+def moveAnt(state, coordList):
+    state.applyMove(Move(MOVE_ANT, coordList, None), NO_ATTACK)
+    return state.getAntAt(coordList[-1])
+
+##
+# attack
+#
+# Description: Has an ant make a valid attack, removing the attacked ant if
+# it dies
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   attackingAnt - The Ant that is attacking (Ant)
+#   attackCoord - The coordinates of the Ant that is being attacked ((int,int))
+#
+def attack(state, attackingAnt, attackCoord):
+    state.resolveAttack([], attackingAnt, attackCoord)
+
+##
+# applyMove
+#
+# Description: Makes a valid move, including the attack a MOVE_ANT leads to
+# (see GameState.applyMove for attackCoord), building, or ending the turn:
+# gathering and depositing food, capturing buildings and passing the turn
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   move - The Move to make (Move)
+#   attackCoord - The ant to attack after a MOVE_ANT ((int, int))
+#
+def applyMove(state, move, attackCoord = None):
+    state.applyMove(move, attackCoord)
+
+##
+# hasWon
+#
+# Description: Determines whether the game has ended in victory for the given player.
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   playerId - The ID of the player being checked for winning (int)
+#
+# Returns: True if the player with playerId has won the game.
+#
+def hasWon(state, playerId):
+    if state.phase != PLAY_PHASE:
+        return False
+    myInv = state.inventories[playerId]
+    enemyInv = state.inventories[(playerId + 1) % 2]
+    return (enemyInv.getQueen() == None or
+            enemyInv.getAnthill().captureHealth <= 0 or
+            myInv.foodCount >= FOOD_GOAL or
+            (enemyInv.foodCount == 0 and len(enemyInv.ants) == 1))
+
+##
+# getWinner
+#
+# Description: Returns the id of the player that has won, or None.  Player
+# one is checked first, as Game does.
+#
+def getWinner(state):
+    for playerId in (PLAYER_ONE, PLAYER_TWO):
+        if hasWon(state, playerId):
+            return playerId
+    return None
+
+##
+# newGameState
+#
+# Description: Returns the state at the start of a game: an empty board in
+# SETUP_PHASE_1, with player one to place
+#
+def newGameState():
+    board = [[Location((col, row)) for row in xrange(0, BOARD_LENGTH)] for col in xrange(0, BOARD_LENGTH)]
+    inventories = [Inventory(PLAYER_ONE, [], [], 0), Inventory(PLAYER_TWO, [], [], 0), Inventory(NEUTRAL, [], [], 0)]
+    return GameState(board, inventories, SETUP_PHASE_1, PLAYER_ONE)
+
+##
+# setupItems
+#
+# Description: Returns the types of the constructions each player places
+# in a setup phase, in the order they are placed
+#
+# Parameters:
+#   phase - SETUP_PHASE_1 or SETUP_PHASE_2 (int)
+#
+def setupItems(phase):
+    if phase == SETUP_PHASE_1:
+        return [ANTHILL, TUNNEL] + [GRASS] * 9
+    return [FOOD] * 2
+
+##
+# placeConstructions
+#
+# Description: Places constructions at valid targets for the player whose
+# turn it is
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   constrTypes - The types still to place, in order; the placed ones are
+#                 taken off the front (int[])
+#   targets - Where to place them, in board coordinates ((int, int)[])
+#
+def placeConstructions(state, constrTypes, targets):
+    me = state.whoseTurn
+    for target in targets:
+        constrType = constrTypes.pop(0)
+        if constrType == ANTHILL or constrType == TUNNEL:
+            constr = Building(target, constrType, me)
+            state.inventories[me].constrs.append(constr)
+        else:
+            constr = Construction(target, constrType)
+            state.inventories[NEUTRAL].constrs.append(constr)
+        if state.board != None:
+            state.board[target[0]][target[1]].constr = constr
+    state.zobristHash = None
+
+##
+# endSetupStep
+#
+# Description: Moves on once a player has placed everything in constrTypes.
+# After player two's food is placed, each player gets a queen on its
+# anthill, a worker on its tunnel and one food, and play begins.
+#
+# Parameters:
+#   state - The state of the game (GameState)
+#   constrTypes - Refilled with what the next player places (int[])
+#
+def endSetupStep(state, constrTypes):
+    if state.whoseTurn == PLAYER_TWO:
+        if state.phase == SETUP_PHASE_1:
+            state.phase = SETUP_PHASE_2
+        elif state.phase == SETUP_PHASE_2:
+            for inv in state.inventories[:NEUTRAL]:
+                for ant in [Ant(inv.getAnthill().coords, QUEEN, inv.player),
+                            Ant(inv.getTunnels()[0].coords, WORKER, inv.player)]:
+                    inv.ants.append(ant)
+                    if state.board != None:
+                        state.board[ant.coords[0]][ant.coords[1]].ant = ant
+                inv.foodCount = 1
+            state.phase = PLAY_PHASE
+    if state.phase != PLAY_PHASE:
+        constrTypes.extend(setupItems(state.phase))
+    state.whoseTurn = (state.whoseTurn + 1) % 2
+    state.zobristHash = None
+
+##
+# getPlayerView
+#
+# Description: Returns the copy of the state a player is shown: flipped for
+# player two, and without player one's setup while player two places its
+# own
+#
+def getPlayerView(state):
+    return PlayerView(state, state.whoseTurn == PLAYER_TWO and state.phase == SETUP_PHASE_1)
+
+##
+# askPlayer
+#
+# Description: Calls one of a player's methods.  An exception raised by the
+# player is printed and answered with None, as PlayerProcess does, which
+# the rules treat as an invalid placement, move or attack.
+#
+# Parameters:
+#   player - The Player to call (Player)
+#   methodName - The name of the method to call (string)
+#   args - The arguments to pass to the method
+#
+# Returns: whatever the method returned, or None if it raised
+#
+def askPlayer(player, methodName, *args):
+    try:
+        return getattr(player, methodName)(*args)
+    except Exception:
+        traceback.print_exc()
+        return None
+
+##
+# playGame
+#
+# Description: Plays a whole game between two Players, showing each one the
+# same view of the state Game does.  A player that makes an invalid
+# placement, move or attack, or raises an exception, loses.  Exceptions
+# raised by the rules themselves are not caught.
+#
+# Parameters:
+#   players - Player one and player two (Player[])
+#   maxPlies - The most placements and moves to play before giving up, or
+#              None for no limit (int)
+#
+# Returns: The id of the winner, or None if maxPlies was reached
+#
+def playGame(players, maxPlies = None):
+    state = newGameState()
+    constrTypes = setupItems(SETUP_PHASE_1)
+    plies = 0
+    winner = None
+    while winner == None and (maxPlies == None or plies < maxPlies):
+        me = state.whoseTurn
+        if state.phase != PLAY_PHASE:
+            targets = askPlayer(players[me], "getPlacement", getPlayerView(state))
+            if type(targets) == list and isValidPlacement(state, constrTypes, targets[:len(constrTypes)]):
+                placeConstructions(state, constrTypes, [state.coordLookup(target, me) for target in targets[:len(constrTypes)]])
+                if not constrTypes:
+                    endSetupStep(state, constrTypes)
+            else:
+                winner = (me + 1) % 2
+        else:
+            view = getPlayerView(state)
+            offeredKeys = offerLegalMoves(view)
+            move = askPlayer(players[me], "getMove", view)
+            key = moveKey(move)
+            if key != None and move.coordList != None:
+                move = Move(move.moveType, [state.coordLookup(coord, me) for coord in move.coordList], move.buildType)
+            if key == None or (key not in offeredKeys and not isValidMove(state, move)):
+                winner = (me + 1) % 2
+            elif move.moveType == MOVE_ANT:
+                ant = moveAnt(state, move.coordList)
+                attackCoords = listAttackCoords(state, ant)
+                if attackCoords:
+                    attackCoord = askPlayer(players[me], "getAttack", getPlayerView(state), ant.clone(),
+                                            [state.coordLookup(coord, me) for coord in attackCoords])
+                    if isValidCoord(attackCoord) and isValidAttack(state, ant, state.coordLookup(attackCoord, me)):
+                        attack(state, ant, state.coordLookup(attackCoord, me))
+                    else:
+                        winner = (me + 1) % 2
+            else:
+                applyMove(state, move)
+        plies += 1
+        if winner == None:
+            winner = getWinner(state)
+
+    if winner != None:
+        askPlayer(players[winner], "registerWin", True)
+        askPlayer(players[(winner + 1) % 2], "registerWin", False)
+    return winner
@@ -0,0 +1,231 @@
+import time
+from Constants import *
+from AIPlayerUtils import listAllLegalMoves
+from Rules import getWinner, moveKey
+from TranspositionTable import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+#
+# SearchEngine.py
+#
+# An iterative-deepening alpha-beta search that AI players can share instead
+# of each writing their own recursive search.  A player only supplies an
+# evaluation function:
+#
+#     def __init__(self, inputPlayerId):
+#         ...
+#         self.engine = SearchEngine(self.evaluateState)
+#
+#     def getMove(self, currentState):
+#         move = self.engine.getMove(currentState)
+#         #reported in the game's profile of the player (see Player.nodes)
+#         self.nodes = self.engine.nodes
+#         return move
+#
+# The engine searches one move (not one turn) per ply, maximizing for the
+# player whose turn it is at the root and minimizing for the opponent.  It
+# plays moves in place with GameState.applyMove/undoMove on a single
+# fastclone of the state, and remembers searched states in a
+# TranspositionTable, which also supplies the best move found by the last
+# iteration (the principal variation) to try first at every node.
+#
+
+#Fraction of AI_MOVE_TIMEOUT a search may use by default
+DEFAULT_TIME_FRACTION = 0.1
+#Deepest iteration to search, if there is time
+DEFAULT_MAX_DEPTH = 12
+#How many nodes are searched between checks of the clock
+NODES_PER_CLOCK_CHECK = 128
+
+##
+#SearchTimeout
+#Description: Raised inside a search when its time budget runs out
+##
+class SearchTimeout(Exception):
+    pass
+
+##
+#SearchEngine
+#Description: Finds the best move for a state by iterative deepening until
+#   its time budget runs out.
+#
+#Variables:
+#   evaluate - Rates a state for the player the engine searches for: higher
+#       is better.  It is given the engine's working state, so it must not
+#       change it or keep a reference to it. (function(GameState) -> number)
+#   timeBudget - Seconds each getMove may take (float)
+#   maxDepth - The deepest iteration to search (int)
+#   table - The transposition table, kept between moves (TranspositionTable)
+#   playerId - The player being searched for in the current search (int)
+#   deadline - The time the current search must end by (float)
+#   nodes - The number of states searched by the last getMove (int)
+#   depthReached - The depth of the last iteration getMove completed (int)
+##
+class SearchEngine(object):
+
+    ##
+    #__init__
+    #Description: Creates a new SearchEngine
+    #
+    #Parameters:
+    #   inputEvaluate - The evaluation function (see evaluate above)
+    #   inputTimeBudget - Seconds each getMove may take, or None for
+    #       DEFAULT_TIME_FRACTION of AI_MOVE_TIMEOUT (float)
+    #   inputMaxDepth - The deepest iteration to search (int)
+    #   inputTable - The transposition table to use, or None for a new one
+    #       (TranspositionTable)
+    ##
+    def __init__(self, inputEvaluate, inputTimeBudget = None, inputMaxDepth = DEFAULT_MAX_DEPTH, inputTable = None):
+        if inputTimeBudget == None:
+            inputTimeBudget = AI_MOVE_TIMEOUT * DEFAULT_TIME_FRACTION
+        if inputTable == None:
+            inputTable = TranspositionTable()
+        self.evaluate = inputEvaluate
+        self.timeBudget = inputTimeBudget
+        self.maxDepth = inputMaxDepth
+        self.table = inputTable
+        self.playerId = None
+        self.deadline = None
+        self.nodes = 0
+        self.depthReached = 0
+
+    ##
+    #getMove
+    #Description: Searches for the best move for the player whose turn it is.
+    #   Deeper and deeper iterations are searched until one runs out of
+    #   time; the move of the last complete iteration is returned.
+    #
+    #Parameters:
+    #   currentState - The state to move from (GameState)
+    #
+    #Return: The best Move found
+    ##
+    def getMove(self, currentState):
+        self.deadline = time.time() + self.timeBudget
+        self.playerId = currentState.whoseTurn
+        self.nodes = 0
+        self.depthReached = 0
+        self.table.newSearch()
+
+        state = currentState.fastclone()
+        moves = listAllLegalMoves(state)
+        bestMove = moves[0]
+        for depth in xrange(1, self.maxDepth + 1):
+            try:
+                bestMove, moves = self.searchRoot(state, depth, moves)
+            except SearchTimeout:
+                break
+            self.depthReached = depth
+            if time.time() >= self.deadline:
+                break
+        return bestMove
+
+    ##
+    #searchRoot
+    #Description: Searches every move from the root to the given depth
+    #
+    #Parameters:
+    #   state - The working state (GameState)
+    #   depth - The number of moves to look ahead (int)
+    #   moves - The moves from the root, best first according to the last
+    #       iteration (Move[])
+    #
+    #Return: A tuple of the best move and all the moves ordered by this
+    #   iteration's values, best first
+    ##
+    def searchRoot(self, state, depth, moves):
+        alpha = float("-inf")
+        beta = float("inf")
+        scored = []
+        for move in moves:
+            undo = state.applyMove(move)
+            try:
+                value = self.search(state, depth - 1, alpha, beta)
+            finally:
+                state.undoMove(undo)
+            scored.append((value, move))
+            alpha = max(alpha, value)
+
+        #stable, so ties keep the order of the last iteration
+        scored.sort(key = lambda entry: entry[0], reverse = True)
+        self.table.store(state.getHash(), depth, scored[0][0], EXACT, scored[0][1])
+        return (scored[0][1], [entry[1] for entry in scored])
+
+    ##
+    #search
+    #Description: Alpha-beta search of a state below the root
+    #
+    #Parameters:
+    #   state - The working state, which is restored before returning (GameState)
+    #   depth - The number of moves left to look ahead (int)
+    #   alpha - The value the searched-for player is already sure of (number)
+    #   beta - The value the opponent is already sure of (number)
+    #
+    #Return: The value of the state
+    ##
+    def search(self, state, depth, alpha, beta):
+        self.nodes += 1
+        if self.nodes % NODES_PER_CLOCK_CHECK == 0 and time.time() >= self.deadline:
+            raise SearchTimeout()
+
+        key = state.getHash()
+        value, tableMove = self.table.probe(key, depth, alpha, beta)
+        if value != None:
+            return value
+
+        if depth <= 0 or getWinner(state) != None:
+            value = self.evaluate(state)
+            self.table.store(key, depth, value, EXACT)
+            return value
+
+        maximizing = (state.whoseTurn == self.playerId)
+        originalAlpha = alpha
+        originalBeta = beta
+        bestValue = float("-inf") if maximizing else float("inf")
+        bestMove = None
+        for move in orderMoves(listAllLegalMoves(state), tableMove):
+            undo = state.applyMove(move)
+            try:
+                value = self.search(state, depth - 1, alpha, beta)
+            finally:
+                state.undoMove(undo)
+
+            if maximizing:
+                if value > bestValue:
+                    bestValue, bestMove = value, move
+                alpha = max(alpha, value)
+            else:
+                if value < bestValue:
+                    bestValue, bestMove = value, move
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        #record what kind of value this is in the window it was searched with
+        if bestValue <= originalAlpha:
+            flag = UPPER_BOUND
+        elif bestValue >= originalBeta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.table.store(key, depth, bestValue, flag, bestMove)
+        return bestValue
+
+##
+#orderMoves
+#Description: Puts a move first in a list of moves, if it is there
+#
+#Parameters:
+#   moves - The moves to order (Move[])
+#   firstMove - The move to try first, or None (Move)
+#
+#Return: The ordered list
+##
+def orderMoves(moves, firstMove):
+    if firstMove == None:
+        return moves
+    firstKey = moveKey(firstMove)
+    for i in xrange(0, len(moves)):
+        if moveKey(moves[i]) == firstKey:
+            return [moves[i]] + moves[:i] + moves[i + 1:]
+    return moves
+
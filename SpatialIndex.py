@@ -0,0 +1,176 @@
+##
+#SpatialIndex
+#Description: Lets the coordinate lookups in AIPlayerUtils (getAntAt and
+#   getConstrAt) be dictionary hits instead of scans of every inventory.
+#
+#   The index of a state is built from its inventories the first time it is
+#   needed and kept on the state.  AIs move ants by assigning to their
+#   coords and build by appending to inventory lists, so rather than
+#   requiring every AI to keep the index up to date, the index is
+#   rebuilt whenever it might be stale:
+#     - every assignment to the coords of an Ant or Construction, or to the
+#       ants or constrs of an Inventory, that is in an index bumps the
+#       version of that index, and
+#     - the length of every inventory list is checked, which catches
+#       appending and removing existing objects.
+#   The one change that goes unnoticed is replacing an item of an inventory
+#   list in place with an existing object, e.g. inv.ants[0] = otherAnt.
+#
+#   Each state has its own version, so the clones a search changes don't
+#   make the indexes of other states stale.  Building an index marks the
+#   objects in it as owned by its state.  An object that turns up in the
+#   indexes of two states (e.g. the lists Inventory.clone shares) is marked
+#   as shared instead, and changing it bumps a version every index checks.
+#   Objects that no index holds yet bump nothing.
+##
+
+#Key in an object's __dict__ of the version its assignments bump
+OWNER_KEY = "indexOwner"
+
+#Version bumped by the objects in the indexes of more than one state
+sharedVersion = [0]
+
+##
+#TrackedAttribute
+#Description: A data descriptor that bumps the version of the index owning
+#   an object (see SpatialIndex.claim) whenever the attribute is assigned.
+#   It has no __get__, so reading the attribute is an ordinary instance
+#   dictionary lookup and costs nothing extra.
+#
+#Variables:
+#   name - The name of the attribute (string)
+##
+class TrackedAttribute(object):
+
+    ##
+    #__init__
+    #Description: Creates a new TrackedAttribute
+    #
+    #Parameters:
+    #   inputName - The name of the attribute, which must match the name of
+    #       the class variable holding the descriptor (string)
+    ##
+    def __init__(self, inputName):
+        self.name = inputName
+
+    def __set__(self, obj, value):
+        owner = obj.__dict__.get(OWNER_KEY)
+        if owner is not None:
+            owner[0] += 1
+        obj.__dict__[self.name] = value
+
+##
+#untrackedState
+#Description: The __getstate__ of the classes with TrackedAttributes.  Leaves
+#   out the owner, so a pickled or copied object belongs to no index.
+##
+def untrackedState(obj):
+    state = obj.__dict__.copy()
+    state.pop(OWNER_KEY, None)
+    return state
+
+##
+#SpatialIndex
+#Description: Maps coordinates to the first ant and first construction found
+#   there, in the order AIPlayerUtils.getAntList and getConstrList list them.
+#
+#Variables:
+#   ants - Ant at each occupied coordinate ({(int, int): Ant})
+#   constrs - Construction at each occupied coordinate ({(int, int): Construction})
+#   owner - The version of the state, kept by the indexes it has had ([int])
+#   version - The value of owner when the index was built
+#   sharedVersion - The value of sharedVersion when the index was built
+#   inventories - The inventory list the index was built from
+#   lists - The ant and construction lists of those inventories
+#   sizes - The lengths of those lists when the index was built
+#   distances - The distance table AIPlayerUtils.stepsToReach uses for these
+#       constructions, or None until it is needed
+##
+class SpatialIndex(object):
+
+    ##
+    #__init__
+    #Description: Builds the index of a state
+    #
+    #Parameters:
+    #   state - The state to index (GameState)
+    #   owner - The version of the state from its previous index, or None
+    #       if it hasn't had one ([int])
+    ##
+    def __init__(self, state, owner = None):
+        if owner == None:
+            owner = [0]
+        self.owner = owner
+        self.ants = {}
+        self.constrs = {}
+        self.inventories = state.inventories
+        self.lists = []
+        for inv in self.inventories:
+            self.lists.append(inv.ants)
+            self.lists.append(inv.constrs)
+        self.sizes = map(len, self.lists)
+        self.distances = None
+        for inv in self.inventories:
+            self.claim(inv)
+            for ant in inv.ants:
+                self.claim(ant)
+                self.ants.setdefault(indexKey(ant.coords), ant)
+            for constr in inv.constrs:
+                self.claim(constr)
+                self.constrs.setdefault(indexKey(constr.coords), constr)
+        self.version = self.owner[0]
+        self.sharedVersion = sharedVersion[0]
+
+    ##
+    #claim
+    #Description: Marks an object as owned by this index's state, or as
+    #   shared if another state's index owns it
+    #
+    #Parameters:
+    #   obj - An Ant, Construction or Inventory of the state
+    ##
+    def claim(self, obj):
+        owner = obj.__dict__.get(OWNER_KEY)
+        if owner is None:
+            obj.__dict__[OWNER_KEY] = self.owner
+        elif owner is not self.owner:
+            obj.__dict__[OWNER_KEY] = sharedVersion
+
+    ##
+    #isValidFor
+    #Description: Checks whether the index still matches a state
+    #
+    #Parameters:
+    #   state - The state that was indexed (GameState)
+    ##
+    def isValidFor(self, state):
+        return (self.version == self.owner[0] and
+                self.sharedVersion == sharedVersion[0] and
+                self.inventories is state.inventories and
+                map(len, self.lists) == self.sizes)
+
+##
+#indexKey
+#Description: Returns the dictionary key for a coordinate, which may have been
+#   given as a list
+##
+def indexKey(coords):
+    if type(coords) is tuple:
+        return coords
+    return tuple(coords)
+
+##
+#getSpatialIndex
+#Description: Returns an up to date SpatialIndex of a state, building a new
+#   one if the cached one is missing or might be stale
+#
+#Parameters:
+#   state - The state to index (GameState)
+##
+def getSpatialIndex(state):
+    index = getattr(state, "spatialIndex", None)
+    if index == None or not index.isValidFor(state):
+        #a rebuilt index keeps the state's version
+        index = SpatialIndex(state, index.owner if index != None else None)
+        state.spatialIndex = index
+    return index
@@ -0,0 +1,166 @@
+import numpy
+from Constants import *
+from Ant import UNIT_STATS
+from Construction import CONSTR_STATS
+
+#
+# StateFeatures.py
+#
+# Converts GameStates into fixed-width NumPy arrays for learning agents, so
+# that each agent doesn't have to hand-code its own encoding of the board and
+# so that training and evaluation can work on whole batches of states.
+#
+# A state is encoded from the point of view of one player ("mine" vs.
+# "enemy", defaulting to the player whose turn it is) as a stack of
+# NUM_PLANES 10x10 planes, indexed [plane][x][y], plus NUM_GLOBALS values
+# that don't belong to a cell.  extractFeatures flattens both into one
+# vector of FEATURE_LENGTH values.  Only the inventories are read, so
+# states made by GameState.fastclone work too.  All values are between 0
+# and 1.
+#
+# This module needs NumPy.
+#
+
+#Planes: one-hot ant type for each side (indexed by ant type)
+MY_ANT_PLANE = 0
+ENEMY_ANT_PLANE = MY_ANT_PLANE + R_SOLDIER + 1
+#Planes: other features of the ant in a cell
+ANT_HEALTH_PLANE = ENEMY_ANT_PLANE + R_SOLDIER + 1 #health / max health of its type
+CARRYING_PLANE = ANT_HEALTH_PLANE + 1
+MOVED_PLANE = CARRYING_PLANE + 1
+#Planes: one-hot construction type (indexed by type - ANTHILL)
+CONSTR_PLANE = MOVED_PLANE + 1
+#Planes: the owner and capture health (/ max capture health) of a building
+MY_BUILDING_PLANE = CONSTR_PLANE + FOOD - ANTHILL + 1
+ENEMY_BUILDING_PLANE = MY_BUILDING_PLANE + 1
+CAPTURE_HEALTH_PLANE = ENEMY_BUILDING_PLANE + 1
+NUM_PLANES = CAPTURE_HEALTH_PLANE + 1
+
+#Globals: food counts (/ FOOD_GOAL) and whether it is my turn
+MY_FOOD = 0
+ENEMY_FOOD = 1
+MY_TURN = 2
+NUM_GLOBALS = 3
+
+PLANE_SIZE = BOARD_LENGTH * BOARD_LENGTH
+FEATURE_LENGTH = NUM_PLANES * PLANE_SIZE + NUM_GLOBALS
+
+##
+# fillFeatures
+#
+# writes the encoding of a state into preallocated, zeroed arrays
+#
+# Parameters:
+#   state    - the state to encode (GameState)
+#   planes   - array of shape (NUM_PLANES, BOARD_LENGTH, BOARD_LENGTH) to fill
+#   globals_ - array of shape (NUM_GLOBALS,) to fill
+#   playerId - the player whose point of view to use, or None for the player
+#              whose turn it is
+def fillFeatures(state, planes, globals_, playerId = None):
+    if playerId == None:
+        playerId = state.whoseTurn
+
+    for inv in state.inventories:
+        for ant in inv.ants:
+            x, y = ant.coords
+            if ant.player == playerId:
+                planes[MY_ANT_PLANE + ant.type, x, y] = 1.0
+            else:
+                planes[ENEMY_ANT_PLANE + ant.type, x, y] = 1.0
+            planes[ANT_HEALTH_PLANE, x, y] = float(ant.health) / UNIT_STATS[ant.type][HEALTH]
+            if ant.carrying:
+                planes[CARRYING_PLANE, x, y] = 1.0
+            if ant.hasMoved:
+                planes[MOVED_PLANE, x, y] = 1.0
+
+        for constr in inv.constrs:
+            x, y = constr.coords
+            planes[CONSTR_PLANE + constr.type - ANTHILL, x, y] = 1.0
+            #only Buildings have an owner and capture health
+            owner = getattr(constr, "player", NEUTRAL)
+            if owner == playerId:
+                planes[MY_BUILDING_PLANE, x, y] = 1.0
+            elif owner != NEUTRAL:
+                planes[ENEMY_BUILDING_PLANE, x, y] = 1.0
+            if owner != NEUTRAL:
+                planes[CAPTURE_HEALTH_PLANE, x, y] = \
+                    float(constr.captureHealth) / CONSTR_STATS[constr.type][CAP_HEALTH]
+
+    enemyId = (playerId + 1) % 2
+    globals_[MY_FOOD] = float(state.inventories[playerId].foodCount) / FOOD_GOAL
+    globals_[ENEMY_FOOD] = float(state.inventories[enemyId].foodCount) / FOOD_GOAL
+    if state.whoseTurn == playerId:
+        globals_[MY_TURN] = 1.0
+
+##
+# extractPlanes
+#
+# encodes a state as planes and globals
+#
+# Parameters:
+#   state    - the state to encode (GameState)
+#   playerId - the player whose point of view to use, or None for the player
+#              whose turn it is
+#
+# Return: a tuple of an array of shape (NUM_PLANES, BOARD_LENGTH, BOARD_LENGTH)
+# and an array of shape (NUM_GLOBALS,)
+def extractPlanes(state, playerId = None):
+    planes = numpy.zeros((NUM_PLANES, BOARD_LENGTH, BOARD_LENGTH))
+    globals_ = numpy.zeros(NUM_GLOBALS)
+    fillFeatures(state, planes, globals_, playerId)
+    return (planes, globals_)
+
+##
+# extractPlanesBatch
+#
+# encodes a list of states as planes and globals, all from the point of view
+# of the same player
+#
+# Parameters:
+#   states   - the states to encode (GameState[])
+#   playerId - the player whose point of view to use, or None for the player
+#              whose turn it is in each state
+#
+# Return: a tuple of an array of shape (len(states), NUM_PLANES, BOARD_LENGTH,
+# BOARD_LENGTH) and an array of shape (len(states), NUM_GLOBALS)
+def extractPlanesBatch(states, playerId = None):
+    planes = numpy.zeros((len(states), NUM_PLANES, BOARD_LENGTH, BOARD_LENGTH))
+    globals_ = numpy.zeros((len(states), NUM_GLOBALS))
+    for i in xrange(0, len(states)):
+        fillFeatures(states[i], planes[i], globals_[i], playerId)
+    return (planes, globals_)
+
+##
+# extractFeatures
+#
+# encodes a state as a single flat vector: the planes, flattened, followed by
+# the globals
+#
+# Parameters:
+#   state    - the state to encode (GameState)
+#   playerId - the player whose point of view to use, or None for the player
+#              whose turn it is
+#
+# Return: an array of shape (FEATURE_LENGTH,)
+def extractFeatures(state, playerId = None):
+    return extractFeaturesBatch([state], playerId)[0]
+
+##
+# extractFeaturesBatch
+#
+# encodes a list of states as flat vectors, one row per state
+#
+# Parameters:
+#   states   - the states to encode (GameState[])
+#   playerId - the player whose point of view to use, or None for the player
+#              whose turn it is in each state
+#
+# Return: an array of shape (len(states), FEATURE_LENGTH)
+def extractFeaturesBatch(states, playerId = None):
+    features = numpy.zeros((len(states), FEATURE_LENGTH))
+    #views into each row, so fillFeatures writes straight into the result
+    planes = features[:, :NUM_PLANES * PLANE_SIZE].reshape(len(states), NUM_PLANES, BOARD_LENGTH, BOARD_LENGTH)
+    globals_ = features[:, NUM_PLANES * PLANE_SIZE:]
+    for i in xrange(0, len(states)):
+        fillFeatures(states[i], planes[i], globals_[i], playerId)
+    return features
@@ -0,0 +1,172 @@
+##
+#TranspositionTable
+#Description: A fixed-size table of search results keyed by Zobrist hash (see
+#   GameState.getHash), so that a search can reuse the result for a state it
+#   has already searched after reaching it again through a different order
+#   of moves.
+#
+#   Each hash maps to one slot, which holds two entries.  The first keeps
+#   the deepest result stored for it; a result for another state from an
+#   older search (see newSearch) is replaced by any new one.  Every result
+#   that isn't deep enough for the first entry goes in the second, replacing
+#   what was there.  So a shallow re-search of a state never throws away the
+#   bounds of a deeper one, and the latest result is still kept.
+##
+
+#Kinds of value stored in an entry
+EXACT = 0
+LOWER_BOUND = 1 #the search failed high: the real value is at least this
+UPPER_BOUND = 2 #the search failed low: the real value is at most this
+
+#Default number of slots
+DEFAULT_SIZE = 1 << 16
+
+##
+#TranspositionEntry
+#Description: The result of searching one state
+#
+#Variables:
+#   key - The Zobrist hash of the state (long)
+#   depth - The depth the state was searched to (int)
+#   value - The value the search found (number)
+#   flag - Whether value is EXACT, a LOWER_BOUND or an UPPER_BOUND (int)
+#   move - The best move found, or None (Move)
+#   age - The search the entry was stored in (int)
+##
+class TranspositionEntry(object):
+
+    ##
+    #__init__
+    #Description: Creates a new TranspositionEntry (see the class variables)
+    ##
+    def __init__(self, key, depth, value, flag, move, age):
+        self.key = key
+        self.depth = depth
+        self.value = value
+        self.flag = flag
+        self.move = move
+        self.age = age
+
+##
+#TranspositionTable
+#Description: The table itself.  A Player can keep one for the whole game,
+#   calling newSearch at the start of every getMove.
+#
+#Variables:
+#   size - The number of slots (int)
+#   deepSlots - The depth-preferred entry in each slot, or None (TranspositionEntry[])
+#   recentSlots - The always-replaced entry in each slot, or None (TranspositionEntry[])
+#   age - The number of the current search (int)
+#   hits, misses - How many lookups found and didn't find their state (int)
+##
+class TranspositionTable(object):
+
+    ##
+    #__init__
+    #Description: Creates a new, empty TranspositionTable
+    #
+    #Parameters:
+    #   inputSize - The number of slots (int)
+    ##
+    def __init__(self, inputSize = DEFAULT_SIZE):
+        self.size = inputSize
+        self.clear()
+
+    ##
+    #clear
+    #Description: Removes every entry and resets the statistics
+    ##
+    def clear(self):
+        self.deepSlots = [None] * self.size
+        self.recentSlots = [None] * self.size
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+
+    ##
+    #newSearch
+    #Description: Marks every entry stored so far as old, so that the
+    #   entries of the next search replace them first.  They can still be
+    #   looked up until they are replaced.
+    ##
+    def newSearch(self):
+        self.age += 1
+
+    ##
+    #lookup
+    #Description: Returns the entry for a state
+    #
+    #Parameters:
+    #   key - The Zobrist hash of the state (long)
+    #
+    #Return: The TranspositionEntry, or None if the state isn't in the table
+    ##
+    def lookup(self, key):
+        index = key % self.size
+        for entry in (self.deepSlots[index], self.recentSlots[index]):
+            if entry != None and entry.key == key:
+                self.hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    ##
+    #store
+    #Description: Records the result of searching a state: as the slot's
+    #   deep entry if it is at least as deep as that entry or that entry is
+    #   for another state from an older search, and as its recent entry
+    #   otherwise
+    #
+    #Parameters:
+    #   key - The Zobrist hash of the state (long)
+    #   depth - The depth the state was searched to (int)
+    #   value - The value the search found (number)
+    #   flag - Whether value is EXACT, a LOWER_BOUND or an UPPER_BOUND (int)
+    #   move - The best move found, or None (Move)
+    ##
+    def store(self, key, depth, value, flag = EXACT, move = None):
+        index = key % self.size
+        newEntry = TranspositionEntry(key, depth, value, flag, move, self.age)
+        entry = self.deepSlots[index]
+        if entry == None or depth >= entry.depth or (entry.age != self.age and entry.key != key):
+            self.deepSlots[index] = newEntry
+            #don't leave a shallower result for the same state behind
+            recent = self.recentSlots[index]
+            if recent != None and recent.key == key:
+                self.recentSlots[index] = None
+        else:
+            self.recentSlots[index] = newEntry
+
+    ##
+    #probe
+    #Description: Looks up a state for an alpha-beta search.
+    #
+    #Parameters:
+    #   key - The Zobrist hash of the state (long)
+    #   depth - The depth the state is about to be searched to (int)
+    #   alpha, beta - The current search window (number)
+    #
+    #Return: A tuple (value, move).  value is the stored value if it was
+    #   searched at least as deep and settles the state for this window,
+    #   and None otherwise.  move is the best move stored for the state,
+    #   which is worth trying first either way, or None.
+    ##
+    def probe(self, key, depth, alpha, beta):
+        entry = self.lookup(key)
+        if entry == None:
+            return (None, None)
+        if entry.depth >= depth:
+            if entry.flag == EXACT:
+                return (entry.value, entry.move)
+            if entry.flag == LOWER_BOUND and entry.value >= beta:
+                return (entry.value, entry.move)
+            if entry.flag == UPPER_BOUND and entry.value <= alpha:
+                return (entry.value, entry.move)
+        return (None, entry.move)
+
+    ##
+    #__len__
+    #Description: Returns the number of entries in the table
+    ##
+    def __len__(self):
+        return 2 * self.size - self.deepSlots.count(None) - self.recentSlots.count(None)
@@ -27,6 +27,13 @@ CELL_SIZE = Rect(0,0,10,10)
 BOARD_SIZE = Rect(0,0,10,10)
 CELL_SPACING = 5
 FIELD_SPACING = 10
+#Default number of frames per second the screen is drawn at, at most
+MAX_FPS = 30
+#Colors of the shades of a cell on the path of the selected move, at its last
+#step, at a potential move and at an attack target (see getCellShades)
+SHADE_COLORS = [DARK_GREEN, LIGHT_GREEN, GOLDENROD, LIGHT_RED]
+#Number of composed cells kept before they are thrown out (see getCellSurface)
+CELL_CACHE_SIZE = 1000
 
 ##
 #UserInterface
@@ -34,6 +41,7 @@ FIELD_SPACING = 10
 #
 #Variables:
 #   inputSize - An (x,y) tuple expressing the size of the aNTiCS window in pixels.((int,int))
+#   maxFPS - The number of frames per second the screen is drawn at, at most.(int)
 ##
 class UserInterface(object):
     ##
@@ -48,6 +56,10 @@ class UserInterface(object):
         pygame.display.set_caption("aNTiCS")
         icon = pygame.image.load(os.path.join("Textures", "icon.bmp"))
         pygame.display.set_icon(icon)
+        self.maxFPS = MAX_FPS
+        #When the last frame was drawn, and events that were waited for but not handled yet.
+        self.lastFrameTime = 0.0
+        self.pendingEvents = []
     
     ##
     #submitBuild
@@ -133,6 +145,13 @@ class UserInterface(object):
     def submitISoldier(self):
         print "Clicked INDIRECT SOLDIER"
     
+    ##
+    #submitSpeed
+    #Description: Dummy method used as a placeholder for the event handling methods that will be passed in from Game.py.
+    ##
+    def submitSpeed(self):
+        print "Clicked SPEED"
+    
     ##
     #submitNoBuild
     #Description: Dummy method used as a placeholder for the event handling methods that will be passed in from Game.py.
@@ -271,64 +290,77 @@ class UserInterface(object):
         self.screen.blit(messageSurface, (self.messageLocation[0], self.messageLocation[1] + lineNum * self.notifyFont.get_height()))
     
     ##
-    #drawConstruction
-    #Description: Draws a non-moving structure of the specified type to the specified location on the game board.
+    #composeConstruction
+    #Description: Composes the texture of a non-moving structure with its owner's color,
+    #   ready to be drawn onto a cell.  initAssets does this once for every kind.
     #
     #Parameters:
-    #   item - an object subclassed from Construction.(Construction or Building)
-    #   position - a tuple that indicates a cell on the board. This will be converted to a pixel location.((int,int))
+    #   constrType - the type of the Construction.(int)
+    #   player - the id of the player that owns it, or None for a structure that
+    #       has no owner, like grass and food.(int)
+    #
+    #Returns: The texture, with WHITE transparent.(Surface)
     ##
-    def drawConstruction(self, item, position):
-        Xpixel = CELL_SPACING * (position[0] + 1) + CELL_SIZE.width * position[0]
-        Ypixel = CELL_SPACING * (position[1] + 1) + CELL_SIZE.height * position[1]
-        constrTex = self.constructionTexs[item.type].copy()
+    def composeConstruction(self, constrType, player):
+        constrTex = self.constructionTexs[constrType].copy()
         background = pygame.Surface(CELL_SIZE.size)
-        if type(item) is Building:
-            background.fill(LIGHT_RED if item.player == PLAYER_ONE else LIGHT_BLUE)
+        if player != None:
+            background.fill(LIGHT_RED if player == PLAYER_ONE else LIGHT_BLUE)
             constrTex.set_colorkey(self.playerAlpha)
         else:
             background.fill(WHITE)
         background.blit(constrTex, (0, 0))
         background.set_colorkey(WHITE)
-        self.screen.blit(background, (Xpixel, Ypixel))
-    
+        return background
+
     ##
-    #drawAnt
-    #Description: Draws an Ant of the specified type to the specified location on the game board.
+    #composeAnt
+    #Description: Composes the texture of an Ant with its owner's color, ready to be
+    #   drawn onto a cell.  initAssets does this once for every kind.
     #
     #Parameters:
-    #   ant - an Ant object.(Ant)
-    #   position - a tuple that indicates a cell on the board. This will be converted to a pixel location.((int,int))
+    #   antType - the type of the Ant.(int)
+    #   player - the id of the player that owns it.(int)
+    #
+    #Returns: The texture, with WHITE transparent.(Surface)
     ##
-    def drawAnt(self, ant, position):
-        Xpixel = CELL_SPACING * (position[0] + 1) + CELL_SIZE.width * position[0]
-        Ypixel = CELL_SPACING * (position[1] + 1) + CELL_SIZE.height * position[1]
-        #Start by drawing the ant itself onto a solid player color background.
+    def composeAnt(self, antType, player):
         #The player color should only show in areas of the playerAlpha color.
         background = pygame.Surface(CELL_SIZE.size)
-        background.fill(LIGHT_RED if ant.player == PLAYER_ONE else LIGHT_BLUE)
-        background.blit(self.antTexs[ant.type], (0, 0))
+        background.fill(LIGHT_RED if player == PLAYER_ONE else LIGHT_BLUE)
+        background.blit(self.antTexs[antType], (0, 0))
         background.set_colorkey(WHITE)
-        #Then draw the ant itself.
-        self.screen.blit(background, (Xpixel, Ypixel))
+        return background
+
+    ##
+    #drawAnt
+    #Description: Draws an Ant, with its health and markers, onto the surface of a cell.
+    #
+    #Parameters:
+    #   ant - an Ant object.(Ant)
+    #   cell - the surface of the cell the ant is in.(Surface)
+    ##
+    def drawAnt(self, ant, cell):
+        #Start by drawing the ant itself onto a solid player color background.
+        cell.blit(self.antSurfaces[(ant.type, ant.player)], (0, 0))
         #Draw current health across the top from the left.
         healthBox = Rect(0,0,10,6)
         healthPerimiter = Rect(0,0,12,8)
         for x in xrange(0, UNIT_STATS[ant.type][HEALTH]):
-            pygame.draw.rect(self.screen, DARK_GREEN, healthPerimiter.move(Xpixel + CELL_SIZE.width - 15 * (x + 1) - 1, Ypixel + 1))
+            pygame.draw.rect(cell, DARK_GREEN, healthPerimiter.move(CELL_SIZE.width - 15 * (x + 1) - 1, 1))
         for x in xrange(0, ant.health):
-            pygame.draw.rect(self.screen, LIGHT_GREEN, healthBox.move(Xpixel + CELL_SIZE.width - 15 * (x + 1), Ypixel + 2))
+            pygame.draw.rect(cell, LIGHT_GREEN, healthBox.move(CELL_SIZE.width - 15 * (x + 1), 2))
         for x in xrange(ant.health, UNIT_STATS[ant.type][HEALTH]):
-            pygame.draw.rect(self.screen, DARK_RED, healthBox.move(Xpixel + CELL_SIZE.width - 15 * (x + 1), Ypixel + 2))
+            pygame.draw.rect(cell, DARK_RED, healthBox.move(CELL_SIZE.width - 15 * (x + 1), 2))
         #Draw isCarrying marker in lower right
         if ant.carrying:
             XoffsetCarry = CELL_SIZE.width - self.isCarryingTex.get_width()
             YoffsetCarry = CELL_SIZE.height - self.isCarryingTex.get_height()
-            self.screen.blit(self.isCarryingTex, (Xpixel + XoffsetCarry, Ypixel + YoffsetCarry))
+            cell.blit(self.isCarryingTex, (XoffsetCarry, YoffsetCarry))
         #Draw hasMoved marker as a shade across the image
         if ant.hasMoved:
             self.shaderTex.fill(BLACK)
-            self.screen.blit(self.shaderTex, (Xpixel, Ypixel))
+            cell.blit(self.shaderTex, (0, 0))
     
     ##
     #drawCaptureHealths
@@ -479,7 +511,7 @@ class UserInterface(object):
         #Draw the elapsed time
         Yoffset = YStartPixel + len(scores) * (self.tournFont.get_height() + FIELD_SPACING)
         if (self.tournamentInProgress):
-            self.tournamentElapsed = time.clock() - self.tournamentStartTime
+            self.tournamentElapsed = time.time() - self.tournamentStartTime
         elapsedMessage = "Elapsed time: "
         elapsedColor = DARK_RED
         if (not self.tournamentInProgress):
@@ -528,29 +560,18 @@ class UserInterface(object):
         self.drawButton(key, self.submitSelected)
     
     ##
-    #drawCell
-    #Description: Draws a cell. The basic component of the board.
+    #getCellShades
+    #Description: Finds out which shades a cell is highlighted with.
     #
     #Parameters:
-    #   currentLoc - The Location to be drawn in this cell. Locations can have
-    #       ants and buildings attached, so those will be drawn if present.(Location)
+    #   currentLoc - The Location in this cell.(Location)
+    #
+    #Returns: A list of four booleans: whether the cell is on the path of
+    #   the selected move, is its last step, is a potential move and is
+    #   highlighted for attacks.
     ##
-    def drawCell(self, currentLoc):
-        col = currentLoc.coords[0]
-        row = currentLoc.coords[1]
-        #Find the x y coordinates that this column and row map to.
-        Xpixel = CELL_SPACING * (col + 1) + CELL_SIZE.width * col
-        Ypixel = CELL_SPACING * (row + 1) + CELL_SIZE.height * row
-        #Create a Rect that shows up if the square is selected.
-        shadeWidth = CELL_SPACING / 2 * 2 + CELL_SIZE.width
-        shadeHeight = CELL_SPACING  / 2 * 2 + CELL_SIZE.height
-        shadeRect = Rect(0, 0, shadeWidth, shadeHeight)
-        #Find the X and Y coordinates to draw the shade at.
-        shadeXpixel = Xpixel - CELL_SPACING / 2
-        shadeYpixel = Ypixel - CELL_SPACING / 2
-        #Create a True/False list indicating which shaders should be drawn
+    def getCellShades(self, currentLoc):
         drawList = []
-        colorList = [DARK_GREEN, LIGHT_GREEN, GOLDENROD, LIGHT_RED]
         if self.coordList != []:
             #Draw the shadeRect if currentLoc is in coordList
             drawList.append(True if currentLoc.coords in self.coordList[:-1] else False)
@@ -562,81 +583,321 @@ class UserInterface(object):
         drawList.append(True if currentLoc.coords in self.validCoordList else False)
         #Draw the shade for a cell highlighted for attacks if currentLoc is in attackList
         drawList.append(True if currentLoc.coords in self.attackList else False)
-        #Draw the background shades
-        for index in xrange(0, len(drawList)):
-            if drawList[index]:
-                pygame.draw.rect(self.screen, colorList[index], shadeRect.move(shadeXpixel, shadeYpixel))
-        #Draw the cell itself.
-        self.screen.blit(self.terrainTex, CELL_SIZE.move(Xpixel, Ypixel))
+        return drawList
+
+    ##
+    #getContentKey
+    #Description: Sums up what is in a cell, as far as drawing it goes.
+    #
+    #Parameters:
+    #   currentLoc - The Location in this cell.(Location)
+    #
+    #Returns: A tuple of the owner and type of the construction and the owner,
+    #   type, health, isCarrying and hasMoved of the ant, each None if absent.
+    ##
+    def getContentKey(self, currentLoc):
+        constr = currentLoc.constr
+        ant = currentLoc.ant
+        constrKey = None if constr == None else (constr.type, constr.player if type(constr) is Building else None)
+        antKey = None if ant == None else (ant.type, ant.player, ant.health, ant.carrying, ant.hasMoved)
+        return (constrKey, antKey)
+
+    ##
+    #getCellKey
+    #Description: Sums up everything drawCell draws for a cell, so that the cell
+    #   only needs to be drawn again when this changes.
+    #
+    #Parameters:
+    #   currentLoc - The Location in this cell.(Location)
+    #
+    #Returns: A tuple that is equal for cells that look the same.
+    ##
+    def getCellKey(self, currentLoc):
+        return self.getContentKey(currentLoc) + (tuple(self.getCellShades(currentLoc)), self.getCaptureValue(currentLoc))
+
+    ##
+    #getCellSurface
+    #Description: Returns the inside of a cell: the terrain, what is on it and
+    #   the translucent shades over it.  Cells are composed the first time they
+    #   are needed and kept in cellSurfaces, so a cell that looks like one drawn
+    #   before takes a single blit.
+    #
+    #Parameters:
+    #   currentLoc - The Location in this cell.(Location)
+    #   drawList - The shades of the cell (see getCellShades).(boolean[])
+    #
+    #Returns: The inside of the cell.(Surface)
+    ##
+    def getCellSurface(self, currentLoc, drawList):
+        key = self.getContentKey(currentLoc) + (tuple(drawList),)
+        if key in self.cellSurfaces:
+            return self.cellSurfaces[key]
+        constrKey, antKey = key[0], key[1]
+        cell = pygame.Surface(CELL_SIZE.size).convert()
+        cell.blit(self.terrainTex, (0, 0))
         #Draw what's in this cell
-        if currentLoc.constr != None:
-            self.drawConstruction(currentLoc.constr, (col, row))
-        if currentLoc.ant != None:
-            self.drawAnt(currentLoc.ant, (col, row))
+        if constrKey != None:
+            cell.blit(self.constrSurfaces[constrKey], (0, 0))
+        if antKey != None:
+            self.drawAnt(currentLoc.ant, cell)
         #Draw the translucent foreground shades.
         for index in xrange(0, len(drawList)):
             if drawList[index]:
-                self.shaderTex.fill(colorList[index])
-                self.screen.blit(self.shaderTex, CELL_SIZE.move(Xpixel, Ypixel))
+                self.shaderTex.fill(SHADE_COLORS[index])
+                cell.blit(self.shaderTex, (0, 0))
+        #Every cell is kept until there are too many to be worth keeping.
+        if len(self.cellSurfaces) >= CELL_CACHE_SIZE:
+            self.cellSurfaces = {}
+        self.cellSurfaces[key] = cell
+        return cell
+
+    ##
+    #getShadeRect
+    #Description: Finds the area of the screen a cell covers, including the
+    #   border its shades are drawn in.
+    #
+    #Parameters:
+    #   coords - The board coordinates of the cell.((int,int))
+    #
+    #Returns: The area.(Rect)
+    ##
+    def getShadeRect(self, coords):
+        shadeWidth = CELL_SPACING / 2 * 2 + CELL_SIZE.width
+        shadeHeight = CELL_SPACING  / 2 * 2 + CELL_SIZE.height
+        shadeXpixel = CELL_SPACING * (coords[0] + 1) + CELL_SIZE.width * coords[0] - CELL_SPACING / 2
+        shadeYpixel = CELL_SPACING * (coords[1] + 1) + CELL_SIZE.height * coords[1] - CELL_SPACING / 2
+        return Rect(shadeXpixel, shadeYpixel, shadeWidth, shadeHeight)
+
+    ##
+    #drawCell
+    #Description: Draws a cell. The basic component of the board.
+    #
+    #Parameters:
+    #   currentLoc - The Location to be drawn in this cell. Locations can have
+    #       ants and buildings attached, so those will be drawn if present.(Location)
+    ##
+    def drawCell(self, currentLoc):
+        col = currentLoc.coords[0]
+        row = currentLoc.coords[1]
+        #Find the x y coordinates that this column and row map to.
+        Xpixel = CELL_SPACING * (col + 1) + CELL_SIZE.width * col
+        Ypixel = CELL_SPACING * (row + 1) + CELL_SIZE.height * row
+        #Create a Rect that shows up if the square is selected.
+        shadeRect = self.getShadeRect((col, row))
+        #Create a True/False list indicating which shaders should be drawn
+        drawList = self.getCellShades(currentLoc)
+        #Draw the background shades
+        for index in xrange(0, len(drawList)):
+            if drawList[index]:
+                pygame.draw.rect(self.screen, SHADE_COLORS[index], shadeRect)
+        #Draw the cell itself, with what's in it and the translucent foreground shades.
+        self.screen.blit(self.getCellSurface(currentLoc, drawList), (Xpixel, Ypixel))
         #Draw the captureHealth of any ant tunnel being captured.
         captureVal = self.getCaptureValue(currentLoc)
         if captureVal != -1:
             self.drawCaptureHealth(captureVal, (Xpixel, Ypixel), currentLoc.constr.player)
 
+    ##
+    #getMenuKey
+    #Description: Sums up everything drawn on the AI checklist or the tournament
+    #   screen, so that they only need to be drawn again when this changes.
+    #
+    #Parameters:
+    #   mode - The current game mode.(int)
+    #
+    #Returns: A tuple that is equal for screens that look the same.
+    ##
+    def getMenuKey(self, mode):
+        buttonKey = tuple(sorted([(key, self.buttons[key][1]) for key in self.buttons]))
+        if self.choosingAIs:
+            return ("checklist", mode, buttonKey, tuple([player[1] for player in self.allAIs]),
+                    self.submitSelected.values()[0][1], self.lastNotification)
+        #The elapsed time is shown in whole seconds.
+        if self.tournamentInProgress:
+            self.tournamentElapsed = time.time() - self.tournamentStartTime
+        return ("tournament", buttonKey, self.textBoxContent, self.boxSelected, self.tournamentInProgress,
+                int(self.tournamentElapsed), tuple([tuple(score) for score in self.tournamentScores]))
+
+    ##
+    #getPanelKey
+    #Description: Sums up everything drawn in the button area next to the board.
+    #
+    #Parameters:
+    #   currentState - The state of the board being drawn.(GameState)
+    #   relButtons - The context buttons being drawn.(dict)
+    #
+    #Returns: A tuple that is equal for button areas that look the same.
+    ##
+    def getPanelKey(self, currentState, relButtons):
+        buttonKey = tuple(sorted([(key, relButtons[key][1]) for key in relButtons] +
+                                 [(key, self.buttons[key][1]) for key in self.buttons]))
+        foodKey = (currentState.inventories[0].foodCount, currentState.inventories[1].foodCount)
+        return (buttonKey, foodKey, self.lastNotification, self.aiSpeedName)
+
+    ##
+    #drawPanel
+    #Description: Draws the button area next to the board: the context buttons,
+    #   the playback speed of an AI vs AI game, the scores, the notification and
+    #   the basic buttons.
+    #
+    #Parameters:
+    #   currentState - The state of the board being drawn.(GameState)
+    #   relButtons - The context buttons to draw.(dict)
+    ##
+    def drawPanel(self, currentState, relButtons):
+        #Draw the menu area.
+        pygame.draw.rect(self.screen, WHITE, self.buttonArea)
+        #Draw the context buttons
+        for key in relButtons:
+            self.drawButton(key, relButtons)
+        #Show the playback speed under the AI vs AI buttons.
+        if relButtons is self.aiButtons:
+            label = self.gameFont.render("Speed: " + self.aiSpeedName, True, BLACK)
+            self.screen.blit(label, self.speedLocation)
+        #I can't put this draw method outside of drawBoard, but it shouldn't work this way.
+        self.drawScoreBoard(currentState.inventories[0].foodCount, currentState.inventories[1].foodCount)
+        #Draw notifications just above menu buttons.
+        self.drawNotification()
+        #Draw the basic buttons
+        for key in self.buttons:
+            self.drawButton(key, self.buttons)
+
     ##
     #drawBoard
     #Description: This is the bread and butter of the UserInterface class. Everything
-    #   starts drawing from here.
+    #   starts drawing from here.  Handles the user's input, then draws the
+    #   screen (see drawScreen).
+    #
+    #   The screen is drawn at most maxFPS times a second.  A caller that keeps
+    #   the game going calls this as often as it likes: frames that come too
+    #   soon are skipped, without waiting.  A caller that is idle until the
+    #   user does something passes idle, and if there was no input and nothing
+    #   to draw, this blocks until the next event instead of spinning.  The
+    #   event is handled by the next call, so the caller can check whether it
+    #   is still idle.
     #
     #Parameters:
     #   currentState - The state of the board to draw as a GameState.(GameState)
     #   mode - The current game mode.(int)
+    #   idle - Whether the caller is waiting for the user.(boolean)
+    ##
+    def drawBoard(self, currentState, mode, idle = False):
+        hadEvents = self.handleEvents(mode)
+        now = time.time()
+        if not idle and not self.redrawAll and now - self.lastFrameTime < 1.0 / self.maxFPS:
+            #Too soon for another frame.
+            return
+        self.lastFrameTime = now
+        drawn = self.drawScreen(currentState, mode)
+        if idle and not hadEvents and not drawn:
+            #Nothing happens until the user does something, so sleep until then.
+            self.pendingEvents.append(pygame.event.wait())
+            #Let any events that come right after it pile up for the next frame.
+            delay = 1.0 / self.maxFPS - (time.time() - self.lastFrameTime)
+            if delay > 0:
+                time.sleep(delay)
+
     ##
-    def drawBoard(self, currentState, mode):
-        self.handleEvents(mode)
-        if self.choosingAIs:
-            self.screen.fill(WHITE)
-            self.drawAIChecklist(mode)
-            self.drawNotification()
-        elif mode == TOURNAMENT_MODE:
-            self.screen.fill(WHITE)
-            #Draw the box into which the user can enter the number of games they want to play.
-            self.drawTextBox()
-            #Draw the table with columns author/win/loss/tie
-            self.drawTable()
-        else:
+    #drawScreen
+    #Description: Draws the screen for the current game mode.
+    #
+    #   Only what changed since the last frame is drawn and posted to the
+    #   monitor: the cells whose contents or shades changed and the button area
+    #   if anything in it did.  The whole screen is drawn when the screen or the
+    #   context buttons change, when the window was uncovered, and while an
+    #   anthill or tunnel is being captured, since the capture health is drawn
+    #   across several cells.  Nothing is drawn if nothing changed.
+    #
+    #Parameters:
+    #   currentState - The state of the board to draw as a GameState.(GameState)
+    #   mode - The current game mode.(int)
+    #
+    #Returns: Whether anything was drawn.(boolean)
+    ##
+    def drawScreen(self, currentState, mode):
+        if self.choosingAIs or mode == TOURNAMENT_MODE:
+            #The menu screens change rarely, so they are drawn whole when they do.
+            frameKey = self.getMenuKey(mode)
+            drawn = frameKey != self.lastFrameKey or self.redrawAll
+            if drawn:
+                self.screen.fill(WHITE)
+                if self.choosingAIs:
+                    self.drawAIChecklist(mode)
+                    self.drawNotification()
+                else:
+                    #Draw the box into which the user can enter the number of games they want to play.
+                    self.drawTextBox()
+                    #Draw the table with columns author/win/loss/tie
+                    self.drawTable()
+                #Draw the basic buttons
+                for key in self.buttons:
+                    self.drawButton(key, self.buttons)
+                pygame.display.flip()
+            self.lastFrameKey = frameKey
+            self.redrawAll = False
+            return drawn
+
+        #Make sure we draw the right buttons
+        relButtons = {} if mode == None else self.humanButtons if mode == HUMAN_MODE else self.aiButtons
+        if self.buildAntMenu == True:
+            relButtons = self.antButtons
+        captureVals = self.getCaptureValues(currentState)
+        cellKeys = [[self.getCellKey(loc) for loc in column] for column in currentState.board]
+        panelKey = self.getPanelKey(currentState, relButtons)
+        overlay = captureVals != (-1, -1) or \
+                  len([key for column in cellKeys for key in column if key[-1] != -1]) > 0
+        frameKey = ("board", mode, tuple(sorted(relButtons.keys())), captureVals)
+        #Find the cells that changed since the last frame.
+        changedCoords = []
+        if frameKey == self.lastFrameKey and not self.redrawAll:
+            for col in xrange(0, len(cellKeys)):
+                for row in xrange(0, len(cellKeys[col])):
+                    if cellKeys[col][row] != self.lastCellKeys[col][row]:
+                        changedCoords.append((col, row))
+        redrawAll = self.redrawAll or frameKey != self.lastFrameKey or \
+                    (changedCoords != [] and (overlay or self.lastOverlay))
+        self.lastFrameKey = frameKey
+        self.lastCellKeys = cellKeys
+        self.lastOverlay = overlay
+        self.redrawAll = False
+
+        if redrawAll:
             self.screen.fill(BLACK)
-            #Draw the menu area.
-            pygame.draw.rect(self.screen, WHITE, self.buttonArea)
             #Draw the player color indicator boxes.
             pygame.draw.rect(self.screen, LIGHT_RED, self.outerRect)
             pygame.draw.rect(self.screen, BLACK, self.innerRect.move((CELL_SPACING, CELL_SPACING)))
             pygame.draw.rect(self.screen, LIGHT_BLUE, self.outerRect.move((0, self.p2RectYOffset)))
             pygame.draw.rect(self.screen, BLACK, self.innerRect.move((CELL_SPACING, CELL_SPACING + self.p2RectYOffset)))
+            #Keep the empty board to draw single cells over later.
+            self.boardBackground = self.screen.copy()
             #Draw the cells themselves.
             for col in xrange(0, len(currentState.board)):
                 for row in xrange(0, len(currentState.board[col])):
                     self.drawCell(currentState.board[col][row])
             #Draw the captureHealth of any anthill being captured.
-            captureVals = self.getCaptureValues(currentState)
             if captureVals[0] != -1 or captureVals[1] != -1:
                 self.drawCaptureHealths(captureVals)
-            #Make sure we draw the right buttons
-            relButtons = {} if mode == None else self.humanButtons if mode == HUMAN_MODE else self.aiButtons
-            if self.buildAntMenu == True:
-                relButtons = self.antButtons
-            #Draw the context buttons
-            for key in relButtons:
-                self.drawButton(key, relButtons)
-            #I can't put this draw method outside of drawBoard, but it shouldn't work this way.
-            self.drawScoreBoard(currentState.inventories[0].foodCount, currentState.inventories[1].foodCount)
-            #Draw notifications just above menu buttons.
-            self.drawNotification()
-        #Draw the basic buttons
-        for key in self.buttons:
-            self.drawButton(key, self.buttons)
-        #Show everything I've drawn by posting self.screen to the monitor.
-        pygame.display.flip()
+            self.drawPanel(currentState, relButtons)
+            self.lastPanelKey = panelKey
+            #Show everything I've drawn by posting self.screen to the monitor.
+            pygame.display.flip()
+            return True
+
+        dirtyRects = []
+        for coords in changedCoords:
+            #Clear the cell and its shade border, then draw it again.
+            shadeRect = self.getShadeRect(coords)
+            self.screen.blit(self.boardBackground, shadeRect, shadeRect)
+            self.drawCell(currentState.board[coords[0]][coords[1]])
+            dirtyRects.append(shadeRect)
+        if panelKey != self.lastPanelKey:
+            self.drawPanel(currentState, relButtons)
+            self.lastPanelKey = panelKey
+            dirtyRects.append(self.buttonArea)
+        #Post only the parts of self.screen that changed to the monitor.
+        if dirtyRects != []:
+            pygame.display.update(dirtyRects)
+        return dirtyRects != []
     
     ##
     #handleButton
@@ -730,6 +991,8 @@ class UserInterface(object):
                 self.aiButtons['Next'][-1]()
             elif char == 'c':
                 self.aiButtons['Continue'][-1]()
+            elif char == 's':
+                self.aiButtons['Speed'][-1]()
     
     ##
     #handleEvents
@@ -739,6 +1002,8 @@ class UserInterface(object):
     #
     #Pararmeters:
     #   mode - The current game mode.(int)
+    #
+    #Returns: Whether there were any events.(boolean)
     ##
     def handleEvents(self, mode):
         #Make sure we check the right buttons
@@ -746,12 +1011,17 @@ class UserInterface(object):
         #It should be impossible for self.buildAntMenu to be True unless mode is HUMAN_MODE and AIs have already been chosen.
         if mode == HUMAN_MODE and self.buildAntMenu:
             relButtons = self.antButtons
-        #Check what to do for each event
-        for event in pygame.event.get():
+        #Check what to do for each event, starting with any drawBoard waited for
+        events = self.pendingEvents + pygame.event.get()
+        self.pendingEvents = []
+        for event in events:
             if event.type == pygame.QUIT:
                 sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and time.clock() - self.lastClicked > self.clickCooldown:
-                self.lastClicked = time.clock()
+            elif event.type in (VIDEOEXPOSE, ACTIVEEVENT):
+                #The window may have been covered, so its contents are lost.
+                self.redrawAll = True
+            elif event.type == pygame.MOUSEBUTTONDOWN and time.time() - self.lastClicked > self.clickCooldown:
+                self.lastClicked = time.time()
                 #Start by checking the basic buttons that always get drawn
                 for key in self.buttons:
                     if self.buttonRect.move(self.buttons[key][0]).collidepoint(event.pos):
@@ -824,6 +1094,7 @@ class UserInterface(object):
                     self.textBoxContent = self.textBoxContent[:-1]
             elif event.type == KEYDOWN:
                 self.handleHotkey(mode, str(event.unicode))
+        return events != []
     
     ##
     #findButtonCoords
@@ -897,6 +1168,19 @@ class UserInterface(object):
             ant.set_colorkey(self.playerAlpha)
         self.isCarryingTex.set_colorkey(WHITE)
         self.shaderTex.set_alpha(50)
+        #Compose every construction and ant with each owner's color up front,
+        #and start without any composed cells.
+        self.constrSurfaces = {}
+        for constrType in (ANTHILL, TUNNEL):
+            for player in (PLAYER_ONE, PLAYER_TWO):
+                self.constrSurfaces[(constrType, player)] = self.composeConstruction(constrType, player)
+        for constrType in (GRASS, FOOD):
+            self.constrSurfaces[(constrType, None)] = self.composeConstruction(constrType, None)
+        self.antSurfaces = {}
+        for antType in xrange(0, len(self.antTexs)):
+            for player in (PLAYER_ONE, PLAYER_TWO):
+                self.antSurfaces[(antType, player)] = self.composeAnt(antType, player)
+        self.cellSurfaces = {}
         #Set up fonts.
         pygame.font.init()
         self.statFont = pygame.font.Font(None, 15)
@@ -927,8 +1211,12 @@ class UserInterface(object):
         #Initial values for buttons in human vs AI mode.
         self.aiButtons = {
         'Next':[self.findButtonCoords(1, True), 1, self.submitNext],
-        'Continue':[self.findButtonCoords(2, True), 1, self.submitContinue]
+        'Continue':[self.findButtonCoords(2, True), 1, self.submitContinue],
+        'Speed':[self.findButtonCoords(3, True), 1, self.submitSpeed]
         }
+        #The playback speed shown under the AI vs AI buttons, and where.
+        self.aiSpeedName = ''
+        self.speedLocation = self.findButtonCoords(4, True)
         #Initial values for build ant buttons.
         self.antButtons = {
         'Worker':[self.findButtonCoords(1, True), 1, self.submitWorker],
@@ -969,7 +1257,7 @@ class UserInterface(object):
         #Initializing tournament scores
         self.tournamentScores = []
         #Variables used to track elapsed time during tournaments
-        self.tournamentStartTime = time.clock()
+        self.tournamentStartTime = time.time()
         self.tournamentElapsed = 0.0
         self.tournamentInProgress = False
         #Find out if user is choosing AIs
@@ -978,4 +1266,12 @@ class UserInterface(object):
         self.allAIs = []
         #Set a minimmum time between accepted clicks.
         self.clickCooldown = 0.15
-        self.lastClicked = time.clock()
+        self.lastClicked = time.time()
+        #What was drawn last, so drawBoard only draws what changed since.
+        self.lastFrameKey = None
+        self.lastCellKeys = None
+        self.lastPanelKey = None
+        self.lastOverlay = False
+        self.boardBackground = None
+        #Draw the whole screen next time, e.g. after the window was uncovered.
+        self.redrawAll = True
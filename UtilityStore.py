@@ -0,0 +1,315 @@
+import mmap
+import os
+import struct
+# Files are locked with fcntl on POSIX systems and msvcrt on Windows.
+# Without either, nothing is locked, and only one process may use a store
+# at a time.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+##
+#UtilityStore
+#Description: A persistent table from integer keys to float values (e.g.
+#   the utility of each encoded state for a TD learning agent), kept in a
+#   memory-mapped file.
+#
+#   The file is an open-addressing hash table: a header followed by a
+#   power-of-two number of 16-byte slots, each holding a key and its
+#   value.  Opening a store maps the file without reading it, so it takes
+#   the same few milliseconds however many states it holds, and only the
+#   pages that are actually used are ever loaded into memory.  Setting a
+#   value writes just its slot, which the OS writes back to disk on its
+#   own; flush forces it.  When the table gets too full, the file is
+#   rebuilt at twice the size.
+#
+#   Several processes (e.g. the workers of a parallel tournament) may use
+#   the same file at once.  Every read and write holds a lock on the file,
+#   and after taking it a process whose table was grown by another one maps
+#   the file again.  Each get or set is atomic, but updating a value from
+#   its old one (store[key] += x) is not, so concurrent updates of the
+#   same key may be lost.  A new file is written in full under a temporary
+#   name and then renamed into place, so no process ever sees it half made.
+#   Processes creating the same store hold a lock on <path>.lock while they
+#   do, so only the first one creates it.
+#
+#Variables:
+#   path - The file the store lives in (string)
+#   file - The open file (file)
+#   map - The memory map of the file (mmap)
+#   capacity - The number of slots (int)
+#   count - The number of keys stored (int)
+##
+
+#Header: magic, capacity, count
+HEADER_FORMAT = "<8sQQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+MAGIC = "UTILSTR1"
+#Slot: key, value
+SLOT_FORMAT = "<qd"
+SLOT_SIZE = struct.calcsize(SLOT_FORMAT)
+#Key of an empty slot; keys must be non-negative
+EMPTY_KEY = -1
+#The table is doubled when more than this fraction of the slots are used
+MAX_LOAD = 0.7
+DEFAULT_CAPACITY = 1 << 16
+#Multiplier for Fibonacci hashing of keys into slots
+HASH_MULTIPLIER = 11400714819323198485
+MASK_64 = (1 << 64) - 1
+
+##
+#lockFile
+#Description: Locks an open file against other processes, waiting until
+#   they release it.  Windows has no shared locks, so reading locks the
+#   file exclusively there.
+#
+#Parameters:
+#   file - The file to lock (file)
+#   exclusive - True to lock for writing, False for reading (boolean)
+##
+def lockFile(file, exclusive):
+    if fcntl != None:
+        fcntl.lockf(file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    elif msvcrt != None:
+        file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except IOError:
+                #LK_LOCK gives up after trying for 10 seconds
+                pass
+
+##
+#unlockFile
+#Description: Releases the lock taken by lockFile
+##
+def unlockFile(file):
+    if fcntl != None:
+        fcntl.lockf(file, fcntl.LOCK_UN)
+    elif msvcrt != None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+##
+#createStore
+#Description: Creates the file of a new store, unless another process
+#   creates it first
+#
+#Parameters:
+#   path - The file to create (string)
+#   capacity - The least number of slots, a power of two (int)
+#   items - The (key, value) pairs to put in the new store ((int, float)[])
+##
+def createStore(path, capacity, items):
+    while len(items) > capacity * MAX_LOAD:
+        capacity *= 2
+    lockPath = path + ".lock"
+    with open(lockPath, "a+b") as creationLock:
+        lockFile(creationLock, True)
+        try:
+            if not os.path.exists(path):
+                tempPath = path + "." + str(os.getpid()) + ".tmp"
+                try:
+                    with open(tempPath, "wb") as newFile:
+                        newFile.write(emptyTable(capacity))
+                    if len(items) > 0:
+                        store = UtilityStore(tempPath)
+                        for key, value in items:
+                            store[key] = value
+                        store.close()
+                    os.rename(tempPath, path)
+                finally:
+                    if os.path.exists(tempPath):
+                        os.remove(tempPath)
+        finally:
+            unlockFile(creationLock)
+    #once the store exists nobody needs the lock; Windows won't remove a
+    #file another process still has open, and the next creator will
+    try:
+        os.remove(lockPath)
+    except OSError:
+        pass
+
+##
+#emptyTable
+#Description: Returns the bytes of a table with no keys in it
+#
+#Parameters:
+#   capacity - The number of slots, a power of two (int)
+##
+def emptyTable(capacity):
+    return (struct.pack(HEADER_FORMAT, MAGIC, capacity, 0) +
+            struct.pack(SLOT_FORMAT, EMPTY_KEY, 0.0) * capacity)
+
+class UtilityStore(object):
+
+    ##
+    #__init__
+    #Description: Opens the store in the given file, creating an empty one if
+    #   the file doesn't exist
+    #
+    #Parameters:
+    #   inputPath - The file to keep the store in (string)
+    #   initialCapacity - The number of slots of a new store, a power of two (int)
+    #   initialItems - (key, value) pairs to fill a new store with; ignored
+    #       if the file already exists ((int, float)[])
+    ##
+    def __init__(self, inputPath, initialCapacity = DEFAULT_CAPACITY, initialItems = ()):
+        self.path = inputPath
+        if not os.path.exists(self.path):
+            createStore(self.path, initialCapacity, initialItems)
+        self.file = open(self.path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, self.capacity, self.count = struct.unpack_from(HEADER_FORMAT, self.map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise IOError("not a UtilityStore file: " + self.path)
+
+    ##
+    #lock
+    #Description: Locks the file against other processes and catches up with
+    #   any changes they made to the size of the table
+    #
+    #Parameters:
+    #   exclusive - True to lock for writing, False for reading (boolean)
+    ##
+    def lock(self, exclusive):
+        lockFile(self.file, exclusive)
+        magic, capacity, self.count = struct.unpack_from(HEADER_FORMAT, self.map, 0)
+        if capacity != self.capacity:
+            self.map.close()
+            self.map = mmap.mmap(self.file.fileno(), 0)
+            self.capacity = capacity
+
+    ##
+    #unlock
+    #Description: Releases the lock taken by lock
+    ##
+    def unlock(self):
+        unlockFile(self.file)
+
+    ##
+    #findSlot
+    #Description: Finds the slot that holds a key, or the empty slot it would go in
+    #
+    #Parameters:
+    #   key - The key to look for (int)
+    #
+    #Return: A tuple of the offset of the slot in the file and the key stored there
+    ##
+    def findSlot(self, key):
+        bits = self.capacity.bit_length() - 1
+        index = ((key * HASH_MULTIPLIER) & MASK_64) >> (64 - bits) if bits > 0 else 0
+        while True:
+            offset = HEADER_SIZE + index * SLOT_SIZE
+            slotKey = struct.unpack_from("<q", self.map, offset)[0]
+            if slotKey == key or slotKey == EMPTY_KEY:
+                return (offset, slotKey)
+            index = (index + 1) % self.capacity
+
+    ##
+    #get
+    #Description: Returns the value of a key, or a default if it isn't stored
+    ##
+    def get(self, key, default = None):
+        self.lock(False)
+        try:
+            offset, slotKey = self.findSlot(key)
+            if slotKey == EMPTY_KEY:
+                return default
+            return struct.unpack_from("<d", self.map, offset + 8)[0]
+        finally:
+            self.unlock()
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key < 0:
+            raise ValueError("UtilityStore keys must be non-negative")
+        self.lock(True)
+        try:
+            offset, slotKey = self.findSlot(key)
+            if slotKey == EMPTY_KEY:
+                if self.count + 1 > self.capacity * MAX_LOAD:
+                    self.grow()
+                    offset, slotKey = self.findSlot(key)
+                self.count += 1
+                struct.pack_into(HEADER_FORMAT, self.map, 0, MAGIC, self.capacity, self.count)
+            struct.pack_into(SLOT_FORMAT, self.map, offset, key, value)
+        finally:
+            self.unlock()
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __len__(self):
+        self.lock(False)
+        self.unlock()
+        return self.count
+
+    ##
+    #items
+    #Description: Returns a list of all the (key, value) pairs in the store
+    ##
+    def items(self):
+        self.lock(False)
+        try:
+            return self.readItems()
+        finally:
+            self.unlock()
+
+    ##
+    #readItems
+    #Description: Returns a list of all the (key, value) pairs in the table.
+    #   The caller must hold the lock.
+    ##
+    def readItems(self):
+        result = []
+        for index in xrange(0, self.capacity):
+            key, value = struct.unpack_from(SLOT_FORMAT, self.map, HEADER_SIZE + index * SLOT_SIZE)
+            if key != EMPTY_KEY:
+                result.append((key, value))
+        return result
+
+    ##
+    #grow
+    #Description: Rebuilds the table in the file with twice as many slots.
+    #   The caller must hold the lock for writing.
+    ##
+    def grow(self):
+        entries = self.readItems()
+        self.capacity *= 2
+        self.count = 0
+        self.map.resize(HEADER_SIZE + self.capacity * SLOT_SIZE)
+        self.map[:] = emptyTable(self.capacity)
+        for key, value in entries:
+            offset = self.findSlot(key)[0]
+            struct.pack_into(SLOT_FORMAT, self.map, offset, key, value)
+        self.count = len(entries)
+        struct.pack_into(HEADER_FORMAT, self.map, 0, MAGIC, self.capacity, self.count)
+
+    ##
+    #flush
+    #Description: Makes sure every change has been written to the file
+    ##
+    def flush(self):
+        self.map.flush()
+
+    ##
+    #close
+    #Description: Writes out every change and closes the file
+    ##
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self.file.close()
@@ -0,0 +1,136 @@
+import random
+from Constants import *
+
+##
+#Zobrist
+#Description: Zobrist hashing of game states.  Every feature of a state (an
+#   ant of some type and owner on some cell, its health, whether it is
+#   carrying food or has moved, a construction and its capture health, each
+#   player's food count, the phase and whose turn it is) has a random 64-bit
+#   key, and the hash of a state is the XOR of the keys of its features.
+#   Changing one feature only takes two XORs, which is how
+#   GameState.applyMove and undoMove keep GameState.zobristHash up to date.
+#
+#   The keys come from a fixed seed, so hashes are the same in every process.
+##
+
+#Seed of the random keys
+ZOBRIST_SEED = 0x5eed
+#Larger values of these features share the key of the largest one
+MAX_HEALTH = 7
+MAX_FOOD = 63
+NUM_CELLS = BOARD_LENGTH * BOARD_LENGTH
+
+keyGenerator = random.Random(ZOBRIST_SEED)
+
+##
+#randomKeys
+#Description: Returns a list of new random 64-bit keys
+#
+#Parameters:
+#   count - The number of keys (int)
+##
+def randomKeys(count):
+    return [keyGenerator.getrandbits(64) for i in xrange(0, count)]
+
+#[cell][player][ant type]
+ANT_KEYS = [[randomKeys(R_SOLDIER + 1) for player in (PLAYER_ONE, PLAYER_TWO)] for cell in xrange(0, NUM_CELLS)]
+#[cell][health]
+HEALTH_KEYS = [randomKeys(MAX_HEALTH + 1) for cell in xrange(0, NUM_CELLS)]
+#[cell]
+CARRYING_KEYS = randomKeys(NUM_CELLS)
+MOVED_KEYS = randomKeys(NUM_CELLS)
+#[cell][player][construction type - ANTHILL]
+CONSTR_KEYS = [[randomKeys(FOOD - ANTHILL + 1) for player in (PLAYER_ONE, PLAYER_TWO, NEUTRAL)] for cell in xrange(0, NUM_CELLS)]
+#[cell][capture health]
+CAPTURE_KEYS = [randomKeys(MAX_HEALTH + 1) for cell in xrange(0, NUM_CELLS)]
+#[player][food count]
+FOOD_KEYS = [randomKeys(MAX_FOOD + 1) for player in (PLAYER_ONE, PLAYER_TWO)]
+#[phase]
+PHASE_KEYS = randomKeys(PLAY_PHASE + 1)
+TURN_KEY = keyGenerator.getrandbits(64)
+
+##
+#clamp
+#Description: Limits a value to the range 0 to maximum
+##
+def clamp(value, maximum):
+    return min(max(value, 0), maximum)
+
+##
+#antKey
+#Description: Returns the key of all the features of an ant
+#
+#Parameters:
+#   ant - The Ant (Ant)
+##
+def antKey(ant):
+    cell = ant.coords[0] * BOARD_LENGTH + ant.coords[1]
+    key = ANT_KEYS[cell][ant.player][ant.type] ^ HEALTH_KEYS[cell][clamp(ant.health, MAX_HEALTH)]
+    if ant.carrying:
+        key ^= CARRYING_KEYS[cell]
+    if ant.hasMoved:
+        key ^= MOVED_KEYS[cell]
+    return key
+
+##
+#constrKey
+#Description: Returns the key of all the features of a construction.  Grass
+#   and food belong to NEUTRAL and have no capture health.
+#
+#Parameters:
+#   constr - The Construction or Building (Construction)
+##
+def constrKey(constr):
+    cell = constr.coords[0] * BOARD_LENGTH + constr.coords[1]
+    player = getattr(constr, "player", NEUTRAL)
+    captureHealth = getattr(constr, "captureHealth", None)
+    key = CONSTR_KEYS[cell][player][constr.type - ANTHILL]
+    if captureHealth != None:
+        key ^= CAPTURE_KEYS[cell][clamp(captureHealth, MAX_HEALTH)]
+    return key
+
+##
+#foodKey
+#Description: Returns the key of the food count of an inventory
+#
+#Parameters:
+#   inventory - The Inventory (Inventory)
+##
+def foodKey(inventory):
+    if inventory.player == NEUTRAL:
+        return 0
+    return FOOD_KEYS[inventory.player][clamp(inventory.foodCount, MAX_FOOD)]
+
+##
+#stateKey
+#Description: Returns the key of the phase and turn of a state
+#
+#Parameters:
+#   state - The GameState (GameState)
+##
+def stateKey(state):
+    key = PHASE_KEYS[state.phase]
+    if state.whoseTurn == PLAYER_TWO:
+        key ^= TURN_KEY
+    return key
+
+##
+#hashState
+#Description: Computes the Zobrist hash of a state from scratch, using its
+#   inventories (so states without a board work too)
+#
+#Parameters:
+#   state - The GameState to hash (GameState)
+#
+#Return: The hash (a 64-bit long)
+##
+def hashState(state):
+    key = stateKey(state)
+    for inv in state.inventories:
+        key ^= foodKey(inv)
+        for ant in inv.ants:
+            key ^= antKey(ant)
+        for constr in inv.constrs:
+            key ^= constrKey(constr)
+    return key
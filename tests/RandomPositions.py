@@ -0,0 +1,78 @@
+import random
+from Constants import *
+from Ant import Ant
+from Building import Building
+from Construction import Construction
+from Inventory import Inventory
+from Location import Location
+from GameState import GameState
+from AIPlayerUtils import listAllLegalMoves
+
+#
+# RandomPositions.py
+#
+# Positions for the tests to run on: the start of a game with randomly
+# placed constructions, played on by random legal moves.  The same seed
+# always gives the same positions.
+#
+
+#Plies played between the positions that are kept
+STRIDE = 5
+
+##
+# startingState
+#
+# Description: Returns the state at the start of the play phase, as Game
+# leaves it after setup: each player has placed its anthill, tunnel and
+# grass on its own side and two food on the enemy's, and has a queen on its
+# anthill and a worker on its tunnel.
+#
+# Parameters:
+#   rng - the random number generator to place the constructions with (Random)
+#
+def startingState(rng):
+    board = [[Location((col, row)) for row in xrange(0, BOARD_LENGTH)] for col in xrange(0, BOARD_LENGTH)]
+    inventories = [Inventory(PLAYER_ONE, [], [], 1), Inventory(PLAYER_TWO, [], [], 1),
+                   Inventory(NEUTRAL, [], [], 0)]
+    rows = {PLAYER_ONE: range(0, 4), PLAYER_TWO: range(6, 10)}
+    for player in (PLAYER_ONE, PLAYER_TWO):
+        cells = rng.sample([(x, y) for x in xrange(0, BOARD_LENGTH) for y in rows[player]], 11)
+        enemyCells = [(x, y) for x in xrange(0, BOARD_LENGTH) for y in rows[1 - player]
+                      if board[x][y].constr == None]
+        constrs = [Building(cells[0], ANTHILL, player), Building(cells[1], TUNNEL, player)]
+        inventories[player].constrs.extend(constrs)
+        constrs += [Construction(coords, GRASS) for coords in cells[2:]]
+        constrs += [Construction(coords, FOOD) for coords in rng.sample(enemyCells, 2)]
+        inventories[NEUTRAL].constrs.extend(constrs[2:])
+        for constr in constrs:
+            board[constr.coords[0]][constr.coords[1]].constr = constr
+        for ant in (Ant(cells[0], QUEEN, player), Ant(cells[1], WORKER, player)):
+            inventories[player].ants.append(ant)
+            board[ant.coords[0]][ant.coords[1]].ant = ant
+    return GameState(board, inventories, PLAY_PHASE, PLAYER_ONE)
+
+##
+# randomPositions
+#
+# Description: Plays random legal moves from starting states, keeping every
+# STRIDE-th position
+#
+# Parameters:
+#   seed - the seed of the positions (int)
+#   count - the number of positions to return (int)
+#
+# Return: the positions (GameState[]), each one a separate state
+#
+def randomPositions(seed, count):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = startingState(rng)
+        for ply in xrange(1, 40 * STRIDE):
+            if state.inventories[PLAYER_ONE].getQueen() == None or \
+               state.inventories[PLAYER_TWO].getQueen() == None:
+                break
+            state.applyMove(rng.choice(listAllLegalMoves(state)))
+            if ply % STRIDE == 0 and len(positions) < count:
+                positions.append(state.clone())
+    return positions
@@ -0,0 +1,30 @@
+import unittest
+import Benchmark
+
+##
+# BenchmarkTest
+# Description: Checks the comparison of benchmark runs
+##
+class BenchmarkTest(unittest.TestCase):
+
+    def testCompareResultsFlagsRegression(self):
+        baseline = {"clone": {"opsPerSec": 1000.0}, "games": {"opsPerSec": 10.0},
+                    "getAntAt": {"opsPerSec": 500.0}}
+        results = {"clone": {"opsPerSec": 850.0}, "games": {"opsPerSec": 9.5},
+                   "getAntAt": {"opsPerSec": 600.0}, "new": {"opsPerSec": 1.0}}
+        changes, regressions = Benchmark.compareResults(results, baseline, 0.1)
+        self.assertEqual(regressions, ["clone"])
+        self.assertEqual(changes, {"clone": -0.15, "games": -0.05, "getAntAt": 0.2})
+
+    def testCompareResultsWithinTolerance(self):
+        baseline = {"clone": {"opsPerSec": 1000.0}}
+        changes, regressions = Benchmark.compareResults({"clone": {"opsPerSec": 950.0}}, baseline, 0.1)
+        self.assertEqual(regressions, [])
+
+    def testCorpusIsReproducible(self):
+        first = Benchmark.buildCorpus(3, 5)
+        second = Benchmark.buildCorpus(3, 5)
+        self.assertEqual([state.getHash() for state in first], [state.getHash() for state in second])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os, shutil, tempfile, unittest
+from Game import Game
+from GameRecord import GameRecord, GameReplay, writeRecord, readRecords
+from PackedState import PackedState
+
+##
+# GameRecordTest
+# Description: Records a headless game and checks that replays rebuild its
+#     states, wherever they seek to
+##
+class GameRecordTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        game = Game(headless = True)
+        game.setupTournament(["Random", "Bottom of the Gene Pool"], 0)
+        game.playGame(0, 1)
+        cls.record = game.record
+        cls.finalState = PackedState.fromGameState(game.state)
+
+    def testSeekToEndMatchesGame(self):
+        replay = GameReplay(self.record, 8)
+        self.assertEqual(PackedState.fromGameState(replay.seek(len(replay))), self.finalState)
+
+    def testSeekingAnywhereMatchesReplayingFromStart(self):
+        replay = GameReplay(self.record, 8)
+        replay.seek(len(replay))
+        last = len(replay)
+        for ply in (0, 1, 7, 8, 9, last / 2, last - 1, last):
+            #a fresh replay with no snapshots replays every ply from the start
+            fromStart = GameReplay(self.record, last + 1).seek(ply)
+            self.assertEqual(PackedState.fromGameState(replay.seek(ply)), PackedState.fromGameState(fromStart))
+        self.assertEqual(len(replay.snapshots), last / 8 + 1)
+        self.assertRaises(IndexError, replay.seek, last + 1)
+
+    def testArchiveRoundTrip(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "games.agr")
+            with open(path, "ab") as archive:
+                writeRecord(archive, self.record)
+                writeRecord(archive, self.record.toBytes())
+            records = list(readRecords(path))
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(len(records), 2)
+        for record in records:
+            self.assertEqual(record.authors, self.record.authors)
+            self.assertEqual(record.winner, self.record.winner)
+            self.assertEqual(record.events, self.record.events)
+
+if __name__ == '__main__':
+    unittest.main()
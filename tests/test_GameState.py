@@ -0,0 +1,62 @@
+import unittest
+import Zobrist
+from AIPlayerUtils import listAllLegalMoves
+from RandomPositions import randomPositions
+
+##
+# describeState
+# Description: returns everything applyMove can change in a state, with the
+#     inventories in their list order
+##
+def describeState(state):
+    inventories = []
+    for inv in state.inventories:
+        ants = [(ant.coords, ant.type, ant.player, ant.health, ant.carrying, ant.hasMoved) for ant in inv.ants]
+        constrs = [(constr.coords, constr.type, getattr(constr, "player", None), getattr(constr, "captureHealth", None))
+                   for constr in inv.constrs]
+        inventories.append((ants, constrs, inv.foodCount))
+    board = None
+    if state.board != None:
+        board = [[(loc.ant, loc.constr) for loc in column] for column in state.board]
+    return (state.phase, state.whoseTurn, inventories, board)
+
+##
+# GameStateTest
+# Description: Checks that undoMove takes back applyMove exactly and that the
+#     incremental Zobrist hash matches one computed from scratch
+##
+class GameStateTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.positions = randomPositions(0, 20)
+
+    def testApplyUndoRoundTrip(self):
+        for position in self.positions:
+            for state in (position, position.fastclone()):
+                before = describeState(state)
+                hashBefore = state.getHash()
+                for move in listAllLegalMoves(state):
+                    undo = state.applyMove(move)
+                    self.assertEqual(state.getHash(), Zobrist.hashState(state))
+                    state.undoMove(undo)
+                    self.assertEqual(describeState(state), before)
+                    self.assertEqual(state.getHash(), hashBefore)
+
+    def testNestedMovesUndoInReverse(self):
+        state = self.positions[0].fastclone()
+        before = describeState(state)
+        hashBefore = state.getHash()
+        undos = []
+        #play a few whole turns
+        for i in range(0, 12):
+            moves = listAllLegalMoves(state)
+            undos.append(state.applyMove(moves[(i * 7) % len(moves)]))
+            self.assertEqual(state.getHash(), Zobrist.hashState(state))
+        for undo in reversed(undos):
+            state.undoMove(undo)
+        self.assertEqual(describeState(state), before)
+        self.assertEqual(state.getHash(), hashBefore)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os, shutil, tempfile, unittest
+import GeneticTrainer
+from Constants import *
+
+TRAINEE = "Bottom of the Gene Pool"
+
+##
+# GeneticTrainerTest
+# Description: Checks that evaluateGene seats the trainee fairly
+##
+class GeneticTrainerTest(unittest.TestCase):
+
+    def setUp(self):
+        GeneticTrainer.initTrainer([TRAINEE, "Random"], 0)
+        self.game = GeneticTrainer.trainerGame
+        self.game.playGame = self.playGame
+        self.trainee = self.game.players[GeneticTrainer.findPlayerId(self.game, TRAINEE)][0]
+        self.seen = []
+
+    ##
+    # playGame
+    # Description: stands in for Game.playGame.  The trainee wins exactly
+    #     when its playerId is the seat it plays in, and the winner and loser
+    #     are reported the way Game.setWinner does.
+    ##
+    def playGame(self, playerOneId, playerTwoId):
+        seats = [self.game.players[playerOneId][0], self.game.players[playerTwoId][0]]
+        self.seen.append([player.playerId for player in seats])
+        traineeSeat = seats.index(self.trainee)
+        winnerSeat = traineeSeat if self.trainee.playerId == traineeSeat else 1 - traineeSeat
+        return (seats[winnerSeat].playerId, seats[1 - winnerSeat].playerId)
+
+    def testScoreDoesNotDependOnSeat(self):
+        gene = self.trainee.generateRandomGene()
+        geneIdx, fitness = GeneticTrainer.evaluateGene((3, gene, TRAINEE, "Random", 4))
+        self.assertEqual(geneIdx, 3)
+        self.assertEqual(fitness, 4)
+        self.assertEqual(self.seen, [[PLAYER_ONE, PLAYER_TWO]] * 4)
+
+    def testPlayerIdsAreRestored(self):
+        ids = [player[0].playerId for player in self.game.players]
+        GeneticTrainer.evaluateGene((0, self.trainee.generateRandomGene(), TRAINEE, "Random", 2))
+        self.assertEqual([player[0].playerId for player in self.game.players], ids)
+
+##
+# TimedTrainingTest
+# Description: Checks that the worker processes can evaluate genes when the
+#     AIs are timed, and so run in processes of their own
+##
+class TimedTrainingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.trainer = GeneticTrainer.GeneticTrainer(TRAINEE, ["Random"], 1, 1, 1, 5.0,
+                                                     os.path.join(self.tempDir, "genes.json"))
+
+    def tearDown(self):
+        self.trainer.stopWorkers(False)
+        shutil.rmtree(self.tempDir)
+
+    def testTimedGene(self):
+        self.trainer.trainee.population = self.trainer.trainee.population[:1]
+        self.trainer.startWorkers()
+        self.trainer.evaluateGeneration()
+        self.trainer.stopWorkers()
+        self.assertIn(self.trainer.trainee.fitness, [[-1], [1]])
+        self.assertEqual(self.trainer.workers, [])
+
+if __name__ == '__main__':
+    unittest.main()
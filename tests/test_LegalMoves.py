@@ -0,0 +1,72 @@
+import unittest
+import Benchmark, Rules
+from Constants import *
+from AIPlayerUtils import listAllLegalMoves
+
+#Stands in for the offered moves, so a test can tell when they are returned
+OFFERED = ["offered"]
+
+##
+# describeMoves
+# Description: Returns the keys of moves, which compare by value
+##
+def describeMoves(moves):
+    return [Rules.moveKey(move) for move in moves]
+
+##
+# LegalMovesTest
+# Description: Checks that the moves the game offers a player are used only
+#     while the state they were listed for is unchanged
+##
+class LegalMovesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.positions = Benchmark.buildCorpus(0, 10)
+
+    ##
+    # offer
+    # Description: Returns a copy of a state with its moves offered, and the
+    #     offered moves replaced by OFFERED
+    ##
+    def offer(self, state):
+        view = state.clone()
+        keys = Rules.offerLegalMoves(view)
+        self.assertEqual(keys, set(describeMoves(listAllLegalMoves(state.clone()))))
+        view.legalMoves = OFFERED
+        return view
+
+    ##
+    # assertListedAfresh
+    # Description: Checks that a changed state's moves are listed again
+    ##
+    def assertListedAfresh(self, view):
+        fresh = view.clone()
+        self.assertEqual(describeMoves(listAllLegalMoves(view)), describeMoves(listAllLegalMoves(fresh)))
+
+    def testOfferedWhileUnchanged(self):
+        for state in self.positions:
+            self.assertEqual(listAllLegalMoves(self.offer(state)), OFFERED)
+
+    def testRejectedOnceChanged(self):
+        for state in self.positions:
+            #the first move, which is END if there is nothing else to do
+            view = self.offer(state)
+            view.applyMove(listAllLegalMoves(state)[0])
+            self.assertListedAfresh(view)
+
+            view = self.offer(state)
+            view.inventories[state.whoseTurn].foodCount += 1
+            self.assertListedAfresh(view)
+
+            view = self.offer(state)
+            ant = view.inventories[state.whoseTurn].ants[0]
+            ant.hasMoved = not ant.hasMoved
+            self.assertListedAfresh(view)
+
+            view = self.offer(state)
+            view.whoseTurn = 1 - view.whoseTurn
+            self.assertListedAfresh(view)
+
+if __name__ == '__main__':
+    unittest.main()
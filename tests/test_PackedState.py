@@ -0,0 +1,46 @@
+import unittest
+from PackedState import PackedState
+from Constants import *
+from RandomPositions import randomPositions
+
+##
+# PackedStateTest
+# Description: Checks that packing and unpacking a state loses nothing
+##
+class PackedStateTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.positions = randomPositions(0, 20)
+
+    def testRoundTrip(self):
+        for state in self.positions:
+            packed = PackedState.fromGameState(state)
+            unpacked = packed.toGameState()
+            self.assertEqual(PackedState.fromGameState(unpacked), packed)
+            self.assertEqual(unpacked.phase, state.phase)
+            self.assertEqual(unpacked.whoseTurn, state.whoseTurn)
+            for player in (PLAYER_ONE, PLAYER_TWO):
+                self.assertEqual(unpacked.inventories[player].foodCount, state.inventories[player].foodCount)
+                self.assertEqual(len(unpacked.inventories[player].ants), len(state.inventories[player].ants))
+                self.assertEqual(len(unpacked.inventories[player].constrs), len(state.inventories[player].constrs))
+            for inv in state.inventories:
+                for ant in inv.ants:
+                    copy = unpacked.board[ant.coords[0]][ant.coords[1]].ant
+                    self.assertEqual((copy.type, copy.player, copy.health, copy.carrying, copy.hasMoved),
+                                     (ant.type, ant.player, ant.health, ant.carrying, ant.hasMoved))
+
+    def testBoardlessStatePacksTheSame(self):
+        for state in self.positions:
+            self.assertEqual(PackedState.fromGameState(state.fastclone()), PackedState.fromGameState(state))
+
+    def testCopyIsIndependent(self):
+        packed = PackedState.fromGameState(self.positions[0])
+        copy = packed.copy()
+        self.assertEqual(copy, packed)
+        self.assertEqual(hash(copy), hash(packed))
+        copy.setFoodCount(PLAYER_ONE, packed.getFoodCount(PLAYER_ONE) + 1)
+        self.assertNotEqual(copy, packed)
+
+if __name__ == '__main__':
+    unittest.main()
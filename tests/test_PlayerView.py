@@ -0,0 +1,72 @@
+import unittest
+import Benchmark
+from Constants import *
+from PlayerView import PlayerView
+
+##
+# describePieces
+# Description: Returns everything a player can read off ants or constructions
+##
+def describePieces(pieces):
+    return [(piece.coords, piece.type, getattr(piece, "player", None), getattr(piece, "health", None),
+             getattr(piece, "carrying", None), getattr(piece, "hasMoved", None),
+             getattr(piece, "captureHealth", None)) for piece in pieces]
+
+##
+# describeState
+# Description: Returns everything a player can read off a state: the phase
+#     and turn, the inventories in order, and each cell of the board
+##
+def describeState(state):
+    inventories = [(inv.player, inv.foodCount, describePieces(inv.ants), describePieces(inv.constrs))
+                   for inv in state.inventories]
+    board = [(loc.coords, describePieces([loc.ant] if loc.ant else []),
+              describePieces([loc.constr] if loc.constr else []))
+             for col in state.board for loc in col]
+    return (state.phase, state.whoseTurn, inventories, board)
+
+##
+# PlayerViewTest
+# Description: Checks that a view shows a player exactly what the flipped
+#     clone the game used to hand out did
+##
+class PlayerViewTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        #the corpus holds what the player to move saw; flip player two's back
+        cls.positions = []
+        for position in Benchmark.buildCorpus(0, 20):
+            state = position.clone()
+            if state.whoseTurn == PLAYER_TWO:
+                state.flipBoard()
+            cls.positions.append(state)
+
+    def expectedView(self, state, hideConstrs):
+        expected = state.clone()
+        if state.whoseTurn == PLAYER_TWO:
+            expected.flipBoard()
+        if hideConstrs:
+            expected.clearConstrs()
+        return expected
+
+    def testMatchesFlippedClone(self):
+        self.assertEqual(set([state.whoseTurn for state in self.positions]), set([PLAYER_ONE, PLAYER_TWO]))
+        for state in self.positions:
+            for hideConstrs in (False, True):
+                self.assertEqual(describeState(PlayerView(state, hideConstrs)),
+                                 describeState(self.expectedView(state, hideConstrs)))
+
+    def testViewIsACopy(self):
+        state = self.positions[0]
+        before = describeState(state)
+        view = PlayerView(state)
+        for inv in view.inventories:
+            inv.foodCount += 1
+            for ant in inv.ants:
+                ant.health = 0
+        view.board[0][0].ant = None
+        self.assertEqual(describeState(state), before)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import sys, unittest, StringIO
+import Rules
+from Constants import *
+from Move import Move
+from RandomPositions import randomPositions
+
+##
+# ScriptedPlayer
+# Description: A player that places its constructions on the first free
+#     cells and then only ends its turn, unless told to misbehave
+##
+class ScriptedPlayer(object):
+
+    def __init__(self, badMethod = None, badAnswer = None):
+        self.badMethod = badMethod
+        self.badAnswer = badAnswer
+        self.results = []
+
+    def answer(self, methodName, goodAnswer):
+        if methodName != self.badMethod:
+            return goodAnswer
+        if isinstance(self.badAnswer, Exception):
+            raise self.badAnswer
+        return self.badAnswer
+
+    def getPlacement(self, currentState):
+        if currentState.phase == SETUP_PHASE_1:
+            rows, count = range(0, 4), 11
+        else:
+            rows, count = range(6, 10), 2
+        free = [(x, y) for y in rows for x in range(0, BOARD_LENGTH) if currentState.getConstrAt((x, y)) == None]
+        return self.answer("getPlacement", free[:count])
+
+    def getMove(self, currentState):
+        return self.answer("getMove", Move(END, None, None))
+
+    def getAttack(self, currentState, attackingAnt, enemyLocations):
+        return enemyLocations[0]
+
+    def registerWin(self, hasWon):
+        self.results.append(hasWon)
+
+##
+# RulesTest
+# Description: Checks the validation of players' answers and the ways a
+#     game ends
+##
+class RulesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.state = randomPositions(0, 1)[0]
+        self.stderr = sys.stderr
+        sys.stderr = StringIO.StringIO()
+
+    def tearDown(self):
+        sys.stderr = self.stderr
+
+    def testCoordsAndPlacements(self):
+        self.assertTrue(Rules.isValidCoord((0, 9)))
+        for coord in [(0, 10), (-1, 0), (1.0, 2), [1, 2], None]:
+            self.assertFalse(Rules.isValidCoord(coord))
+        state = Rules.newGameState()
+        self.assertTrue(Rules.isValidPlacement(state, [ANTHILL, GRASS], [(0, 0), (1, 3)]))
+        self.assertFalse(Rules.isValidPlacement(state, [ANTHILL], [(0, 4)]))
+        self.assertFalse(Rules.isValidPlacement(state, [ANTHILL], (0, 0)))
+        self.assertFalse(Rules.isValidPlacement(state, [FOOD], [(0, 0)]))
+
+    def testMoves(self):
+        self.assertEqual(Rules.isValidMove(self.state, None), None)
+        self.assertFalse(Rules.isValidMove(self.state, "move"))
+        self.assertTrue(Rules.isValidMove(self.state, Move(END, None, None)))
+        self.assertFalse(Rules.isValidMove(self.state, Move(MOVE_ANT, [(0, 0), (5, 5)], None)))
+        self.assertEqual(Rules.moveKey(Move(MOVE_ANT, [(0, 0), "a"], None)), None)
+
+    def testWinConditions(self):
+        self.assertEqual(Rules.getWinner(self.state), None)
+        self.assertFalse(Rules.hasWon(Rules.newGameState(), PLAYER_ONE))
+
+        won = self.state.clone()
+        won.inventories[PLAYER_ONE].foodCount = FOOD_GOAL
+        self.assertEqual(Rules.getWinner(won), PLAYER_ONE)
+
+        won = self.state.clone()
+        won.inventories[PLAYER_ONE].ants.remove(won.inventories[PLAYER_ONE].getQueen())
+        self.assertEqual(Rules.getWinner(won), PLAYER_TWO)
+
+        won = self.state.clone()
+        won.inventories[PLAYER_TWO].getAnthill().captureHealth = 0
+        self.assertEqual(Rules.getWinner(won), PLAYER_ONE)
+
+    def testGameRunsToMaxPlies(self):
+        players = [ScriptedPlayer(), ScriptedPlayer()]
+        self.assertEqual(Rules.playGame(players, 20), None)
+        self.assertEqual([player.results for player in players], [[], []])
+
+    def testBadAnswersLose(self):
+        for badMethod, badAnswer in [("getPlacement", None), ("getPlacement", [(0, 5)]),
+                                     ("getMove", None), ("getMove", Move(MOVE_ANT, [(0, 0), "a"], None)),
+                                     ("getMove", ValueError("player bug"))]:
+            for loserId in (PLAYER_ONE, PLAYER_TWO):
+                players = [ScriptedPlayer(), ScriptedPlayer()]
+                players[loserId] = ScriptedPlayer(badMethod, badAnswer)
+                self.assertEqual(Rules.playGame(players, 20), 1 - loserId)
+                self.assertEqual(players[loserId].results, [False])
+                self.assertEqual(players[1 - loserId].results, [True])
+        self.assertIn("player bug", sys.stderr.getvalue())
+
+    def testRulesErrorsPropagate(self):
+        getPlayerView = Rules.getPlayerView
+        def brokenView(state):
+            raise KeyError("rules bug")
+        Rules.getPlayerView = brokenView
+        try:
+            self.assertRaises(KeyError, Rules.playGame, [ScriptedPlayer(), ScriptedPlayer()], 20)
+        finally:
+            Rules.getPlayerView = getPlayerView
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import Benchmark, Rules, SearchEngine
+from AIPlayerUtils import listAllLegalMoves
+
+#Seconds of the fake clock each evaluation takes
+EVALUATION_COST = 0.001
+
+##
+# FakeClock
+# Description: Stands in for the time module in SearchEngine.  The time only
+#     moves when the test advances it, so searches end after a known amount
+#     of work instead of after however long the machine takes.
+##
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+##
+# SearchEngineTest
+# Description: Checks that the iterative deepening keeps to its time budget
+#     and returns a legal move without changing the state it was given
+##
+class SearchEngineTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.positions = Benchmark.buildCorpus(0, 5)
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.realTime = SearchEngine.time
+        SearchEngine.time = self.clock
+        self.costly = False
+        self.nodesAtDeadline = None
+
+    def tearDown(self):
+        SearchEngine.time = self.realTime
+
+    ##
+    # evaluateFood
+    # Description: rates a state by the searched-for player's food lead.  If
+    #     evaluations are costly, each one advances the clock, and the node
+    #     count when the deadline passes is kept.
+    ##
+    def evaluateFood(self, state):
+        if self.costly:
+            self.clock.now += EVALUATION_COST
+            if self.nodesAtDeadline == None and self.clock.now >= self.engine.deadline:
+                self.nodesAtDeadline = self.engine.nodes
+        me = self.engine.playerId
+        return state.inventories[me].foodCount - state.inventories[1 - me].foodCount
+
+    def testLegalMoveWithinBudget(self):
+        self.costly = True
+        self.engine = SearchEngine.SearchEngine(self.evaluateFood, 0.2)
+        for state in self.positions:
+            legalKeys = set([Rules.moveKey(move) for move in listAllLegalMoves(state)])
+            hashBefore = state.getHash()
+            self.nodesAtDeadline = None
+            move = self.engine.getMove(state)
+
+            self.assertIn(Rules.moveKey(move), legalKeys)
+            self.assertGreaterEqual(self.engine.depthReached, 1)
+            self.assertLess(self.engine.depthReached, self.engine.maxDepth)
+            #the search stops at the first clock check after its deadline
+            self.assertNotEqual(self.nodesAtDeadline, None)
+            self.assertLessEqual(self.engine.nodes - self.nodesAtDeadline, SearchEngine.NODES_PER_CLOCK_CHECK)
+            self.assertEqual(state.getHash(), hashBefore)
+
+    def testDeepensWithMoreTime(self):
+        state = self.positions[0]
+        numMoves = len(listAllLegalMoves(state))
+        self.assertLess(numMoves, SearchEngine.NODES_PER_CLOCK_CHECK)
+
+        #out of time at once: only the first iteration, which is never cut short here
+        self.engine = SearchEngine.SearchEngine(self.evaluateFood, 0.0, 3)
+        self.engine.getMove(state)
+        self.assertEqual(self.engine.depthReached, 1)
+        self.assertEqual(self.engine.nodes, numMoves)
+        shallowNodes = self.engine.nodes
+
+        self.engine = SearchEngine.SearchEngine(self.evaluateFood, 1.0, 3)
+        self.engine.getMove(state)
+        self.assertEqual(self.engine.depthReached, 3)
+        self.assertGreater(self.engine.nodes, shallowNodes)
+
+if __name__ == '__main__':
+    unittest.main()
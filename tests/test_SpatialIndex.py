@@ -0,0 +1,62 @@
+import pickle, unittest
+import Benchmark
+from AIPlayerUtils import getAntAt
+from SpatialIndex import getSpatialIndex, OWNER_KEY
+
+##
+# SpatialIndexTest
+# Description: Checks when the index of a state is rebuilt
+##
+class SpatialIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.state = Benchmark.buildCorpus(0, 1)[0]
+        self.index = getSpatialIndex(self.state)
+
+    ##
+    # freeCoords
+    # Description: returns a cell of the board no ant or construction is on
+    ##
+    def freeCoords(self, index):
+        for x in range(0, 10):
+            for y in range(0, 10):
+                if (x, y) not in index.ants and (x, y) not in index.constrs:
+                    return (x, y)
+
+    def testMovingAnAntOfACloneKeepsOtherIndexes(self):
+        clone = self.state.fastclone()
+        cloneIndex = getSpatialIndex(clone)
+        ant = clone.inventories[clone.whoseTurn].ants[0]
+        ant.coords = self.freeCoords(cloneIndex)
+        self.assertIs(getSpatialIndex(self.state), self.index)
+        self.assertIsNot(getSpatialIndex(clone), cloneIndex)
+        self.assertIs(getAntAt(clone, ant.coords), ant)
+
+    def testMovingAnAntRebuildsItsIndex(self):
+        ant = self.state.inventories[self.state.whoseTurn].ants[0]
+        oldCoords = ant.coords
+        ant.coords = self.freeCoords(self.index)
+        self.assertIs(getAntAt(self.state, ant.coords), ant)
+        self.assertEqual(getAntAt(self.state, oldCoords), None)
+
+    def testSharedAntRebuildsBothIndexes(self):
+        other = self.state.clone()
+        #share one ant between the two states
+        ant = self.state.inventories[self.state.whoseTurn].ants[0]
+        other.inventories[other.whoseTurn].ants[0] = ant
+        other.spatialIndex = None
+        otherIndex = getSpatialIndex(other)
+        ant.coords = self.freeCoords(otherIndex)
+        self.assertIs(getAntAt(self.state, ant.coords), ant)
+        self.assertIs(getAntAt(other, ant.coords), ant)
+        self.assertIsNot(getSpatialIndex(other), otherIndex)
+
+    def testPickledAntHasNoOwner(self):
+        ant = self.state.inventories[self.state.whoseTurn].ants[0]
+        self.assertTrue(OWNER_KEY in ant.__dict__)
+        copy = pickle.loads(pickle.dumps(ant, 2))
+        self.assertFalse(OWNER_KEY in copy.__dict__)
+        self.assertEqual(copy.coords, ant.coords)
+
+if __name__ == '__main__':
+    unittest.main()
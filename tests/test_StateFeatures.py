@@ -0,0 +1,39 @@
+import unittest
+from Constants import *
+from RandomPositions import randomPositions
+
+try:
+    import numpy
+    import StateFeatures
+except ImportError:
+    numpy = None
+
+##
+# StateFeaturesTest
+# Description: Checks the encoding of states against what is on the board
+##
+@unittest.skipIf(numpy == None, "StateFeatures needs NumPy")
+class StateFeaturesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.positions = randomPositions(0, 5)
+
+    def testEncodingMatchesState(self):
+        features = StateFeatures.extractFeaturesBatch(self.positions)
+        self.assertEqual(features.shape, (len(self.positions), StateFeatures.FEATURE_LENGTH))
+        self.assertTrue(((features >= 0) & (features <= 1)).all())
+        for i in range(0, len(self.positions)):
+            state = self.positions[i]
+            planes, globals_ = StateFeatures.extractPlanes(state)
+            me = state.whoseTurn
+            for ant in state.inventories[me].ants:
+                self.assertEqual(planes[StateFeatures.MY_ANT_PLANE + ant.type][ant.coords[0]][ant.coords[1]], 1)
+            numMyAnts = planes[StateFeatures.MY_ANT_PLANE:StateFeatures.ENEMY_ANT_PLANE].sum()
+            self.assertEqual(numMyAnts, len(state.inventories[me].ants))
+            self.assertEqual(globals_[StateFeatures.MY_TURN], 1)
+            self.assertEqual(globals_[StateFeatures.MY_FOOD], float(state.inventories[me].foodCount) / FOOD_GOAL)
+            self.assertTrue((features[i] == StateFeatures.extractFeatures(state)).all())
+
+if __name__ == '__main__':
+    unittest.main()
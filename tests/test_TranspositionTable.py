@@ -0,0 +1,48 @@
+import unittest
+from TranspositionTable import TranspositionTable, EXACT, LOWER_BOUND
+
+##
+# TranspositionTableTest
+# Description: Checks which results the table keeps
+##
+class TranspositionTableTest(unittest.TestCase):
+
+    def testShallowResultKeepsDeeperBounds(self):
+        table = TranspositionTable(16)
+        table.store(5, 4, 10, LOWER_BOUND, "deep")
+        table.store(5, 1, 3, EXACT, "shallow")
+        self.assertEqual(table.lookup(5).depth, 4)
+        self.assertEqual(table.probe(5, 3, 0, 10), (10, "deep"))
+        table.newSearch()
+        table.store(5, 2, 3, EXACT, "shallow")
+        self.assertEqual(table.lookup(5).depth, 4)
+
+    def testCollidingStatesShareASlot(self):
+        table = TranspositionTable(16)
+        table.store(5, 4, 10)
+        table.store(21, 1, 7)
+        self.assertEqual(table.lookup(5).value, 10)
+        self.assertEqual(table.lookup(21).value, 7)
+        #the always-replaced entry keeps only the latest shallow result
+        table.store(37, 2, 8)
+        self.assertEqual(table.lookup(21), None)
+        self.assertEqual(len(table), 2)
+
+    def testOlderSearchIsReplaced(self):
+        table = TranspositionTable(16)
+        table.store(5, 4, 10)
+        table.newSearch()
+        table.store(21, 1, 7)
+        self.assertEqual(table.lookup(21), table.deepSlots[5])
+        self.assertEqual(table.lookup(5), None)
+
+    def testDeeperResultReplacesShallowerOne(self):
+        table = TranspositionTable(16)
+        table.store(21, 4, 10)
+        table.store(5, 2, 1)
+        table.store(5, 6, 2)
+        self.assertEqual(table.lookup(5).value, 2)
+        self.assertEqual(len(table), 1)
+
+if __name__ == '__main__':
+    unittest.main()
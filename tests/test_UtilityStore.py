@@ -0,0 +1,127 @@
+import multiprocessing, os, pickle, shutil, sys, tempfile, unittest
+import UtilityStore as UtilityStoreModule
+from UtilityStore import UtilityStore
+
+##
+# fillStore
+# Description: body of a writer process; sets keys start, start + step, ...
+#     below end to their own value
+##
+def fillStore(path, start, end, step):
+    store = UtilityStore(path, 4)
+    for key in range(start, end, step):
+        store[key] = float(key)
+    store.close()
+
+##
+# FakeMsvcrt
+# Description: Stands in for the msvcrt module, recording the calls to
+#     locking.  The first lock times out, as LK_LOCK does when the file stays
+#     locked for 10 seconds.
+##
+class FakeMsvcrt(object):
+    LK_LOCK = 1
+    LK_UNLCK = 0
+
+    def __init__(self):
+        self.calls = []
+
+    def locking(self, fd, mode, nbytes):
+        self.calls.append((mode, nbytes))
+        if len(self.calls) == 1:
+            raise IOError("deadlock avoided")
+
+##
+# UtilityStoreTest
+# Description: Checks the store's contents, concurrent writers and the TD
+#     agent's conversion of its old pickled utilities
+##
+class UtilityStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "utils.dat")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def testGrowAndReopen(self):
+        store = UtilityStore(self.path, 4)
+        for key in range(0, 100):
+            store[key] = key / 2.0
+        store.close()
+        store = UtilityStore(self.path)
+        self.assertEqual(len(store), 100)
+        self.assertEqual(store[37], 18.5)
+        self.assertFalse(100 in store)
+        store.close()
+
+    def testConcurrentWritersWhileGrowing(self):
+        #every process starts from a tiny table, so they all grow it under each other
+        workers = [multiprocessing.Process(target = fillStore, args = (self.path, i, 2000, 4))
+                   for i in range(0, 4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+        store = UtilityStore(self.path)
+        self.assertEqual(sorted(store.items()), [(key, float(key)) for key in range(0, 2000)])
+        store.close()
+
+    def testInitialItemsOnlyFillNewStore(self):
+        store = UtilityStore(self.path, 4, [(1, 1.5), (2, -1.0)] + [(key, 0.0) for key in range(3, 20)])
+        self.assertEqual(store[1], 1.5)
+        self.assertEqual(len(store), 19)
+        store.close()
+        store = UtilityStore(self.path, 4, [(1, 7.0)])
+        self.assertEqual(store[1], 1.5)
+        store.close()
+        self.assertEqual(os.listdir(self.dir), ["utils.dat"])
+
+    def testPlatformsWithoutFcntl(self):
+        fcntl, msvcrt = UtilityStoreModule.fcntl, UtilityStoreModule.msvcrt
+        fake = FakeMsvcrt()
+        try:
+            UtilityStoreModule.fcntl = None
+            for UtilityStoreModule.msvcrt in (None, fake):
+                path = os.path.join(self.dir, "utils" + str(len(os.listdir(self.dir))) + ".dat")
+                store = UtilityStore(path, 4, [(1, 1.5)])
+                for key in range(2, 20):
+                    store[key] = 0.5
+                self.assertEqual(store[1], 1.5)
+                self.assertEqual(len(store), 19)
+                store.close()
+        finally:
+            UtilityStoreModule.fcntl, UtilityStoreModule.msvcrt = fcntl, msvcrt
+        self.assertEqual(sorted(os.listdir(self.dir)), ["utils0.dat", "utils1.dat"])
+        #the timed-out lock is tried again, and every lock is released
+        self.assertEqual(fake.calls[:2], [(FakeMsvcrt.LK_LOCK, 1)] * 2)
+        self.assertEqual(fake.calls.count((FakeMsvcrt.LK_LOCK, 1)) - 1,
+                         fake.calls.count((FakeMsvcrt.LK_UNLCK, 1)))
+        self.assertEqual(fake.calls[-1], (FakeMsvcrt.LK_UNLCK, 1))
+
+    def testTDAgentConvertsOldUtils(self):
+        sys.path.insert(0, "AI")
+        try:
+            tdModule = __import__("burnsl17_searsj16 TD")
+        finally:
+            sys.path.pop(0)
+        agent = tdModule.AIPlayer(0)
+        agent.saveFile = self.path
+        agent.oldSaveFile = os.path.join(self.dir, "util.searsj16_burns17")
+        with open(agent.oldSaveFile, "wb") as oldFile:
+            pickle.dump({"WTrue": 1.0, "MQ8OQ8c13": 0.25, "MQ8OQ811223": -0.5}, oldFile, 0)
+        agent.loadUtils()
+
+        encode = agent.encodeState
+        self.assertEqual(agent.utilList[tdModule.WIN_KEY], 1.0)
+        self.assertEqual(agent.utilList[encode([["MQ", 8], ["OQ", 8], ["c1", 3]])], 0.25)
+        #an ambiguous old key gives its value to every state it could stand for
+        for workers in ([["1", 12], ["2", 3]], [["1", 1], ["2", 23]]):
+            self.assertEqual(agent.utilList[encode([["MQ", 8], ["OQ", 8]] + workers)], -0.5)
+        self.assertEqual(len(agent.utilList), 4)
+        agent.utilList.close()
+
+if __name__ == '__main__':
+    unittest.main()